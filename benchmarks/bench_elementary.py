@@ -0,0 +1,86 @@
+"""
+Benchmarks of every function of the elementary_functions module, on floats and on Variables, of
+an exp/tanh-heavy model in forward mode, reverse mode and traced, and of series expansions with
+Taylor polynomials of increasing order.
+"""
+import numpy as np
+from src.pyadbcxy import elementary_functions
+from src.pyadbcxy.variable import Variable
+from src.pyadbcxy.reverse import Reverse
+from src.pyadbcxy.tracing import trace
+from src.pyadbcxy.taylor import Taylor
+
+
+def _call(function, value):
+    """Benchmark one call of an elementary function."""
+    def setup():
+        return lambda: function(value), 1
+    return setup
+
+
+BENCHMARKS = {}
+for _name in elementary_functions.__all__:
+    _function = getattr(elementary_functions, _name)
+    # 0.5 lies in the domain of every elementary function
+    BENCHMARKS[f"elementary/{_name}_float"] = _call(_function, 0.5)
+    BENCHMARKS[f"elementary/{_name}_variable"] = _call(_function, Variable(0.5, 1.0))
+
+
+def _model(xs, layers=20):
+    """An exp/tanh-heavy model: a few tanh layers followed by a softmax-like normalization."""
+    zs = list(xs)
+    for _ in range(layers):
+        zs = [elementary_functions.tanh(0.5 * z + 0.1 * zs[0]) for z in zs]
+    exps = [elementary_functions.exp(z) for z in zs]
+    total = exps[0]
+    for e in exps[1:]:
+        total = total + e
+    return [elementary_functions.log(e / total, 2) for e in exps]
+
+
+def model_forward(n=8):
+    """Jacobian of the model by forward mode on Variables seeded with unit vectors."""
+    def setup():
+        seeds = np.eye(n)
+        return lambda: _model([Variable(0.1 * i, seeds[i]) for i in range(n)]), 1
+    return setup
+
+
+def model_reverse(n=8):
+    """Gradient of the sum of the outputs of the model by reverse mode."""
+    def setup():
+        def run():
+            xs = [Reverse(0.1 * i) for i in range(n)]
+            outputs = _model(xs)
+            total = outputs[0]
+            for output in outputs[1:]:
+                total = total + output
+            return [x.grad for x in xs]
+        return run, 1
+    return setup
+
+
+def model_traced(n=8, optimize=True):
+    """Jacobian of the traced model, one reverse sweep per output."""
+    def setup():
+        compiled = trace(lambda *xs: _model(xs), *[0.1 * i for i in range(n)], optimize=optimize)
+        args = [0.2 * i for i in range(n)]
+        return lambda: compiled.derivative(*args), 1
+    return setup
+
+
+BENCHMARKS["elementary/model_forward"] = model_forward()
+BENCHMARKS["elementary/model_reverse"] = model_reverse()
+BENCHMARKS["elementary/model_traced"] = model_traced()
+BENCHMARKS["elementary/model_traced_unoptimized"] = model_traced(optimize=False)
+
+
+def series(order):
+    """Derivatives up to the given order of a scalar function, from one Taylor evaluation."""
+    def setup():
+        f = lambda x: elementary_functions.exp(elementary_functions.sin(x)) / (1 + x ** 2) + elementary_functions.tanh(x)
+        return lambda: f(Taylor(0.5, order=order)).derivatives, 1
+    return setup
+
+
+BENCHMARKS.update((f"elementary/series_order_{order}", series(order)) for order in (2, 6, 12))
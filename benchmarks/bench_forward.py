@@ -0,0 +1,72 @@
+"""
+Benchmarks of the forward mode driver with an increasing number of input Variables, of
+Jacobian-vector products, of the Jacobian of a function with many outputs, and of streaming points through it in mini-batches.
+"""
+import itertools
+from src.pyadbcxy.elementary_functions import sin
+from src.pyadbcxy.forward import Forward, jvp
+from src.pyadbcxy.streaming import stream
+from src.pyadbcxy.variable import Variable
+
+
+def _function(*xs):
+    """Sum of the products of neighboring inputs, which depends on every input."""
+    total = sin(xs[0])
+    for a, b in zip(xs, xs[1:]):
+        total = total + a * b
+    return total
+
+
+def derivative(n):
+    """Evaluate the value and full gradient of a function of n inputs."""
+    def setup():
+        fmode = Forward(_function, [Variable(0.5 + i / n) for i in range(n)])
+
+        def run():
+            fmode.calculate()
+            return fmode.derivative
+        return run, 1
+    return setup
+
+
+def product(n):
+    """Evaluate the value and the directional derivative of a function of n inputs with jvp."""
+    def setup():
+        primals = [0.5 + i / n for i in range(n)]
+        tangent = [1.0] * n
+        return lambda: jvp(_function, primals, tangent), 1
+    return setup
+
+
+def _residuals(*xs):
+    """Residuals of a discretized nonlinear equation, one per input."""
+    n = len(xs)
+    return [2 * xs[i] - xs[i - 1] - xs[(i + 1) % n] + sin(xs[i]) for i in range(n)]
+
+
+def jacobian(n):
+    """Evaluate the n x n Jacobian of n residuals, from a single evaluation of the function."""
+    def setup():
+        fmode = Forward(_residuals, [Variable(0.5 + i / n) for i in range(n)])
+
+        def run():
+            fmode.calculate()
+            return fmode.derivative
+        return run, 1
+    return setup
+
+
+def streamed(batch_size, points=1000):
+    """Stream points of a function of 3 inputs through the forward mode, batch_size at a time."""
+    def setup():
+        def run():
+            results = stream(_function, ((0.001 * t, 1.0, 2.0) for t in itertools.count()), batch_size=batch_size)
+            return list(itertools.islice(results, points))
+        return run, points
+    return setup
+
+
+BENCHMARKS = dict((f"forward/derivative_{n}", derivative(n)) for n in (1, 10, 100, 1000))
+BENCHMARKS.update((f"forward/jvp_{n}", product(n)) for n in (10, 1000))
+BENCHMARKS.update((f"forward/jacobian_{n}", jacobian(n)) for n in (10, 100))
+BENCHMARKS.update((f"forward/stream_batch_{b}", streamed(b)) for b in (1, 64))
@@ -0,0 +1,83 @@
+"""
+Memory benchmark for the PyADBCXY package. It measures the number of bytes allocated per node
+when building a representative graph with the operations of the reverse module, with and without
+a Tape, and per intermediate Variable in a forward mode computation.
+
+Run from the root of the repository with
+
+    python -m benchmarks.bench_memory
+"""
+import gc
+import tracemalloc
+from src.pyadbcxy.reverse import Reverse
+from src.pyadbcxy.tape import Tape
+from src.pyadbcxy.variable import Variable
+
+
+def _graph(x, y, n):
+    """Build a graph of about 4n nodes mixing binary and unary operations."""
+    z = x
+    for _ in range(n):
+        z = (z * y + x).sin() - 0.5
+    return z
+
+
+def bytes_per_node(build, nodes):
+    """Measure the memory held by the objects returned by build, per node.
+
+    Args:
+        build (function): function building and returning the objects to measure
+        nodes (int): number of nodes built
+
+    Returns:
+        float: bytes allocated per node
+    """
+    gc.collect()
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    kept = build()
+    size = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    del kept
+    return size / nodes
+
+
+def reverse_graph(n=25000):
+    """Bytes per node of a Reverse graph whose edges are stored in the children lists."""
+    def build():
+        x, y = Reverse(0.5), Reverse(1.5)
+        return x, y, _graph(x, y, n)
+    return bytes_per_node(build, 4 * n)
+
+
+def tape_graph(n=25000):
+    """Bytes per node of a Reverse graph recorded on a Tape."""
+    def build():
+        x, y = Reverse(0.5), Reverse(1.5)
+        with Tape() as tape:
+            _graph(x, y, n)
+        return tape
+    return bytes_per_node(build, 4 * n)
+
+
+def variables(n=100000):
+    """Bytes per Variable object."""
+    def build():
+        return [Variable(float(i), 1.0) for i in range(n)]
+    return bytes_per_node(build, n)
+
+
+MEMORY = {
+    "memory/reverse_graph": reverse_graph,
+    "memory/tape_graph": tape_graph,
+    "memory/variable": variables,
+}
+
+
+def main():
+    for name, benchmark in MEMORY.items():
+        print(f"{name:<24} {benchmark():8.1f} bytes/node")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmarks of deep and wide Reverse graphs, with the edges stored in the children lists and
+recorded on a Tape, and of a matrix-vector product with scalar Reverse and array-valued Tensor nodes.
+"""
+import numpy as np
+from src.pyadbcxy.elementary_functions import tanh
+from src.pyadbcxy.reverse import Reverse
+from src.pyadbcxy.tape import Tape
+from src.pyadbcxy.tensor import Tensor
+
+
+def _deep(x, n):
+    """A chain of 2n operations on one input."""
+    z = x
+    for _ in range(n):
+        z = z * 0.999 + 0.001
+    return z
+
+
+def _wide(xs):
+    """A sum of products over many inputs."""
+    z = xs[0] * xs[0]
+    for x in xs[1:]:
+        z = z + x * 2.0
+    return z
+
+
+def deep(n=1000):
+    """Build a deep graph and compute the gradient of its leaf from the children lists."""
+    def setup():
+        def run():
+            x = Reverse(0.5)
+            _deep(x, n)
+            return x.grad
+        return run, 2 * n
+    return setup
+
+
+def wide(n=1000):
+    """Build a wide graph and compute the gradient of every leaf from the children lists."""
+    def setup():
+        def run():
+            xs = [Reverse(0.5) for _ in range(n)]
+            _wide(xs)
+            return [x.grad for x in xs]
+        return run, 2 * n
+    return setup
+
+
+def deep_tape(n=1000):
+    """Record a deep graph on a Tape and compute the gradient of its leaf."""
+    def setup():
+        def run():
+            x = Reverse(0.5)
+            with Tape() as tape:
+                z = _deep(x, n)
+            return tape.gradient(z, [x])
+        return run, 2 * n
+    return setup
+
+
+def wide_tape(n=1000):
+    """Record a wide graph on a Tape and compute the gradient of every leaf."""
+    def setup():
+        def run():
+            xs = [Reverse(0.5) for _ in range(n)]
+            with Tape() as tape:
+                z = _wide(xs)
+            return tape.gradient(z, xs)
+        return run, 2 * n
+    return setup
+
+
+def matvec(n=30):
+    """Compute the gradient of sum(tanh(A @ x)) for an n x n matrix with one Reverse node per scalar operation."""
+    def setup():
+        A = np.random.default_rng(0).uniform(-1, 1, (n, n))
+
+        def run():
+            xs = [Reverse(0.5) for _ in range(n)]
+            with Tape() as tape:
+                z = sum(tanh(sum(a * x for a, x in zip(row, xs))) for row in A)
+            return tape.gradient(z, xs)
+        return run, n * n
+    return setup
+
+
+def matvec_tensor(n=30):
+    """Compute the gradient of sum(tanh(A @ x)) for an n x n matrix with one Tensor node per array operation."""
+    def setup():
+        A = np.random.default_rng(0).uniform(-1, 1, (n, n))
+
+        def run():
+            x = Tensor(np.full(n, 0.5))
+            tanh(A @ x).sum().backward()
+            return x.grad
+        return run, n * n
+    return setup
+
+
+BENCHMARKS = {
+    "reverse/deep": deep(),
+    "reverse/wide": wide(),
+    "reverse/deep_tape": deep_tape(),
+    "reverse/wide_tape": wide_tape(),
+    "reverse/matvec_30": matvec(30),
+    "reverse/matvec_tensor_30": matvec_tensor(30),
+    "reverse/matvec_tensor_1000": matvec_tensor(1000),
+}
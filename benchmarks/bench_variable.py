@@ -0,0 +1,44 @@
+"""
+Benchmarks of the arithmetic of scalar Variable objects.
+"""
+import numpy as np
+from src.pyadbcxy.variable import Variable
+
+
+def _binary(operation):
+    """Benchmark one operation between two Variables."""
+    def setup():
+        x, y = Variable(1.5, 1.0), Variable(0.5, 2.0)
+        return lambda: operation(x, y), 1
+    return setup
+
+
+def chain(n=100):
+    """A chain of n iterations mixing every arithmetic operator, 5 operations each."""
+    def setup():
+        x, y = Variable(1.5, 1.0), Variable(0.5, 0.0)
+
+        def run():
+            z = x
+            for _ in range(n):
+                z = (z * y + x) ** 2 / (z + 1.0) - 0.5
+            return z
+        return run, 5 * n
+    return setup
+
+
+BENCHMARKS = {
+    "variable/add": _binary(lambda x, y: x + y),
+    "variable/mul": _binary(lambda x, y: x * y),
+    "variable/sub": _binary(lambda x, y: x - y),
+    "variable/truediv": _binary(lambda x, y: x / y),
+    "variable/pow": _binary(lambda x, y: x ** y),
+    "variable/neg": _binary(lambda x, y: -x),
+    "variable/add_float": _binary(lambda x, y: x + 2.0),
+    "variable/radd_float": _binary(lambda x, y: 2.0 + x),
+    "variable/rsub_float": _binary(lambda x, y: 2.0 - x),
+    "variable/truediv_float": _binary(lambda x, y: x / 2.0),
+    "variable/rtruediv_float": _binary(lambda x, y: 2.0 / x),
+    "variable/mul_float32": _binary(lambda x, y: x * np.float32(2.0)),
+    "variable/chain": chain(),
+}
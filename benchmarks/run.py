@@ -0,0 +1,160 @@
+"""
+Runner of the benchmark suite of the PyADBCXY package. Every benchmark module exposes BENCHMARKS,
+a dictionary mapping the name of each benchmark to a setup function returning the function to
+time and the number of operations it performs per call, and optionally MEMORY, a dictionary
+mapping names to functions returning the bytes allocated per node.
+
+For each benchmark the runner reports the operations per second (best of several repeats) and the
+peak memory allocated by one call. The results can be written to a JSON file and compared against
+a stored baseline, in which case the runner exits with status 1 if any benchmark regressed by more
+than the threshold.
+
+Run from the root of the repository with
+
+    python -m benchmarks.run --output results.json --baseline benchmarks/baseline.json
+"""
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+import numpy as np
+from . import bench_variable, bench_forward, bench_reverse, bench_elementary, bench_memory
+
+
+MODULES = [bench_variable, bench_forward, bench_reverse, bench_elementary, bench_memory]
+
+
+def measure(setup, min_time=0.2, repeat=5):
+    """Measure the throughput and peak memory of a benchmark.
+
+    Args:
+        setup (function): setup function of the benchmark
+        min_time (float, optional): minimum duration of each repeat in seconds. Defaults to 0.2.
+        repeat (int, optional): number of repeats, the best one is kept. Defaults to 5.
+
+    Returns:
+        dict: operations per second and peak memory in bytes
+    """
+    func, ops = setup()
+    # calibrate the number of calls so that each repeat lasts at least min_time
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / 10:
+            break
+        number *= 10
+    number = max(1, int(number * min_time / elapsed))
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, time.perf_counter() - start)
+    gc.collect()
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"ops_per_sec": ops * number / best, "peak_memory": peak}
+
+
+def run(pattern="", min_time=0.2, repeat=5):
+    """Run every benchmark whose name contains pattern.
+
+    Args:
+        pattern (str, optional): substring of the names of the benchmarks to run. Defaults to "".
+        min_time (float, optional): minimum duration of each repeat in seconds. Defaults to 0.2.
+        repeat (int, optional): number of repeats. Defaults to 5.
+
+    Returns:
+        dict: results, with the environment they were measured in
+    """
+    results = {
+        "environment": {"python": platform.python_version(), "numpy": np.__version__, "machine": platform.machine()},
+        "benchmarks": {},
+        "memory": {},
+    }
+    for module in MODULES:
+        for name, setup in getattr(module, "BENCHMARKS", {}).items():
+            if pattern in name:
+                results["benchmarks"][name] = measure(setup, min_time, repeat)
+                print(f"{name:<36} {results['benchmarks'][name]['ops_per_sec']:>14,.0f} ops/s"
+                      f" {results['benchmarks'][name]['peak_memory']:>12,} B peak")
+        for name, benchmark in getattr(module, "MEMORY", {}).items():
+            if pattern in name:
+                results["memory"][name] = benchmark()
+                print(f"{name:<36} {results['memory'][name]:>14,.1f} bytes/node")
+    return results
+
+
+def compare(results, baseline, threshold=0.25):
+    """Compare results against a baseline.
+
+    Args:
+        results (dict): results of the run
+        baseline (dict): results of an earlier run
+        threshold (float, optional): relative change beyond which a benchmark is a regression.
+                                     Defaults to 0.25.
+
+    Returns:
+        list: descriptions of the regressions
+    """
+    regressions = []
+    for name, result in results["benchmarks"].items():
+        if name not in baseline.get("benchmarks", {}):
+            continue
+        old = baseline["benchmarks"][name]
+        speed = result["ops_per_sec"] / old["ops_per_sec"]
+        memory = result["peak_memory"] / old["peak_memory"] if old["peak_memory"] else 1.0
+        print(f"{name:<36} speed x{speed:5.2f}  peak memory x{memory:5.2f}")
+        if speed < 1 - threshold:
+            regressions.append(f"{name}: {speed:.2f}x the baseline throughput")
+        if memory > 1 + threshold:
+            regressions.append(f"{name}: {memory:.2f}x the baseline peak memory")
+    for name, result in results["memory"].items():
+        if name not in baseline.get("memory", {}):
+            continue
+        memory = result / baseline["memory"][name]
+        print(f"{name:<36} bytes/node x{memory:5.2f}")
+        if memory > 1 + threshold:
+            regressions.append(f"{name}: {memory:.2f}x the baseline bytes per node")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the PyADBCXY benchmark suite.")
+    parser.add_argument("-k", "--filter", default="", help="only run benchmarks whose name contains this string")
+    parser.add_argument("-o", "--output", help="write the results to this JSON file")
+    parser.add_argument("-b", "--baseline", help="compare the results against this JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="write the results to the baseline file instead")
+    parser.add_argument("--threshold", type=float, default=0.25, help="relative change flagged as a regression")
+    parser.add_argument("--min-time", type=float, default=0.2, help="minimum duration of each repeat in seconds")
+    parser.add_argument("--repeat", type=int, default=5, help="number of repeats per benchmark")
+    args = parser.parse_args(argv)
+
+    results = run(args.filter, args.min_time, args.repeat)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    if args.baseline and args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    elif args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print("\nRegressions:\n" + "\n".join(regressions))
+            return 1
+        print("\nNo regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
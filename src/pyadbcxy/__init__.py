@@ -1,11 +1,31 @@
-from . import variable, elementary_functions, forward, reverse
+from . import variable, elementary_functions, forward, reverse, tape, tracing, codegen, sparsity, streaming, serving, checkpointing, profiling, taylor, tensor
 
 from .variable import *
 from .elementary_functions import *
 from .forward import *
 from .reverse import *
+from .tape import *
+from .tracing import *
+from .codegen import *
+from .sparsity import *
+from .streaming import *
+from .serving import *
+from .checkpointing import *
+from .profiling import *
+from .taylor import *
+from .tensor import *
 
 __all__ = (variable.__all__ +
            elementary_functions.__all__ +
            forward.__all__ +
-           reverse.__all__)
\ No newline at end of file
+           reverse.__all__ +
+           tape.__all__ +
+           tracing.__all__ +
+           codegen.__all__ +
+           sparsity.__all__ +
+           streaming.__all__ +
+           serving.__all__ +
+           checkpointing.__all__ +
+           profiling.__all__ +
+           taylor.__all__ +
+           tensor.__all__)
@@ -0,0 +1,281 @@
+"""
+This file contains the checkpointing module for the PyADBCXY package. It includes the Checkpointed
+class, which differentiates a long iterative process in reverse mode while only storing a few of
+its intermediate states, recomputing the others during the backward pass.
+"""
+import math
+import numpy as np
+from .reverse import Reverse
+from .tape import Tape
+
+
+__all__ = ["Checkpointed"]
+
+
+def _binomial(snapshots, repetitions):
+    """Maximum number of steps that can be reversed with a number of snapshots when no step is
+    evaluated more than a number of times in the forward direction (Griewank's beta function).
+
+    Args:
+        snapshots (int): number of snapshots
+        repetitions (int): number of forward evaluations of each step
+
+    Returns:
+        int: maximum number of steps
+    """
+    return math.comb(snapshots + repetitions, snapshots)
+
+
+class Checkpointed(object):
+    """
+    This class implements checkpointing (rematerialization) for the reverse mode of an iterative
+    process, in which a step function is applied a given number of times to a state. Recording
+    every step keeps every intermediate node alive until the backward pass, so the memory grows
+    with the number of steps. Instead, the forward pass here runs on plain numbers and only stores
+    the states at a few steps (snapshots). The backward pass then reverses the steps from the last
+    one, recomputing the states it needs from the nearest snapshot, and records a single step on a
+    Tape at a time to obtain its vector-Jacobian product.
+
+    Two schedules are available:
+
+    - "binomial" (the default) places the snapshots recursively as in Griewank's Revolve
+      algorithm, which minimizes the number of recomputed steps for a number of snapshots. With the
+      default of log2(steps) snapshots, memory is O(log n) and time O(n log n).
+    - "uniform" stores a snapshot every steps/snapshots steps and the states of one segment at a
+      time. With the default of sqrt(steps) snapshots, memory is O(sqrt n) and each step is
+      evaluated twice before its vector-Jacobian product.
+
+    The step function receives the components of the state as separate arguments and returns the
+    new state as a list/tuple (or a single value for a state of one component). It is evaluated on
+    numbers as well as on Reverse objects, so it must be written with operators and the functions
+    of the elementary_functions module, and must not branch on the values of the state.
+
+    Examples
+    --------
+    >>> loop = Checkpointed(lambda x, v: (x + 0.01 * v, v - 0.01 * sin(x)), steps=1000)
+    >>> final, gradient = loop.vjp((1.0, 0.0), (1.0, 0.0))
+    >>> loop.peak_snapshots
+    10
+    """
+
+    def __init__(self, step, steps, snapshots=None, schedule="binomial"):
+        """Constructor for the Checkpointed class.
+
+        Args:
+            step (function): function computing the next state from the current one
+            steps (int): number of times the step function is applied
+            snapshots (int, optional): number of snapshots, which is the maximum number of
+                                       intermediate states stored at a time for the binomial
+                                       schedule, and the number of segments for the uniform
+                                       schedule, which also stores the states of one segment.
+                                       Defaults to None, which uses log2(steps) for the binomial
+                                       schedule and sqrt(steps) for the uniform schedule.
+            schedule (str, optional): "binomial" or "uniform". Defaults to "binomial".
+
+        Raises:
+            ValueError: if the schedule is unknown, steps is negative or snapshots is not positive
+        """
+        if schedule != "binomial" and schedule != "uniform":
+            raise ValueError(f"schedule must be 'binomial' or 'uniform', not {schedule!r}")
+        if steps < 0:
+            raise ValueError(f"steps cannot be negative, not {steps}")
+        if snapshots is None:
+            if schedule == "binomial":
+                snapshots = max(1, math.ceil(math.log2(max(steps, 1))))
+            else:
+                snapshots = max(1, math.ceil(math.sqrt(steps)))
+        if snapshots < 1:
+            raise ValueError(f"snapshots must be positive, not {snapshots}")
+        self._step = step
+        self._steps = steps
+        self._snapshots = snapshots
+        self._schedule = schedule
+        self._evaluations = 0
+        self._live = 0
+        self._peak = 0
+
+    def __repr__(self):
+        return f"Checkpointed(steps = {self._steps}, snapshots = {self._snapshots}, schedule = {self._schedule})"
+
+    @property
+    def steps(self):
+        """Get the number of times the step function is applied."""
+        return self._steps
+
+    @property
+    def snapshots(self):
+        """Get the number of snapshots."""
+        return self._snapshots
+
+    @property
+    def schedule(self):
+        """Get the checkpointing schedule, "binomial" or "uniform"."""
+        return self._schedule
+
+    @property
+    def evaluations(self):
+        """Get the number of evaluations of the step function in the forward direction during the
+        last call of 'vjp', including the recomputations."""
+        return self._evaluations
+
+    @property
+    def peak_snapshots(self):
+        """Get the largest number of intermediate states stored at once during the last call of 'vjp'."""
+        return self._peak
+
+    def __call__(self, *state):
+        """Apply the step function to a state, without differentiating it.
+
+        Args:
+            state (int or float): components of the initial state
+
+        Returns:
+            int, float, or tuple: final state
+        """
+        return self._unpack(self._advance(tuple(state), self._steps))
+
+    def _advance(self, state, steps):
+        """Apply the step function to a state a number of times, on plain numbers.
+
+        Args:
+            state (tuple): components of the state
+            steps (int): number of steps
+
+        Returns:
+            tuple: components of the new state
+        """
+        for _ in range(steps):
+            state = self._pack(self._step(*state))
+        self._evaluations += steps
+        return state
+
+    @staticmethod
+    def _pack(state):
+        """Get the components of a state returned by the step function as a tuple."""
+        return tuple(state) if isinstance(state, (list, tuple)) else (state,)
+
+    @staticmethod
+    def _unpack(state):
+        """Get a state of a single component as a number."""
+        return state[0] if len(state) == 1 else state
+
+    def _store(self, count=1):
+        """Account for intermediate states being stored, or released with a negative count."""
+        self._live += count
+        self._peak = max(self._peak, self._live)
+
+    def _step_vjp(self, state, adjoint):
+        """Compute the adjoint of a state from the adjoint of the state one step later, by recording
+        a single step on a Tape.
+
+        Args:
+            state (tuple): components of the state
+            adjoint (numpy.ndarray): adjoint of each component of the next state
+
+        Returns:
+            numpy.ndarray: adjoint of each component of the state
+        """
+        inputs = [Reverse(val) for val in state]
+        with Tape() as tape:
+            outputs = self._pack(self._step(*inputs))
+            # the vector-Jacobian product is the gradient of the outputs weighted by their adjoints
+            total = 0
+            for output, weight in zip(outputs, adjoint):
+                if weight and isinstance(output, Reverse):
+                    total = total + weight * output
+        self._evaluations += 1
+        if not isinstance(total, Reverse):
+            return np.zeros(len(state))
+        return tape.gradient(total, inputs)
+
+    def _reverse_binomial(self, state, steps, snapshots, adjoint):
+        """Reverse a number of steps from the state before the first of them, placing the snapshots
+        as in Griewank's Revolve algorithm.
+
+        Args:
+            state (tuple): components of the state before the first step
+            steps (int): number of steps to reverse
+            snapshots (int): number of snapshots available
+            adjoint (numpy.ndarray): adjoint of the state after the last step
+
+        Returns:
+            numpy.ndarray: adjoint of the state before the first step
+        """
+        while steps > 1:
+            if snapshots == 0:
+                # no snapshot left: recompute the state before each step from the start
+                for k in range(steps - 1, -1, -1):
+                    adjoint = self._step_vjp(self._advance(state, k), adjoint)
+                return adjoint
+            # fewest repetitions with which the steps can be reversed
+            repetitions = 1
+            while _binomial(snapshots, repetitions) < steps:
+                repetitions += 1
+            # the steps after the snapshot are reversed with one snapshot less, those before it
+            # with one repetition less since they are advanced once more to reach the snapshot
+            split = max(1, steps - _binomial(snapshots - 1, repetitions))
+            snapshot = self._advance(state, split)
+            self._store()
+            adjoint = self._reverse_binomial(snapshot, steps - split, snapshots - 1, adjoint)
+            self._store(-1)
+            steps = split
+        if steps == 1:
+            adjoint = self._step_vjp(state, adjoint)
+        return adjoint
+
+    def _reverse_uniform(self, state, adjoint):
+        """Compute the final state, storing a snapshot at the start of each segment of equal length,
+        then reverse every step, storing the states of one segment at a time.
+
+        Args:
+            state (tuple): components of the initial state
+            adjoint (numpy.ndarray): adjoint of the final state
+
+        Returns:
+            tuple: final state, and adjoint of the initial state
+        """
+        length = max(1, math.ceil(self._steps / self._snapshots))
+        starts = list(range(0, self._steps, length))
+        snapshots = [state]
+        for start in starts[1:]:
+            snapshots.append(self._advance(snapshots[-1], length))
+            self._store()
+        final = self._advance(snapshots[-1], self._steps - starts[-1]) if starts else state
+        for start in reversed(starts):
+            # the snapshots are released as soon as their segment is reversed
+            segment = [snapshots.pop()]
+            for _ in range(min(length, self._steps - start) - 1):
+                segment.append(self._advance(segment[-1], 1))
+            self._store(len(segment) - 1)
+            for previous in reversed(segment):
+                adjoint = self._step_vjp(previous, adjoint)
+            self._store(1 - len(segment) - (start > 0))
+        return final, adjoint
+
+    def vjp(self, state, adjoint):
+        """Compute the final state and the vector-Jacobian product of the process: the gradient,
+        with respect to the initial state, of the components of the final state weighted by
+        their adjoints.
+
+        Args:
+            state (int, float, list, or tuple): initial state
+            adjoint (int, float, list, or tuple): adjoint of each component of the final state,
+                                                  e.g. the gradient of a loss function of it
+
+        Raises:
+            ValueError: if the adjoint does not have one component per component of the state
+
+        Returns:
+            tuple: final state, and array of the adjoint of each component of the initial state
+        """
+        state = self._pack(state)
+        adjoint = np.array(self._pack(adjoint), dtype=float)
+        if len(adjoint) != len(state):
+            raise ValueError(f"the adjoint must have {len(state)} component(s), one per component of the state, not {len(adjoint)}")
+        self._evaluations = self._live = self._peak = 0
+        if self._schedule == "binomial":
+            final = self._advance(state, self._steps)
+            adjoint = self._reverse_binomial(state, self._steps, self._snapshots, adjoint)
+        else:
+            final, adjoint = self._reverse_uniform(state, adjoint)
+        return self._unpack(final), adjoint
@@ -0,0 +1,275 @@
+"""
+This file contains the code generation module for the PyADBCXY package. It includes the generate
+function, which traces a function and emits Python/NumPy source code computing its value and
+derivative, and the GeneratedFunction class, which holds the generated source and the functions
+compiled from it.
+"""
+import weakref
+import numpy as np
+from .tracing import trace, CompiledFunction
+
+
+__all__ = ["generate", "GeneratedFunction"]
+
+
+# The source code of every operation that can be recorded: an expression of the value in terms
+# of the operands {0} and {1}, and for each operand an expression of the partial derivative of
+# the result in terms of the operands, the value {v}, and the logarithm {log1} of the second operand.
+_SOURCES = {
+    "add": ("{0} + {1}", ("1", "1")),
+    "sub": ("{0} - {1}", ("1", "-1")),
+    "mul": ("{0} * {1}", ("{1}", "{0}")),
+    "truediv": ("{0} / {1}", ("1 / {1}", "-{v} / {1}")),
+    "pow": ("{0} ** {1}", ("{1} * {0} ** ({1} - 1)", "np.log({0}) * {v}")),
+    "log": ("np.log({0}) / {log1}", ("1 / ({0} * {log1})", None)),
+    "exp": ("np.exp({0})", ("{v}",)),
+    "sin": ("np.sin({0})", ("np.cos({0})",)),
+    "cos": ("np.cos({0})", ("-np.sin({0})",)),
+    "tan": ("np.tan({0})", ("1 / np.cos({0}) ** 2",)),
+    "sinh": ("np.sinh({0})", ("np.cosh({0})",)),
+    "cosh": ("np.cosh({0})", ("np.sinh({0})",)),
+    "tanh": ("np.tanh({0})", ("1 - {v} ** 2",)),
+    "arcsin": ("np.arcsin({0})", ("1 / np.sqrt(1 - {0} ** 2)",)),
+    "arccos": ("np.arccos({0})", ("-1 / np.sqrt(1 - {0} ** 2)",)),
+    "arctan": ("np.arctan({0})", ("1 / (1 + {0} ** 2)",)),
+}
+
+
+# generated functions of the functions passed to generate, released with the functions
+_cache = weakref.WeakKeyDictionary()
+
+
+def generate(func, *args):
+    """Trace a function at example values of its inputs and generate Python/NumPy source code
+    computing its value and derivative. The result is cached by function identity, so that
+    generating the same function again costs a dictionary lookup instead of a new trace and exec.
+    Since the function is traced, it must not branch on the values of its inputs.
+
+    Args:
+        func (function): function of interest, returning a single output or a list/tuple of outputs
+        args (int or float): example values of the inputs of the function
+
+    Returns:
+        GeneratedFunction: the generated function
+
+    Examples
+    --------
+    >>> f = generate(lambda x, y: x * y + sin(x), 3, 4)
+    >>> f.value_and_derivative(1, 2)
+    (2.8414709848078967, array([2.54030231, 1.        ]))
+    >>> print(f.source)
+    def value(x0, x1):
+        v2 = x0 * x1
+        v3 = np.sin(x0)
+        v4 = v2 + v3
+        return v4
+    <BLANKLINE>
+    def value_and_derivative(x0, x1):
+        v2 = x0 * x1
+        v3 = np.sin(x0)
+        v4 = v2 + v3
+        g4 = 1.0
+        g2 = g4
+        g3 = g4
+        g0 = g3 * (np.cos(x0))
+        g0 = g0 + g2 * x1
+        g1 = g2 * x0
+        r0 = _stack([g0, g1])
+        return v4, r0
+    <BLANKLINE>
+    """
+    try:
+        generated = _cache.get(func)
+    except TypeError:
+        # objects that cannot be weakly referenced are not cached
+        return GeneratedFunction(trace(func, *args))
+    if generated is None or generated.inputs != len(args):
+        generated = GeneratedFunction(trace(func, *args))
+        _cache[func] = generated
+    return generated
+
+
+class GeneratedFunction(object):
+    """
+    This class implements a function whose value and derivative are computed by Python/NumPy
+    source code generated from a CompiledFunction. Each step of the plan becomes one assignment
+    of a local variable, and the reverse sweep is unrolled into assignments of the adjoints, so
+    that calling the function runs straight-line code without any Variable or Reverse objects
+    and without looking up the rules of the operations. Only the steps the outputs depend on are
+    emitted. As in plain NumPy, the domain of the functions is not checked.
+
+    GeneratedFunction objects are created with the generate function.
+
+    Examples
+    --------
+    >>> f = generate(lambda x, y: [x * y, x + y], 3, 4)
+    >>> f(1, 2)
+    array([2, 3])
+    >>> f.derivative(1, 2)
+    array([[2., 1.],
+           [1., 1.]])
+    """
+
+    def __init__(self, compiled):
+        """Constructor for the GeneratedFunction class.
+
+        Args:
+            compiled (CompiledFunction): compiled function to generate the source code from
+        """
+        plan, inputs, outputs = compiled._plan, compiled._inputs, compiled._outputs
+        computed = set(step[1] for step in plan)
+        names = {}
+        constants = set()
+        namespace = {"np": np, "_stack": CompiledFunction._stack}
+        for k, slot in enumerate(inputs):
+            names[slot] = f"x{k}"
+        for slot, val in enumerate(compiled._values):
+            if slot in computed:
+                names[slot] = f"v{slot}"
+            elif slot not in names:
+                # constants are passed to the generated code through its global namespace
+                names[slot] = f"c{slot}"
+                constants.add(slot)
+                namespace[names[slot]] = val
+        # only the steps the outputs depend on are emitted
+        needed = set(outputs)
+        steps = []
+        for step in reversed(plan):
+            op, out, forward, a, b, da, db = step
+            if out in needed:
+                needed.update((a,) if b is None else (a, b))
+                steps.append(step)
+        steps.reverse()
+        # the logarithms of constant bases are computed once, when the code is generated
+        logs = {}
+        for op, out, forward, a, b, da, db in steps:
+            if op == "log":
+                if b in constants:
+                    logs[b] = f"log_{names[b]}"
+                    namespace[logs[b]] = np.log(compiled._values[b])
+                else:
+                    logs[b] = f"np.log({names[b]})"
+
+        forward_lines = []
+        for op, out, forward, a, b, da, db in steps:
+            operands = (names[a],) if b is None else (names[a], names[b])
+            forward_lines.append(f"    {names[out]} = {_SOURCES[op][0].format(*operands, log1=logs.get(b))}")
+        arguments = ", ".join(names[slot] for slot in inputs)
+        results = [names[output] for output in outputs]
+        if compiled._vector:
+            value = f"_stack([{', '.join(results)}])"
+        else:
+            value = results[0]
+
+        lines = [f"def value({arguments}):"] + forward_lines + [f"    return {value}", ""]
+        lines += [f"def value_and_derivative({arguments}):"] + forward_lines
+        for k, output in enumerate(outputs):
+            lines += self._backward(steps, names, constants, logs, inputs, output, f"r{k}")
+        if compiled._vector:
+            rows = ", ".join(f"r{k}" for k in range(len(outputs)))
+            derivative = f"np.stack(np.broadcast_arrays({rows}), axis=-2)"
+        else:
+            derivative = "r0"
+        lines += [f"    return {value}, {derivative}", ""]
+
+        self._source = "\n".join(lines)
+        exec(compile(self._source, "<generated>", "exec"), namespace)
+        self._value = namespace["value"]
+        self._value_and_derivative = namespace["value_and_derivative"]
+        self._inputs = len(inputs)
+
+    @staticmethod
+    def _backward(steps, names, constants, logs, inputs, output, row):
+        """Generate the lines of the reverse sweep computing the gradient of one output.
+
+        Args:
+            steps (list): steps of the plan the outputs depend on
+            names (dict): names of the variables of every slot
+            constants (set): slots of the constants, which have no adjoint
+            logs (dict): expressions of the logarithms of the bases of logarithms
+            inputs (tuple): slots of the inputs
+            output (int): slot of the output
+            row (str): name of the variable the gradient is assigned to
+
+        Returns:
+            list: lines of source code
+        """
+        lines = [f"    g{output} = 1.0"]
+        assigned = set([output])
+        for op, out, forward, a, b, da, db in reversed(steps):
+            if out not in assigned:
+                continue
+            operands = (names[a],) if b is None else (names[a], names[b])
+            for slot, partial in zip((a, b), _SOURCES[op][1]):
+                if slot is None or partial is None or slot in constants:
+                    continue
+                partial = partial.format(*operands, v=names[out], log1=logs.get(b))
+                if partial == "1":
+                    term = f"g{out}"
+                elif partial == "-1":
+                    term = f"-g{out}"
+                elif partial.isidentifier():
+                    term = f"g{out} * {partial}"
+                else:
+                    term = f"g{out} * ({partial})"
+                if slot in assigned:
+                    # not '+=', which would modify an array shared with another adjoint
+                    lines.append(f"    g{slot} = g{slot} + {term}")
+                else:
+                    lines.append(f"    g{slot} = {term}")
+                    assigned.add(slot)
+        gradient = ", ".join(f"g{slot}" if slot in assigned else "0.0" for slot in inputs)
+        lines.append(f"    {row} = _stack([{gradient}])")
+        return lines
+
+    def __repr__(self):
+        return f"GeneratedFunction(inputs = {self._inputs})"
+
+    def __call__(self, *args):
+        """Evaluate the function at new values of the inputs. Same as the 'value' method."""
+        return self._value(*args)
+
+    @property
+    def source(self):
+        """Get the generated source code."""
+        return self._source
+
+    @property
+    def inputs(self):
+        """Get the number of inputs of the function."""
+        return self._inputs
+
+    def value(self, *args):
+        """Evaluate the function at new values of the inputs.
+
+        Args:
+            args (int, float, or numpy.ndarray): values of the inputs
+
+        Returns:
+            int, float, or numpy.ndarray: value of the function, or array of the values of each output
+                                          (along the last axis) for functions returning a list or tuple
+        """
+        return self._value(*args)
+
+    def derivative(self, *args):
+        """Compute the derivative of the function at new values of the inputs.
+
+        Args:
+            args (int, float, or numpy.ndarray): values of the inputs
+
+        Returns:
+            numpy.ndarray: gradient of the function (partial derivatives along the last axis), or the
+                           Jacobian (one row per output) for functions returning a list or tuple
+        """
+        return self._value_and_derivative(*args)[1]
+
+    def value_and_derivative(self, *args):
+        """Compute the value and derivative of the function at new values of the inputs.
+
+        Args:
+            args (int, float, or numpy.ndarray): values of the inputs
+
+        Returns:
+            tuple: value and derivative of the function, as returned by 'value' and 'derivative'
+        """
+        return self._value_and_derivative(*args)
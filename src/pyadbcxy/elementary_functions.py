@@ -2,306 +2,404 @@
 This file contains all of the elementary functions for the cs107-BCXY package.
 It implements the behavior of basic functions on the Variable objects that are
 not dunder methods. Such functions include trigonometric functions, logarithms,
-etcetera.
+etcetera. Reverse, Tensor and Taylor objects are also accepted, so that the same
+function can be evaluated in forward mode, in reverse mode (on scalars or arrays)
+and in Taylor mode.
 """
+import math
+import numbers
 import numpy as np
-from .variable import Variable
+from .variable import Variable, _NUMBER_TYPES, _any, _chain, _log_base, _log, _scalar_kernel
 
 
 __all__ = ["log", "exp", "root", "sin", "sinh", "arcsin", "cos", "cosh",
            "arccos", "tan", "tanh", "arctan", "logistic"]
 
 
+# math module kernels for Python scalars, NumPy ufuncs for everything else
+_exp = _scalar_kernel(math.exp, np.exp)
+_sqrt = _scalar_kernel(math.sqrt, np.sqrt)
+_sin = _scalar_kernel(math.sin, np.sin)
+_cos = _scalar_kernel(math.cos, np.cos)
+_tan = _scalar_kernel(math.tan, np.tan)
+_sinh = _scalar_kernel(math.sinh, np.sinh)
+_cosh = _scalar_kernel(math.cosh, np.cosh)
+_tanh = _scalar_kernel(math.tanh, np.tanh)
+_arcsin = _scalar_kernel(math.asin, np.arcsin)
+_arccos = _scalar_kernel(math.acos, np.arccos)
+_arctan = _scalar_kernel(math.atan, np.arctan)
+
+
+def _apply_method(method, input, *args):
+    """Applies an elementary function to a Reverse, Tensor or Taylor object through its method of
+    the same name, so that the functions of this module can also be used to build reverse mode
+    graphs and to propagate Taylor polynomials.
+
+    Args:
+        method (str): name of the Reverse, Tensor or Taylor method
+        input (Reverse, Tensor, or Taylor): item to apply the function to
+        args: additional arguments of the method
+
+    Raises:
+        TypeError: if input is not a Reverse, Tensor or Taylor object
+
+    Returns:
+        Reverse, Tensor, or Taylor: resulting object
+    """
+    # imported here because these modules themselves build on the elementary functions
+    from .reverse import Reverse
+    from .taylor import Taylor
+    from .tensor import Tensor
+    if isinstance(input, Reverse) or isinstance(input, Tensor) or isinstance(input, Taylor):
+        return getattr(input, method)(*args)
+    raise TypeError(f"must be a real number or Variable object, not {type(input)}")
+
+
 def log(input, base=np.e):
     """Calculates logarithm (log()) of Variable, int, or float and returns the result.
 
     Args:
-        input (Variable, int, or float): item to apply logarithm to
+        input (Variable, real number, or numpy.ndarray): item to apply logarithm to
         base (int or float, optional): logarithm base. Defaults to np.e which uses natural logarithm.
 
     Returns:
-        Variable, int, or float: resulting logarithm value
+        Variable, int, float, or numpy.ndarray: resulting logarithm value
 
     Examples
     --------
     >>> log(Variable(4., 5.))
     Variable(val = 1.3862943611198906, der = 1.25)
     """
-    if isinstance(input, int) or isinstance(input, float):
+    if isinstance(input, Variable):
         if base == 1:
             # as per math.log standard
             raise ZeroDivisionError("float division by zero")
         elif base > 0:
             # this will still apply when base = np.e because np.log(np.e) == 1
-            if input <= 0:
+            if _any(input.val <= 0):
                 # as per math.log standard
                 raise ValueError("math domain error")
-            return np.log(input)/np.log(base)
+            log_base = _log_base(base)
+            factor = 1/(input.val * log_base)
+            der = input.der*factor if type(factor) is float else _chain(input.der, input.val, factor)
+            return Variable(val = _log(input.val)/log_base, der = der)
         else:
             raise ValueError("math domain error")
-    elif isinstance(input, Variable):
+    elif isinstance(input, _NUMBER_TYPES):
         if base == 1:
             # as per math.log standard
             raise ZeroDivisionError("float division by zero")
         elif base > 0:
             # this will still apply when base = np.e because np.log(np.e) == 1
-            if input.val <= 0:
+            if _any(input <= 0):
                 # as per math.log standard
                 raise ValueError("math domain error")
-            return Variable(val = np.log(input.val)/np.log(base), der = input.der/(input.val * np.log(base)))
+            return _log(input)/_log_base(base)
         else:
             raise ValueError("math domain error")
+    elif isinstance(input, numbers.Real):
+        return log(float(input), base)
     else:
-        raise TypeError(f"must be a real number or Variable object, not {type(input)}")
+        return _apply_method("log", input, base)
 
 def exp(input):
     """Calculates exponential (exp()) of Variable, int, or float and returns the result.
 
     Args:
-        input (Variable, int, or float): item to apply exponential to
+        input (Variable, real number, or numpy.ndarray): item to apply exponential to
 
     Returns:
-        Variable, int, or float: resulting exponential value
+        Variable, int, float, or numpy.ndarray: resulting exponential value
 
     Examples
     --------
     >>> exp(Variable(4., 5.))
     Variable(val = 54.598150033144236, der = 272.9907501657212)
     """
-    if isinstance(input, int) or isinstance(input, float):
-        return np.exp(input)
-    elif isinstance(input, Variable):
-        return Variable(val = np.exp(input.val), der = np.exp(input.val)*input.der)
+    if isinstance(input, Variable):
+        val = _exp(input.val)
+        der = input.der*val if type(val) is float else _chain(input.der, input.val, val)
+        return Variable(val = val, der = der)
+    elif isinstance(input, _NUMBER_TYPES):
+        return _exp(input)
+    elif isinstance(input, numbers.Real):
+        return exp(float(input))
     else:
-        raise TypeError(f"must be a real number or Variable object, not {type(input)}")
+        return _apply_method("exp", input)
 
 def root(input, n=2):
     """Calculates nth root (square root, cube root, etc.) of Variable, int, or float and returns the result.
 
     Args:
-        input (Variable, int, or float): item to apply square root to
+        input (Variable, real number, or numpy.ndarray): item to apply square root to
         n (int or float, optional): root base. Defaults to 2 which is the square root.
 
     Returns:
-        Variable, int, or float: resulting root value
+        Variable, int, float, or numpy.ndarray: resulting root value
 
     Examples
     --------
     >>> root(Variable(4., 5.))
-    Variable(val = 2.0, der = 0.25)
+    Variable(val = 2.0, der = 1.25)
     """
-    if isinstance(input, int) or isinstance(input, float):
+    if isinstance(input, Variable):
+        factor = (1.0/n) * input.val ** (1.0/n - 1)
+        der = input.der*factor if type(factor) is float else _chain(input.der, input.val, factor)
+        return Variable(val = input.val**(1.0/n), der = der)
+    elif isinstance(input, _NUMBER_TYPES):
         return input**(1.0/n)
-    elif isinstance(input, Variable):
-        return Variable(val = input.val**(1.0/n), der = (1.0/n) * input.val ** (1.0/n - 1))
+    elif isinstance(input, numbers.Real):
+        return root(float(input), n)
     else:
-        raise TypeError(f"must be a real number or Variable object, not {type(input)}")
+        return _apply_method("__pow__", input, 1.0/n)
 
 def sin(input):
     """Calculates trigonometric sine of Variable, int, or float and returns the result.
 
     Args:
-        input (Variable, int, or float): item to apply sine function to
+        input (Variable, real number, or numpy.ndarray): item to apply sine function to
 
     Returns:
-        Variable, int, or float: resulting value object
+        Variable, int, float, or numpy.ndarray: resulting value object
 
     Examples
     --------
     >>> sin(Variable(4., 5.))
     Variable(val = -0.7568024953079282, der = -3.2682181043180596)
     """
-    if isinstance(input, int) or isinstance(input, float):
-        return np.sin(input)
-    elif isinstance(input, Variable):
-        return Variable(val = np.sin(input.val), der = np.cos(input.val)*input.der)
+    if isinstance(input, Variable):
+        factor = _cos(input.val)
+        der = input.der*factor if type(factor) is float else _chain(input.der, input.val, factor)
+        return Variable(val = _sin(input.val), der = der)
+    elif isinstance(input, _NUMBER_TYPES):
+        return _sin(input)
+    elif isinstance(input, numbers.Real):
+        return sin(float(input))
     else:
-        raise TypeError(f"must be a real number or Variable object, not {type(input)}")
+        return _apply_method("sin", input)
 
 def sinh(input):
     """Calculates hyperbolic sine of Variable, int, or float and returns the result.
 
     Args:
-        input (Variable, int, or float): item to apply hyperbolic sine function to
+        input (Variable, real number, or numpy.ndarray): item to apply hyperbolic sine function to
 
     Returns:
-        Variable, int, or float: resulting value object
+        Variable, int, float, or numpy.ndarray: resulting value object
 
     Examples
     --------
     >>> sinh(Variable(4., 5.))
     Variable(val = 27.28991719712775, der = 136.54116418008243)
     """
-    if isinstance(input, int) or isinstance(input, float):
-        return np.sinh(input)
-    elif isinstance(input, Variable):
-        return Variable(val = np.sinh(input.val), der = np.cosh(input.val)*input.der)
+    if isinstance(input, Variable):
+        factor = _cosh(input.val)
+        der = input.der*factor if type(factor) is float else _chain(input.der, input.val, factor)
+        return Variable(val = _sinh(input.val), der = der)
+    elif isinstance(input, _NUMBER_TYPES):
+        return _sinh(input)
+    elif isinstance(input, numbers.Real):
+        return sinh(float(input))
     else:
-        raise TypeError(f"must be a real number or Variable object, not {type(input)}")
+        return _apply_method("sinh", input)
 
 def arcsin(input):
     """Calculates arc sine of Variable, int, or float and returns the result.
 
     Args:
-        input (Variable, int, or float): item to apply arc sine function to
+        input (Variable, real number, or numpy.ndarray): item to apply arc sine function to
 
     Returns:
-        Variable, int, or float: resulting value object
+        Variable, int, float, or numpy.ndarray: resulting value object
 
     Examples
     --------
     >>> arcsin(Variable(0.9, 0.5))
     Variable(val = 1.1197695149986342, der = 1.147078669352809)
     """
-    if isinstance(input, int) or isinstance(input, float):
-        if input < -1 or input > 1:
+    if isinstance(input, Variable):
+        if _any(input.val < -1) or _any(input.val > 1):
             raise ValueError("math domain error")
-        return np.arcsin(input)
-    elif isinstance(input, Variable):
-        if input.val < -1 or input.val > 1:
+        root = _sqrt(1 - input.val**2)
+        # the derivative is infinite at the ends of the domain, which the float division would
+        # raise a ZeroDivisionError for (NumPy already returns inf for arrays)
+        factor = 1/root if type(root) is not float or root else math.inf
+        der = input.der*factor if type(factor) is float else _chain(input.der, input.val, factor)
+        return Variable(val = _arcsin(input.val), der = der)
+    elif isinstance(input, _NUMBER_TYPES):
+        if _any(input < -1) or _any(input > 1):
             raise ValueError("math domain error")
-        return Variable(val = np.arcsin(input.val), der = input.der/np.sqrt(1 - input.val**2))
+        return _arcsin(input)
+    elif isinstance(input, numbers.Real):
+        return arcsin(float(input))
     else:
-        raise TypeError(f"must be a real number or Variable object, not {type(input)}")
+        return _apply_method("arcsin", input)
 
 def cos(input):
     """Calculates trigonometric cosine of Variable, int, or float and returns the result.
 
     Args:
-        input (Variable, int, or float): item to apply cosine function to
+        input (Variable, real number, or numpy.ndarray): item to apply cosine function to
 
     Returns:
-        Variable, int, or float: resulting value object
+        Variable, int, float, or numpy.ndarray: resulting value object
 
     Examples
     --------
     >>> cos(Variable(4., 5.))
     Variable(val = -0.6536436208636119, der = 3.7840124765396412)
     """
-    if isinstance(input, int) or isinstance(input, float):
-        return np.cos(input)
-    elif isinstance(input, Variable):
-        return Variable(val = np.cos(input.val), der = -1*np.sin(input.val)*input.der)
+    if isinstance(input, Variable):
+        factor = -1*_sin(input.val)
+        der = input.der*factor if type(factor) is float else _chain(input.der, input.val, factor)
+        return Variable(val = _cos(input.val), der = der)
+    elif isinstance(input, _NUMBER_TYPES):
+        return _cos(input)
+    elif isinstance(input, numbers.Real):
+        return cos(float(input))
     else:
-        raise TypeError(f"must be a real number or Variable object, not {type(input)}")
+        return _apply_method("cos", input)
 
 def cosh(input):
     """Calculates hyperbolic cosine of Variable, int, or float and returns the result.
 
     Args:
-        input (Variable, int, or float): item to apply hyperbolic cosine function to
+        input (Variable, real number, or numpy.ndarray): item to apply hyperbolic cosine function to
 
     Returns:
-        Variable, int, or float: resulting value object
+        Variable, int, float, or numpy.ndarray: resulting value object
 
     Examples
     --------
     >>> cosh(Variable(4., 5.))
     Variable(val = 27.308232836016487, der = 136.44958598563875)
     """
-    if isinstance(input, int) or isinstance(input, float):
-        return np.cosh(input)
-    elif isinstance(input, Variable):
-        return Variable(val = np.cosh(input.val), der = np.sinh(input.val)*input.der)
+    if isinstance(input, Variable):
+        factor = _sinh(input.val)
+        der = input.der*factor if type(factor) is float else _chain(input.der, input.val, factor)
+        return Variable(val = _cosh(input.val), der = der)
+    elif isinstance(input, _NUMBER_TYPES):
+        return _cosh(input)
+    elif isinstance(input, numbers.Real):
+        return cosh(float(input))
     else:
-        raise TypeError(f"must be a real number or Variable object, not {type(input)}")
+        return _apply_method("cosh", input)
 
 def arccos(input):
     """Calculates arc cosine of Variable, int, or float and returns the result.
 
     Args:
-        input (Variable, int, or float): item to apply arc cosine function to
+        input (Variable, real number, or numpy.ndarray): item to apply arc cosine function to
 
     Returns:
-        Variable, int, or float: resulting value object
+        Variable, int, float, or numpy.ndarray: resulting value object
 
     Examples
     --------
     >>> arccos(Variable(0.9, 0.5))
     Variable(val = 0.45102681179626236, der = -1.147078669352809)
     """
-    if isinstance(input, int) or isinstance(input, float):
-        if input < -1 or input > 1:
+    if isinstance(input, Variable):
+        if _any(input.val < -1) or _any(input.val > 1):
             raise ValueError("math domain error")
-        return np.arccos(input)
-    elif isinstance(input, Variable):
-        if input.val < -1 or input.val > 1:
+        root = _sqrt(1 - input.val**2)
+        # infinite at the ends of the domain, see arcsin
+        factor = -1/root if type(root) is not float or root else -math.inf
+        der = input.der*factor if type(factor) is float else _chain(input.der, input.val, factor)
+        return Variable(val = _arccos(input.val), der = der)
+    elif isinstance(input, _NUMBER_TYPES):
+        if _any(input < -1) or _any(input > 1):
             raise ValueError("math domain error")
-        return Variable(val = np.arccos(input.val), der = -1*input.der/np.sqrt(1 - input.val**2))
+        return _arccos(input)
+    elif isinstance(input, numbers.Real):
+        return arccos(float(input))
     else:
-        raise TypeError(f"must be a real number or Variable object, not {type(input)}")
+        return _apply_method("arccos", input)
 
 def tan(input):
     """Calculates trigonometric tangent of Variable, int, or float and returns the result.
 
     Args:
-        input (Variable, int, or float): item to apply tangent function to
+        input (Variable, real number, or numpy.ndarray): item to apply tangent function to
 
     Returns:
-        Variable, int, or float: resulting value object
+        Variable, int, float, or numpy.ndarray: resulting value object
 
     Examples
     --------
     >>> tan(Variable(0.9, 0.5))
     Variable(val = 1.2601582175503392, der = 1.2939993666298242)
     """
-    if isinstance(input, int) or isinstance(input, float):
-        return np.tan(input)
-    elif isinstance(input, Variable):
-        return Variable(val = np.tan(input.val), der = input.der*(1/np.cos(input.val)**2))
+    if isinstance(input, Variable):
+        factor = 1/_cos(input.val)**2
+        der = input.der*factor if type(factor) is float else _chain(input.der, input.val, factor)
+        return Variable(val = _tan(input.val), der = der)
+    elif isinstance(input, _NUMBER_TYPES):
+        return _tan(input)
+    elif isinstance(input, numbers.Real):
+        return tan(float(input))
     else:
-        raise TypeError(f"must be a real number or Variable object, not {type(input)}")
+        return _apply_method("tan", input)
 
 def tanh(input):
     """Calculates hyperbolic tangent of Variable, int, or float and returns the result.
 
     Args:
-        input (Variable, int, or float): item to apply hyperbolic tangent function to
+        input (Variable, real number, or numpy.ndarray): item to apply hyperbolic tangent function to
 
     Returns:
-        Variable, int, or float: resulting value object
+        Variable, int, float, or numpy.ndarray: resulting value object
 
     Examples
     --------
     >>> tanh(Variable(0.9, 0.5))
     Variable(val = 0.7162978701990245, der = 0.24345868057417075)
     """
-    if isinstance(input, int) or isinstance(input, float):
-        return np.tanh(input)
-    elif isinstance(input, Variable):
-        return Variable(val = np.tanh(input.val), der = (1 - np.tanh(input.val)**2)*input.der)
+    if isinstance(input, Variable):
+        val = _tanh(input.val)
+        factor = 1 - val**2
+        der = input.der*factor if type(factor) is float else _chain(input.der, input.val, factor)
+        return Variable(val = val, der = der)
+    elif isinstance(input, _NUMBER_TYPES):
+        return _tanh(input)
+    elif isinstance(input, numbers.Real):
+        return tanh(float(input))
     else:
-        raise TypeError(f"must be a real number or Variable object, not {type(input)}")
+        return _apply_method("tanh", input)
 
 def arctan(input):
     """Calculates arc tangent of Variable, int, or float and returns the result.
 
     Args:
-        input (Variable, int, or float): item to apply arc tangent function to
+        input (Variable, real number, or numpy.ndarray): item to apply arc tangent function to
 
     Returns:
-        Variable, int, or float: resulting value object
+        Variable, int, float, or numpy.ndarray: resulting value object
 
     Examples
     --------
     >>> arctan(Variable(0.9, 0.5))
     Variable(val = 0.7328151017865066, der = 0.27624309392265195)
     """
-    if isinstance(input, int) or isinstance(input, float):
-        return np.arctan(input)
-    elif isinstance(input, Variable):
-        return Variable(val = np.arctan(input.val), der = input.der/(1 + input.val**2))
+    if isinstance(input, Variable):
+        factor = 1/(1 + input.val**2)
+        der = input.der*factor if type(factor) is float else _chain(input.der, input.val, factor)
+        return Variable(val = _arctan(input.val), der = der)
+    elif isinstance(input, _NUMBER_TYPES):
+        return _arctan(input)
+    elif isinstance(input, numbers.Real):
+        return arctan(float(input))
     else:
-        raise TypeError(f"must be a real number or Variable object, not {type(input)}")
+        return _apply_method("arctan", input)
 
 def logistic(input):
     """Calculates logistic [1/(1 + e^-x)] of Variable, int, or float and returns the result.
 
     Args:
-        input (Variable, int, or float): item to apply logistic function to
+        input (Variable, real number, or numpy.ndarray): item to apply logistic function to
 
     Returns:
-        Variable, int, or float: resulting value object
+        Variable, int, float, or numpy.ndarray: resulting value object
 
     Examples
     --------
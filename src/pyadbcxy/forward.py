@@ -1,10 +1,183 @@
 """
 This file contains the Forward module for the cs107-BCXY package. It includes the Forward class,
-which implements the forward mode of automatic differentiation.
+which implements the forward mode of automatic differentiation, and the jvp function, which
+computes Jacobian-vector products without forming the Jacobian.
 """
+import os
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from .variable import Variable
 
 
-__all__ = ["Forward"]
+__all__ = ["Forward", "jvp"]
+
+
+def _batch_shape(vals):
+    """Get the shape the values of several inputs broadcast to. Unlike np.broadcast, this is not
+    limited to 64 inputs.
+
+    Args:
+        vals (list): int, float, or numpy.ndarray values
+
+    Returns:
+        tuple: broadcast shape, () if every value is a number
+    """
+    shape = ()
+    for val in vals:
+        if isinstance(val, np.ndarray) and val.shape != shape:
+            shape = np.broadcast(np.empty(shape), val).shape
+    return shape
+
+
+def _stack(items):
+    """Stack the values of several outputs or inputs along a new last axis.
+
+    Args:
+        items (list): numbers or numpy arrays
+
+    Returns:
+        numpy.ndarray: stacked items
+    """
+    for item in items:
+        if isinstance(item, np.ndarray):
+            return np.stack(np.broadcast_arrays(*items), axis=-1)
+    return np.array(items)
+
+
+# statistics of a result cache, as returned by the 'cache_info' methods
+_CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+
+def _cache_key(items):
+    """Get a hashable key identifying the values and derivatives of the inputs of a function.
+
+    Args:
+        items (list): int, float, numpy.ndarray, list, or tuple values
+
+    Returns:
+        tuple: key of the items, holding the type of each number (so that 1 and 1.0, whose
+               results differ in type, have different keys) and the bytes of each array
+    """
+    key = []
+    for item in items:
+        if isinstance(item, list) or isinstance(item, tuple):
+            item = np.asarray(item)
+        if isinstance(item, np.ndarray):
+            key.append((item.shape, item.dtype.str, item.tobytes()))
+        else:
+            key.append((type(item), item))
+    return tuple(key)
+
+
+class _ResultCache(object):
+    """Least recently used cache of the results of a function, keyed by its inputs, with the
+    statistics of its lookups."""
+
+    def __init__(self, maxsize):
+        """Constructor for the _ResultCache class.
+
+        Args:
+            maxsize (int or None): maximum number of results, None for no limit
+
+        Raises:
+            ValueError: if maxsize is negative
+        """
+        if maxsize is not None and maxsize < 0:
+            raise ValueError(f"cache_size cannot be negative, not {maxsize}")
+        self._maxsize = maxsize
+        self._entries = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def enabled(self):
+        """Whether results are stored, which is not the case for a maximum size of 0."""
+        return self._maxsize != 0
+
+    def get(self, key):
+        """Get the result stored for a key and mark it as the most recently used one.
+
+        Returns:
+            tuple or None: stored result, None on a miss
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self._misses += 1
+            return None
+        self._hits += 1
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key, entry):
+        """Store the result for a key, evicting the least recently used results beyond the maximum size."""
+        if not self.enabled:
+            return
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        if self._maxsize is not None:
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Remove every stored result and reset the statistics."""
+        self._entries.clear()
+        self._hits = 0
+        self._misses = 0
+
+    def info(self):
+        """Get the number of hits and misses, the maximum size and the current size."""
+        return _CacheInfo(self._hits, self._misses, self._maxsize, len(self._entries))
+
+
+# function and seed derivatives of a worker process of Forward.map, set once per worker
+_worker_state = None
+
+
+def _init_worker(func, ders):
+    """Initialize a worker process of Forward.map. The function is sent (pickled if the start
+    method requires it) once per worker rather than once per chunk of points.
+
+    Args:
+        func (function): function of interest
+        ders (list): derivatives the inputs are seeded with
+    """
+    global _worker_state
+    _worker_state = (func, ders)
+
+
+def _evaluate_points(func, ders, points):
+    """Evaluate the value and derivative of a function at several points, one point at a time.
+
+    Args:
+        func (function): function of interest
+        ders (list): derivatives the inputs are seeded with
+        points (list): values of the inputs at each point
+
+    Returns:
+        tuple: list of the values and list of the derivatives at each point
+    """
+    values, derivatives = [], []
+    for point in points:
+        fmode = Forward(func, [Variable(val, der) for val, der in zip(point, ders)])
+        fmode.calculate()
+        values.append(fmode.value)
+        derivatives.append(fmode.derivative)
+    return values, derivatives
+
+
+def _evaluate_chunk(start, points):
+    """Evaluate a chunk of points in a worker process of Forward.map.
+
+    Args:
+        start (int): index of the first point of the chunk
+        points (list): values of the inputs at each point
+
+    Returns:
+        tuple: index of the first point, list of the values and list of the derivatives
+    """
+    func, ders = _worker_state
+    return (start,) + _evaluate_points(func, ders, points)
 
 
 class Forward(object):
@@ -24,7 +197,7 @@ class Forward(object):
     >>> fmode.value
     9
     >>> fmode.derivative
-    6
+    6.0
     # A rather complicated function with a single variable
     >>> fmode = Forward(lambda x: (exp(cos(x)))/(sin(x)**2), Variable(3))
     >>> fmode.calculate()
@@ -32,15 +205,42 @@ class Forward(object):
     18.658405892057388
     >>> fmode.derivative
     259.153784690042
+    # Evaluate a batch of points at once with array-valued Variables
+    >>> fmode = Forward(lambda x, y: x*y, (Variable(np.array([1., 2.])), Variable(np.array([3., 4.]))))
+    >>> fmode.calculate()
+    >>> fmode.value
+    array([3., 8.])
+    >>> fmode.derivative
+    array([[3., 1.],
+           [4., 2.]])
+    # Memoize the results of repeated evaluations at the same points
+    >>> fmode = Forward(lambda x: x**2, Variable(3), cache_size=128)
+    >>> fmode.calculate()
+    >>> fmode.calculate()
+    >>> fmode.cache_info()
+    CacheInfo(hits=1, misses=1, maxsize=128, currsize=1)
+    # Jacobian of a function with several outputs, from a single evaluation
+    >>> fmode = Forward(lambda x, y: [x*y, x + y, sin(x)], (Variable(1.), Variable(2.)))
+    >>> fmode.calculate()
+    >>> fmode.value
+    array([2.        , 3.        , 0.84147098])
+    >>> fmode.derivative
+    array([[2.        , 1.        ],
+           [1.        , 1.        ],
+           [0.54030231, 0.        ]])
     """
 
-    def __init__(self, func, vars):
+    def __init__(self, func, vars, cache_size=0):
         """Constructor for the Forward class.
 
         Args:
             func (function): function of interest
             vars (Variable, list, or tuple): Variable object or list/tuple of Variables
                                              to evaluate the function
+            cache_size (int or None, optional): number of results of 'calculate' kept in a least
+                                                recently used cache keyed by the values and
+                                                derivatives of the Variables, None for no limit.
+                                                Defaults to 0, which disables the cache.
         """
         self._func = func
         if not isinstance(vars, list) and not isinstance(vars, tuple):
@@ -48,6 +248,7 @@ class Forward(object):
         else:
             self._vars = vars
         self._res = None
+        self._cache = _ResultCache(cache_size)
 
     @property
     def func(self):
@@ -76,6 +277,9 @@ class Forward(object):
         >>> fmode.func = g
         """
         self._func = func
+        # results of the previous function are stale
+        self._res = None
+        self._cache.clear()
 
     @vars.setter
     def vars(self, vars):
@@ -99,11 +303,168 @@ class Forward(object):
             self._vars = [vars]
         else:
             self._vars = vars
+        # results of the previous Variables are stale
+        self._res = None
+        self._cache.clear()
+
+    def _seed(self):
+        """Create copies of the Variables whose derivatives are seed vectors.
+
+        The ith Variable is seeded with its own derivative times the ith unit vector,
+        so that a single evaluation of the function carries all of the partial
+        derivatives at once.
+
+        Returns:
+            list: seeded copies of the Variables
+        """
+        var_count = len(self._vars)
+        # batched Variables hold arrays of values; the seed axis comes last so that the
+        # derivatives broadcast against the values, and so do arrays created by the function
+        batch_shape = _batch_shape([var.val for var in self._vars])
+        seeded = []
+        for i, var in enumerate(self._vars):
+            der = np.zeros(batch_shape + (var_count,))
+            der[..., i] = var.der
+            seeded.append(Variable(var.val, der))
+        return seeded
 
     def calculate(self):
-        """Evaluate the given function with the Variables"""
-        self._res = self._func(*self._vars) # will be a Variable object
+        """Evaluate the given function with the Variables. The full gradient is
+        obtained from this single evaluation by seeding each Variable with a unit vector.
+        If the cache is enabled and the function was already evaluated at the same values and
+        derivatives of the Variables, the stored result is used instead.
+        """
+        key = None
+        if self._cache.enabled:
+            key = _cache_key([item for var in self._vars for item in (var.val, var.der)])
+            entry = self._cache.get(key)
+            if entry is not None:
+                self._res = entry[0]
+                return
+        self._res = self._func(*self._seed()) # a Variable object, or a list/tuple/array of them
+        if key is not None:
+            self._cache.put(key, (self._res,))
+
+    def cache_info(self):
+        """Get the statistics of the cache of results.
+
+        Returns:
+            CacheInfo: named tuple of the number of hits and misses, the maximum size and the
+                       current size of the cache
+        """
+        return self._cache.info()
+
+    def cache_clear(self):
+        """Remove every result from the cache and reset its statistics."""
+        self._cache.clear()
+
+    def map(self, points, processes=None, chunksize=None, ordered=True):
+        """Evaluate the value and derivative of the function at many input points in parallel,
+        across a pool of worker processes. The points are split into chunks, each worker receiving
+        the function once and then one chunk of points at a time. The inputs are seeded with the
+        derivatives of the Variables of the Forward instance, as in 'calculate', so the Variables
+        set the number of inputs and their seeds while the points replace their values.
+
+        On platforms that start worker processes by spawning (Windows, macOS), the function must
+        be picklable, e.g. defined at the top level of a module, and the call must be guarded by
+        ``if __name__ == "__main__"``.
+
+        Args:
+            points (iterable or numpy.ndarray): input points, each a list/tuple with one value per
+                                                Variable, or a number when there is a single Variable;
+                                                an array with one point per row
+            processes (int, optional): number of worker processes. Defaults to None, which uses the
+                                       number of CPUs. With 1, the points are evaluated in this process.
+            chunksize (int, optional): number of points sent to a worker at a time. Defaults to None,
+                                       which splits the points into about four chunks per worker.
+            ordered (bool, optional): whether the results follow the order of the points. Defaults
+                                      to True. Otherwise, they are stacked in the order the chunks
+                                      complete, which is enough for aggregates such as sums.
+
+        Raises:
+            ValueError: if a point does not have one value per Variable
+
+        Returns:
+            tuple: array of the values and array of the derivatives at each point (one row per
+                   point, with one column per Variable when there are several)
+
+        Examples
+        --------
+        >>> import operator
+        >>> fmode = Forward(operator.mul, [Variable(0), Variable(0)])
+        >>> values, derivatives = fmode.map([(1, 2), (3, 4)], processes=2)
+        >>> values
+        array([ 2, 12])
+        >>> derivatives
+        array([[2., 1.],
+               [4., 3.]])
+        """
+        var_count = len(self._vars)
+        points = [point if isinstance(point, (list, tuple, np.ndarray)) else (point,) for point in points]
+        for point in points:
+            if len(point) != var_count:
+                raise ValueError(f"every point must have {var_count} value(s), one per Variable, not {len(point)}")
+        ders = [var.der for var in self._vars]
+        if processes is None:
+            processes = os.cpu_count() or 1
+        if processes == 1 or len(points) <= 1:
+            values, derivatives = _evaluate_points(self._func, ders, points)
+            return np.array(values), np.array(derivatives)
+        if chunksize is None:
+            chunksize = max(1, -(-len(points) // (4 * processes)))
+        values, derivatives = [None] * len(points), [None] * len(points)
+        completed = 0
+        with ProcessPoolExecutor(processes, initializer=_init_worker, initargs=(self._func, ders)) as executor:
+            futures = [executor.submit(_evaluate_chunk, start, points[start:start + chunksize])
+                       for start in range(0, len(points), chunksize)]
+            for future in (futures if ordered else as_completed(futures)):
+                start, chunk_values, chunk_derivatives = future.result()
+                if not ordered:
+                    # place the chunks one after the other as they complete
+                    start, completed = completed, completed + len(chunk_values)
+                values[start:start + len(chunk_values)] = chunk_values
+                derivatives[start:start + len(chunk_derivatives)] = chunk_derivatives
+        return np.array(values), np.array(derivatives)
+
+    def _outputs(self):
+        """Get the outputs of the function as a list if it returned several of them.
+
+        Raises:
+            AttributeError: if 'calculate' method has not been called
+
+        Returns:
+            list or None: outputs of the function, or None if it returned a single output
+        """
+        if self._res is None:
+            raise AttributeError("value and derivative have not been calculated yet, call 'calculate' method")
+        if isinstance(self._res, list) or isinstance(self._res, tuple):
+            return list(self._res)
+        if isinstance(self._res, np.ndarray) and self._res.dtype == object:
+            # arrays of Variables are flattened
+            return list(self._res.ravel())
+        return None
+
+    @staticmethod
+    def _gradient(res, var_count, batch_shape):
+        """Get the partial derivatives of one output with respect to every Variable.
+
+        Args:
+            res (Variable, int, or float): output of the function
+            var_count (int): number of Variables
+            batch_shape (tuple): shape the values of the Variables broadcast to
 
+        Returns:
+            numpy.ndarray: partial derivatives along the last axis
+        """
+        val = res.val if isinstance(res, Variable) else res
+        shape = batch_shape
+        if isinstance(val, np.ndarray) and val.shape != batch_shape:
+            # the function created arrays that broadcast against the values of the Variables
+            shape = np.broadcast(np.empty(batch_shape), val).shape
+        if isinstance(res, Variable):
+            # the seed vectors carry every partial derivative in a single derivative vector
+            return np.broadcast_to(res.der, shape + (var_count,))
+        return np.zeros(shape + (var_count,))
 
     @property
     def value(self):
@@ -113,44 +474,95 @@ class Forward(object):
             ValueError: if 'calculate' method has not been called
 
         Returns:
-            float or int: value of the function evaluated at the Variable
+            float, int, or numpy.ndarray: value of the function evaluated at the Variable, or array
+                                          of the values of each output (along the last axis) for
+                                          functions returning several outputs
         """
-        if not self._res:
-            raise AttributeError("value and derivative have not been calculated yet, call 'calculate' method")
+        outputs = self._outputs()
+        if outputs is not None:
+            return _stack([output.val if isinstance(output, Variable) else output for output in outputs])
+        if not isinstance(self._res, Variable):
+            # the function does not depend on the Variables
+            return self._res
         return self._res.val
 
     @property
-    def derivative(self, non_differential=False):
+    def derivative(self):
         """Get the derivative of the function evaluated at the Variables.
 
         Raises:
             ValueError: if 'calculate' method has not been called
 
         Returns:
-            float or int: derivative of the function evaluated at the Variable
+            float, list, or numpy.ndarray: derivative of the function evaluated at the Variable,
+                                           or list of partial derivatives for multiple Variables.
+                                           For batched Variables or array values, an array whose
+                                           last axis indexes the Variables. For functions returning
+                                           several outputs, the m x n Jacobian (along the last two
+                                           axes for batched Variables).
         """
-        if not self._res:
-            raise AttributeError("value and derivative have not been calculated yet, call 'calculate' method")
-        if non_differential:
-            return self._res.der
-        if isinstance(self.vars, list) or isinstance(self.vars, tuple):
-            var_count = len(self.vars)
-            der_vector = []
-
-            # goes into a loop where only the ith partial derivatives is treated as a variable
-            # all other variables are treated as only numerical values
-            for i in range(var_count):
-                input_arr = []
-                for j in range(var_count):
-                    if j != i:
-                        input_arr.append(self.vars[j].val)
-                    else:
-                        input_arr.append(self.vars[j])
-                result = self._func(*input_arr)
-                der_vector.append(result.der)
-            if len(der_vector) == 1:
-                return der_vector[0]
-            else:
-                return der_vector
+        outputs = self._outputs()
+        var_count = len(self._vars)
+        batch_shape = _batch_shape([var.val for var in self._vars])
+        if outputs is not None:
+            # every row comes from the same evaluation of the function
+            rows = [self._gradient(output, var_count, batch_shape) for output in outputs]
+            if any(row.shape != rows[0].shape for row in rows):
+                rows = np.broadcast_arrays(*rows)
+            return np.stack(rows, axis=-2)
+        der = self._gradient(self._res, var_count, batch_shape)
+        if der.ndim > 1:
+            if var_count == 1:
+                return np.array(der[..., 0])
+            return np.array(der)
+        der_vector = der.tolist()
+        if len(der_vector) == 1:
+            return der_vector[0]
         else:
-            return self._res.der
+            return der_vector
+
+
+def jvp(func, primals, tangent):
+    """Compute the value of a function and the product of its Jacobian with a tangent vector
+    (directional derivative) without forming the Jacobian. The inputs are seeded with the entries
+    of the tangent instead of unit vectors, so a single evaluation of the function gives the
+    product, whatever the number of inputs and outputs. This is all that iterative solvers such
+    as GMRES or Newton-Krylov methods need from the Jacobian.
+
+    Args:
+        func (function): function of interest, returning a single output or a list/tuple/array of outputs
+        primals (int, float, numpy.ndarray, list, or tuple): value of each input, or a single value
+                                                             for a function of one input
+        tangent (int, float, numpy.ndarray, list, or tuple): entry of the tangent vector for each input,
+                                                             or a single entry for a single value
+
+    Raises:
+        ValueError: if the tangent does not have one entry per input
+
+    Returns:
+        tuple: value of the function and Jacobian-vector product, as numbers (or arrays for batched
+               inputs), or as arrays with one entry per output (along the last axis) for functions
+               returning several outputs
+
+    Examples
+    --------
+    >>> jvp(lambda x, y: x * y + sin(x), (0., 2.), (1., 0.))
+    (0.0, 3.0)
+    >>> jvp(lambda x, y: [x * y, x + y], (1., 2.), (1., 1.))
+    (array([2., 3.]), array([3., 2.]))
+    """
+    if not isinstance(primals, list) and not isinstance(primals, tuple):
+        # a single input, whose tangent is a single entry
+        primals, tangent = [primals], [tangent]
+    if len(tangent) != len(primals):
+        raise ValueError(f"tangent must have {len(primals)} entries, one per input, not {len(tangent)}")
+    res = func(*[Variable(primal, direction) for primal, direction in zip(primals, tangent)])
+    if isinstance(res, np.ndarray) and res.dtype == object:
+        res = list(res.ravel())
+    if isinstance(res, list) or isinstance(res, tuple):
+        return (_stack([output.val if isinstance(output, Variable) else output for output in res]),
+                _stack([output.der if isinstance(output, Variable) else 0.0 for output in res]))
+    if not isinstance(res, Variable):
+        # the function does not depend on its inputs
+        return res, 0.0
+    return res.val, res.der
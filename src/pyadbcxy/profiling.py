@@ -0,0 +1,208 @@
+"""
+This file contains the profiling module for the PyADBCXY package. It includes the Profile class, a
+context manager recording, for every type of operation on Variable and Reverse objects, the number
+of calls, the time spent and the number of nodes allocated, as well as the depth and width of the
+graph built while it is active.
+"""
+import json
+import sys
+import time
+from collections import Counter
+from . import elementary_functions, reverse
+from .variable import Variable
+from .reverse import Reverse
+
+
+__all__ = ["Profile"]
+
+
+# the operators of the Variable class, instrumented as "Variable.<name>"
+_VARIABLE_METHODS = ["__add__", "__radd__", "__sub__", "__rsub__", "__mul__", "__rmul__", "__neg__",
+                     "__truediv__", "__rtruediv__", "__pow__", "__rpow__"]
+
+# the profile currently recording, only one can be active at a time
+_active_profile = None
+
+
+class Profile(object):
+    """
+    This class implements an opt-in profiler of the operations on Variable and Reverse objects.
+    While a Profile is active, it records for each type of operation the number of calls, the
+    cumulative time (including the operations it calls), the self time (excluding them) and the
+    number of nodes (Variable or Reverse objects) it returned, together with the depth (longest
+    chain of operations from an input) and width (largest number of nodes at the same depth) of
+    the graph.
+
+    The operations are instrumented by replacing them with timing wrappers when the Profile is
+    entered, and restored when it exits, so profiling costs nothing while no Profile is active.
+    The Variable operators are recorded as "Variable.__add__", etc., every operation on Reverse
+    objects as "Reverse.add", etc., and the elementary functions by their name. The elementary
+    functions are instrumented in the namespace of every loaded module that refers to them, so
+    this also covers names imported with ``from pyadbcxy import sin`` at the top level of a
+    module. References held elsewhere, e.g. in closures, default arguments, or namespaces that
+    are not modules (such as the globals passed to exec), still call the original functions,
+    which are then not recorded. Since the operations are replaced for the whole process,
+    profiles cannot be nested and should not be used from several threads.
+
+    Examples
+    --------
+    >>> import pyadbcxy as ad
+    >>> with Profile() as profile:
+    ...     x = ad.Variable(0.5)
+    ...     y = ad.sin(x) * x + ad.exp(x)
+    >>> report = profile.report()
+    >>> report["operations"]["sin"]["calls"], report["nodes"], report["depth"]
+    (1, 4, 3)
+    """
+
+    def __init__(self):
+        """Constructor for the Profile class."""
+        self._stats = {}
+        self._stack = []
+        self._depths = {}
+        self._levels = Counter()
+        self._depth = 0
+        self._patches = []
+
+    def __repr__(self):
+        return f"Profile(operations = {len(self._stats)}, nodes = {sum(self._levels.values())})"
+
+    def __enter__(self):
+        global _active_profile
+        if _active_profile is not None:
+            raise RuntimeError("another Profile is already active")
+        _active_profile = self
+        for name in _VARIABLE_METHODS:
+            self._patch(vars(Variable), Variable, name, self._wrap(f"Variable.{name}", vars(Variable)[name]))
+        self._patch(vars(reverse), reverse, "_apply", self._wrap_apply(reverse._apply))
+        # every loaded module referring to an elementary function gets the instrumented version
+        wrappers = {}
+        for name in elementary_functions.__all__:
+            function = getattr(elementary_functions, name)
+            wrappers[id(function)] = (function, self._wrap(name, function))
+        for module in list(sys.modules.values()):
+            namespace = getattr(module, "__dict__", None)
+            if not isinstance(namespace, dict):
+                continue
+            for key, value in list(namespace.items()):
+                entry = wrappers.get(id(value))
+                if entry is not None and entry[0] is value:
+                    self._patch(namespace, module, key, entry[1])
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        global _active_profile
+        for namespace, target, key, original, wrapper in reversed(self._patches):
+            if namespace.get(key) is wrapper:
+                setattr(target, key, original)
+        self._patches = []
+        # the nodes are only referenced while recording, to track the depth of their results
+        self._depths = {}
+        _active_profile = None
+
+    def _patch(self, namespace, target, key, wrapper):
+        """Replace an attribute of a class or module by its instrumented version."""
+        self._patches.append((namespace, target, key, namespace[key], wrapper))
+        setattr(target, key, wrapper)
+
+    def _record(self, name, function, args, kwargs):
+        """Call an operation and record its time and result.
+
+        Args:
+            name (str): name of the operation
+            function (function): original operation
+            args (tuple): arguments of the operation
+            kwargs (dict): keyword arguments of the operation
+
+        Returns:
+            result of the operation
+        """
+        stack = self._stack
+        stack.append(0)
+        start = time.perf_counter_ns()
+        try:
+            result = function(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter_ns() - start
+            # time spent in nested operations, which is not part of the self time
+            nested = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            stats = self._stats.get(name)
+            if stats is None:
+                stats = self._stats[name] = {"calls": 0, "time": 0, "self_time": 0, "nodes": 0}
+            stats["calls"] += 1
+            stats["time"] += elapsed
+            stats["self_time"] += elapsed - nested
+        if isinstance(result, (Variable, Reverse)):
+            stats["nodes"] += 1
+            self._track(result, args)
+        return result
+
+    def _track(self, node, operands):
+        """Record the depth of a new node, one more than the deepest of its operands."""
+        key = id(node)
+        if key in self._depths and self._depths[key][0] is node:
+            # already recorded, e.g. by the elementary function that called this operation
+            return
+        depth = 1
+        for operand in operands:
+            entry = self._depths.get(id(operand))
+            if entry is not None and entry[0] is operand:
+                depth = max(depth, entry[1] + 1)
+        self._depths[key] = (node, depth)
+        self._levels[depth] += 1
+        self._depth = max(self._depth, depth)
+
+    def _wrap(self, name, function):
+        """Instrumented version of a Variable operator or an elementary function."""
+        record = self._record
+        def wrapper(*args, **kwargs):
+            return record(name, function, args, kwargs)
+        wrapper.__name__ = function.__name__
+        wrapper.__doc__ = function.__doc__
+        wrapper.__wrapped__ = function
+        return wrapper
+
+    def _wrap_apply(self, function):
+        """Instrumented version of the function applying every operation to Reverse objects."""
+        record = self._record
+        def wrapper(op, *args):
+            return record(f"Reverse.{op}", function, (op,) + args, {})
+        wrapper.__wrapped__ = function
+        return wrapper
+
+    def report(self):
+        """Get the statistics recorded so far.
+
+        Returns:
+            dict: for each operation ("operations") the number of calls, the time and self time in
+                  seconds and the number of nodes returned, then the number of distinct nodes
+                  ("nodes"), and the depth ("depth") and width ("width") of the graph
+        """
+        operations = {}
+        for name, stats in sorted(self._stats.items(), key=lambda item: -item[1]["self_time"]):
+            operations[name] = {"calls": stats["calls"], "time": stats["time"] * 1e-9,
+                                "self_time": stats["self_time"] * 1e-9, "nodes": stats["nodes"]}
+        return {
+            "operations": operations,
+            "nodes": sum(self._levels.values()),
+            "depth": self._depth,
+            "width": max(self._levels.values()) if self._levels else 0,
+        }
+
+    def to_json(self, path=None, indent=2):
+        """Export the report as JSON.
+
+        Args:
+            path (str, optional): file to write the report to. Defaults to None.
+            indent (int, optional): indentation of the JSON document. Defaults to 2.
+
+        Returns:
+            str: report as a JSON document
+        """
+        document = json.dumps(self.report(), indent=indent)
+        if path is not None:
+            with open(path, "w") as f:
+                f.write(document)
+        return document
@@ -1,11 +1,51 @@
 """
 This file contains the Reverse module for the PyADBCXY package. It includes the Reverse class,
-which implements the reverse mode of automatic differentiation.
+which implements the reverse mode of automatic differentiation, and the vjp function, which
+computes vector-Jacobian products without forming the Jacobian.
 """
+import numbers
 import numpy as np
+from .forward import _ResultCache, _cache_key
+from .tape import Tape, _current_tape, _RULES
 
 
-__all__ = ["Reverse"]
+__all__ = ["Reverse", "ReverseMode", "vjp"]
+
+
+def _apply(op, *args):
+    """Create the Reverse object resulting from an operation and connect it to its operands.
+    The value and the partial derivatives are computed with the rules of the operation.
+
+    If a Tape is active, the operation is appended to the Tape. Otherwise, the result is
+    stored in the list of children of each operand.
+
+    Args:
+        op (str): name of the operation
+        args (Reverse, int, or float): operands of the operation
+
+    Returns:
+        Reverse: resulting Reverse object
+    """
+    forward, partials = _RULES[op]
+    vals = [arg.val if isinstance(arg, Reverse) else arg for arg in args]
+    new_val = forward(*vals)
+    edges = tuple((partials[i](*vals, new_val), arg) for i, arg in enumerate(args) if isinstance(arg, Reverse))
+    new_RevMod = Reverse(new_val)
+    tape = _current_tape()
+    if tape is not None:
+        if len(edges) == len(args):
+            consts = None
+        else:
+            consts = tuple(None if isinstance(arg, Reverse) else arg for arg in args)
+        tape._record(new_RevMod, op, edges, consts)
+    else:
+        for der, parent in edges:
+            if parent._children:
+                parent._children.append((der, new_RevMod))
+            else:
+                parent._children = [(der, new_RevMod)]
+            parent.grad = None
+    return new_RevMod
 
 
 class Reverse:
@@ -23,6 +63,8 @@ class Reverse:
     1
     """
 
+    __slots__ = ("_val", "_grad", "_children", "_tape", "_index")
+
     def __init__(self, val, grad=1):
         """Constructor for Reverse class
 
@@ -32,13 +74,22 @@ class Reverse:
         """
         self._val = val
         self._grad = grad
-        self._children = []
+        # (partial derivative, child) pairs, the list is only allocated for the first child
+        self._children = ()
+        # position of the object on the Tape it was recorded on, if any
+        self._tape = None
+        self._index = None
 
     def __repr__(self):
-        return f"Reverse(val = {self.val}, grad = {self.grad})"
+        return str(self)
 
     def __str__(self):
-        return f"Reverse(val = {self.val}, grad = {self.grad})"
+        try:
+            grad = self.grad
+        except AttributeError:
+            # recorded on a Tape that has not been swept yet
+            grad = None
+        return f"Reverse(val = {self.val}, grad = {grad})"
 
     @property
     def val(self):
@@ -54,7 +105,11 @@ class Reverse:
 
     @property
     def grad(self):
-        """Get the gradient of the Reverse object
+        """Get the gradient of the Reverse object. For an object recorded on a Tape, this is its
+        adjoint from the last reverse sweep of the Tape.
+
+        Raises:
+            AttributeError: if the object was recorded on a Tape that has not been swept since
 
         Examples
         --------
@@ -62,13 +117,80 @@ class Reverse:
         >>> x.grad
         1
         """
-        if self._grad == None:
-            grad = 0
-            for der, child in self._children:
-                grad += der * child.grad
-            self._grad = grad
+        tape = self._tape
+        if tape is not None:
+            if tape._adjoints is not None and self._index < len(tape._adjoints):
+                return tape._adjoints[self._index]
+            raise AttributeError("gradient has not been computed yet, call 'backward' or 'gradient' "
+                                 "on the Tape the Reverse object was recorded on")
+        if self._grad is None:
+            self._accumulate_grad()
         return self._grad
 
+    def _accumulate_grad(self):
+        """Compute the gradient of the Reverse object from the gradients of its children.
+        The graph is traversed with an explicit stack rather than by recursion, so deep
+        graphs do not exceed the recursion limit.
+        """
+        stack = [self]
+        while stack:
+            node = stack[-1]
+            if node._grad is not None:
+                stack.pop()
+                continue
+            pending = [child for _, child in node._children if child._grad is None]
+            if pending:
+                stack.extend(pending)
+                continue
+            stack.pop()
+            grad = 0
+            for der, child in node._children:
+                grad += der * child._grad
+            node._grad = grad
+
+    def zero_grad(self):
+        """Discard the gradients cached in the Reverse object and in every node built from it,
+        so that they are recomputed from the current graph on the next access. The nodes
+        without children keep their gradient, which seeds the computation.
+
+        Examples
+        --------
+        >>> x = Reverse(3)
+        >>> u = x * 2
+        >>> z = u * 3
+        >>> x.grad
+        6
+        >>> w = u * 5
+        >>> x.grad
+        6
+        >>> x.zero_grad()
+        >>> x.grad
+        16
+        """
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if node._children and node._grad is not None:
+                node._grad = None
+                stack.extend(child for _, child in node._children)
+
+    def release(self):
+        """Release every node built from the Reverse object, so that it can be reused as a fresh
+        leaf (e.g. across the iterations of an optimizer) without keeping the old subgraphs alive
+        or summing their stale contributions into its gradient.
+
+        Examples
+        --------
+        >>> x = Reverse(3)
+        >>> z = x * 2
+        >>> x.release()
+        >>> z = x * 5
+        >>> x.grad
+        5
+        """
+        self._children = ()
+        self._grad = 1
+
     @val.setter
     def val(self, val):
         """Set the value of the Reverse object
@@ -129,20 +251,11 @@ class Reverse:
         >>> print(x5)
         "Reverse(val = 8.0, der = 2.0)"
         """
-        if isinstance(other, Reverse):
-            val_mul = self.val * other.val
-            new_RevMod = Reverse(val_mul)
-            self._children.append((other.val, new_RevMod))
-            self.grad = None
-            other._children.append((self.val, new_RevMod))
-            other.grad = None
-            return new_RevMod
-        elif isinstance(other, float) or isinstance(other, int):
-            val_mul = self.val * other
-            new_RevMod = Reverse(val_mul) # instantiate class
-            self._children.append((other, new_RevMod))
-            self.grad = None
-            return new_RevMod
+        if isinstance(other, Reverse) or isinstance(other, float) or isinstance(other, int):
+            return _apply("mul", self, other)
+        elif isinstance(other, numbers.Real):
+            # e.g. NumPy scalars, converted as in the Variable operators
+            return self * float(other)
         else:
             raise TypeError("Reverse mode calculation only accepts Reverse object, int, float types.")
 
@@ -170,20 +283,10 @@ class Reverse:
         >>> print(x5)
         Reverse(val = 6.0, grad = 1)
         """
-        if isinstance(other, Reverse):
-            val_add = self.val + other.val
-            new_RevMod = Reverse(val_add)
-            self._children.append((1, new_RevMod))
-            self.grad = None
-            other._children.append((1, new_RevMod))
-            other.grad = None
-            return new_RevMod
-        elif isinstance(other, float) or isinstance(other, int):
-            val_add = self.val + other
-            new_RevMod = Reverse(val_add)
-            self._children.append((1, new_RevMod))
-            self.grad = None
-            return new_RevMod
+        if isinstance(other, Reverse) or isinstance(other, float) or isinstance(other, int):
+            return _apply("add", self, other)
+        elif isinstance(other, numbers.Real):
+            return self + float(other)
         else:
             raise TypeError("Reverse mode calculation only accepts Reverse object, int, float types.")
 
@@ -211,20 +314,10 @@ class Reverse:
         >>> print(x5)
         Reverse(val = 2.0, grad = 1)
         """
-        if isinstance(other, Reverse):
-            val_sub = self.val - other.val
-            new_RevMod = Reverse(val_sub)
-            self._children.append((1, new_RevMod))
-            self.grad = None
-            other._children.append((-1, new_RevMod))
-            other.grad = None
-            return new_RevMod
-        elif isinstance(other, float) or isinstance(other, int):
-            val_sub = self.val - other
-            new_RevMod = Reverse(val_sub)
-            self._children.append((1, new_RevMod))
-            self.grad = None
-            return new_RevMod
+        if isinstance(other, Reverse) or isinstance(other, float) or isinstance(other, int):
+            return _apply("sub", self, other)
+        elif isinstance(other, numbers.Real):
+            return self - float(other)
         else:
             raise TypeError("Reverse mode calculation only accepts Reverse object, int, float types.")
 
@@ -255,21 +348,13 @@ class Reverse:
         if isinstance(other, Reverse):
             if other.val == 0:
                 raise ZeroDivisionError("Cannot divide the variable with 0.")
-            val_div = self.val / other.val
-            new_RevMod = Reverse(val_div)
-            self._children.append(( 1 / other.val, new_RevMod))
-            self.grad = None
-            other._children.append(( - self.val / (other.val ** 2) , new_RevMod))  # need confirmation
-            other.grad = None
-            return new_RevMod
+            return _apply("truediv", self, other)
         elif isinstance(other, float) or isinstance(other, int):
             if other == 0:
                 raise ZeroDivisionError("Cannot divide the variable with 0.")
-            val_div = self.val / other
-            new_RevMod = Reverse(val_div)
-            self._children.append(( 1 / other, new_RevMod))
-            self.grad = None
-            return new_RevMod
+            return _apply("truediv", self, other)
+        elif isinstance(other, numbers.Real):
+            return self / float(other)
         else:
             raise TypeError("Reverse mode calculation only accepts Reverse object, int, float types.")
 
@@ -329,11 +414,9 @@ class Reverse:
         Reverse(val = 2, grad = 1)
         """
         if isinstance(other, Reverse) or isinstance(other, int) or isinstance(other, float):
-            new_val = other - self.val
-            new_RevMod= Reverse(new_val)
-            self._children.append((1, new_RevMod))
-            self.grad = None
-            return new_RevMod
+            return _apply("sub", other, self)
+        elif isinstance(other, numbers.Real):
+            return float(other) - self
         else:
             raise TypeError("Reverse mode calculation only accepts Reverse object, int, float types.")
 
@@ -357,11 +440,9 @@ class Reverse:
         if isinstance(other, Reverse) or isinstance(other, int) or isinstance(other, float):
             if self.val == 0:
                 raise ZeroDivisionError("Cannot divide the variable with 0.")
-            new_val = other / self.val
-            new_RevMod = Reverse(new_val)
-            self._children.append(( - other / self.val ** 2, new_RevMod))
-            self.grad = None
-            return new_RevMod
+            return _apply("truediv", other, self)
+        elif isinstance(other, numbers.Real):
+            return float(other) / self
         else:
             raise TypeError("Reverse mode calculation only accepts Reverse object, int, float types.")
 
@@ -381,11 +462,7 @@ class Reverse:
         >>> print(z)
         Reverse(val = -1, grad = -1.2246467991473532e-16)
         """
-        new_val = np.cos(self.val)
-        new_RevMod = Reverse(new_val)
-        self._children.append((-np.sin(self.val), new_RevMod)) # -sinx
-        self.grad = None
-        return new_RevMod
+        return _apply("cos", self)
 
     def tan(self):
         """Calculates trigonometric tangent of the current Reverse object.
@@ -403,11 +480,7 @@ class Reverse:
         >>> print(z)
         Reverse(val = 0.9999999999999999, grad = 1.9999999999999996)
         """
-        new_val = np.tan(self.val)
-        new_RevMod = Reverse(new_val)
-        self._children.append(( 1/(np.cos(self.val) ** 2), new_RevMod)) # 1/ sec **2 x
-        self.grad = None
-        return new_RevMod
+        return _apply("tan", self)
 
     def sin(self):
         """Calculates trigonometric sine of Reverse and returns the result.
@@ -425,11 +498,7 @@ class Reverse:
         >>> print(z)
         Reverse(val = 1.0, grad = 6.123233995736766e-17)
         """
-        new_val = np.sin(self.val)
-        new_RevMod = Reverse(new_val)
-        self._children.append((np.cos(self.val), new_RevMod)) #cosx
-        self.grad = None
-        return new_RevMod
+        return _apply("sin", self)
 
     def cosh(self):
         """Calculates hyperbolic cosine of Reverse and returns the result.
@@ -447,11 +516,7 @@ class Reverse:
         >>> print(z)
         Reverse(val = 1.5430806348152437, grad = 1.1752011936438014)
         """
-        new_val = np.cosh(self.val)
-        new_RevMod = Reverse(new_val)
-        self._children.append((np.sinh(self.val), new_RevMod))
-        self.grad = None
-        return new_RevMod
+        return _apply("cosh", self)
 
     def tanh(self):
         """Calculates hyperbolic tanh of Reverse and returns the result.
@@ -469,11 +534,7 @@ class Reverse:
         >>> print(z)
         Reverse(val = 0.7615941559557649, grad = 0.41997434161402614)
         """
-        new_val = np.tanh(self.val)
-        new_RevMod = Reverse(new_val)
-        self._children.append((1 / np.cosh(self.val) ** 2, new_RevMod))  
-        self.grad = None
-        return new_RevMod
+        return _apply("tanh", self)
 
     def sinh(self):
         """Calculates hyperbolic sinh of Reverse and returns the result.
@@ -491,11 +552,7 @@ class Reverse:
         >>> print(z)
         Reverse(val = 3.626860407847019, grad = 3.7621956910836314)
         """
-        new_val = np.sinh(self.val)
-        new_RevMod = Reverse(new_val)
-        self._children.append((np.cosh(self.val), new_RevMod))
-        self.grad = None
-        return new_RevMod
+        return _apply("sinh", self)
 
     def arccos(self):
         """Calculates arc arccos of Reverse object and returns the result.
@@ -512,12 +569,7 @@ class Reverse:
         >>> r.arccos()
         Reverse(val = 0.45102681179626236, grad = -1.147078669352809)
         """
-        # TODO: raise ValueError if self.val outside of domain (NumPy won't, it just returns nan)
-        new_val = np.arccos(self.val)
-        new_RevMod = Reverse(new_val)
-        self._children.append((-1 / np.sqrt( 1- self.val ** 2), new_RevMod ))
-        self.grad = None
-        return new_RevMod
+        return _apply("arccos", self)
         
     def arctan(self):
         """Calculates arc tangent of Reverse object and returns the result.
@@ -534,11 +586,7 @@ class Reverse:
         >>> r.arctan()
         Reverse(val = 0.7328151017865066, grad = 0.27624309392265195)
         """
-        new_val = np.arctan(self.val)
-        new_RevMod = Reverse(new_val)
-        self._children.append((1 / (1 + self.val ** 2), new_RevMod ))
-        self.grad = None
-        return new_RevMod
+        return _apply("arctan", self)
 
     def arcsin(self):
         """Calculates arc sine of Reverse and returns the result.
@@ -554,12 +602,7 @@ class Reverse:
         >>> r = Reverse(0.9, 0.5)
         Reverse(val = 1.1197695149986342, grad = 1.147078669352809)
         """
-        # TODO: raise ValueError if self.val outside of domain (NumPy won't, it just returns nan)
-        new_val = np.arcsin(self.val)
-        new_RevMod = Reverse(new_val)
-        self._children.append((1 / np.sqrt(1 - self.val**2 ), new_RevMod ))
-        self.grad = None
-        return new_RevMod
+        return _apply("arcsin", self)
 
     def exp(self):
         """Calculates exponential (exp()) of Reverse object and returns a Reverse object back.
@@ -576,11 +619,7 @@ class Reverse:
         >>> r.exp()
         Reverse(val = 54.598150033144236, grad = 272.9907501657212)
         """
-        new_val = np.exp(self.val)
-        new_RevMod = Reverse(new_val)
-        self._children.append((np.exp(self.val), new_RevMod))
-        self.grad = None
-        return new_RevMod
+        return _apply("exp", self)
 
     def log(self, base=np.e):
         """Calculates logarithm (log()) of Reverse, int, or float and returns the result.
@@ -597,15 +636,10 @@ class Reverse:
         >>> r.log()
         Reverse(val = 1.3862943611198906, grad = 1.25)
         """
-        # TODO: raise ZeroDivisionError if base == 1
         if self.val <= 0:
             raise ValueError(f"Log cannot be negative for this implementation")
         else:
-            new_val = np.log(self.val)/ np.log(base)
-            new_RevMod = Reverse(new_val)
-            self._children.append((1 / (self.val * np.log(base)), new_RevMod))
-            self.grad = None
-            return new_RevMod
+            return _apply("log", self, base)
 
     def __pow__(self, other):
         """Overload of the '**' or 'pow()' operator (Reverse**other). Calculates the value and derivative resulting
@@ -623,22 +657,10 @@ class Reverse:
         Reverse(val = 81.0, der = 552.9379769105844)
         """
         if self.val > 0:
-            if isinstance(other, int) or isinstance(other, float):
-                other = Reverse(other)
-                new_val = self.val ** other.val
-                # der_div = other.val * self.val**(other.val-1) * self.der + np.log(self.val) * self.val**other.val * other.der
-                new_RevMod = Reverse(new_val)
-                self._children.append((other.val * self.val ** (other.val -1 ), new_RevMod))
-                self.grad = None
-                other._children.append((np.log(self.val) * self.val ** other.val , new_RevMod))
-                other.grad = None
-                return new_RevMod
-            elif isinstance(other, Reverse):
-                new_val = self.val ** other.val
-                new_RevMod = Reverse(new_val)
-                self._children.append((other.val * self.val**(other.val -1), new_RevMod))
-                self.grad = None
-                return new_RevMod
+            if isinstance(other, int) or isinstance(other, float) or isinstance(other, Reverse):
+                return _apply("pow", self, other)
+            elif isinstance(other, numbers.Real):
+                return self ** float(other)
             else:
                 raise TypeError("Reverse mode calculation only accepts Reverse object, int, float types.")
         else:
@@ -661,14 +683,11 @@ class Reverse:
         """
         if isinstance(other, int) or isinstance(other, float):
             if other > 0:
-                other = Reverse(other)
-                new_val = other.val ** self.val
-                new_RevMod = Reverse(new_val)
-                self._children.append((np.log(other.val) * (other.val ** self.val), new_RevMod))
-                self.grad = None
-                return new_RevMod
+                return _apply("pow", other, self)
             else:
                 raise ValueError('math domain error: the base of exponentiation cannot be non-positive')
+        elif isinstance(other, numbers.Real):
+            return float(other) ** self
         else:
             raise TypeError(f"unsupported operand type(s) for ** or power: '{type(other)}' and '{type(self)}'")
 
@@ -705,3 +724,248 @@ class Reverse:
         
     def __ne__(self, other):
         return not self.__eq__(other)
+
+
+class ReverseMode(object):
+    """
+    This class implements the reverse mode of automatic differentiation as a counterpart of the
+    Forward class. The user inputs the function and the Reverse objects for that function, and
+    after a single forward sweep and a single backward sweep can access the value and the full
+    gradient of the function. For functions returning a list, tuple, or array of outputs (which
+    is flattened), the Jacobian is computed with one backward sweep per output.
+
+    Examples
+    --------
+    >>> x = Reverse(3)
+    >>> y = Reverse(4)
+    >>> rmode = ReverseMode(lambda x, y: x * y + x.sin(), (x, y))
+    >>> rmode.calculate()
+    >>> rmode.value
+    12.141120008059866
+    >>> rmode.derivative
+    array([3.0100075, 3.       ])
+    # A function with two outputs
+    >>> rmode = ReverseMode(lambda x, y: [x * y, x + y], (x, y))
+    >>> rmode.calculate()
+    >>> rmode.value
+    array([12,  7])
+    >>> rmode.derivative
+    array([[4., 3.],
+           [1., 1.]])
+    """
+
+    def __init__(self, func, vars, cache_size=0):
+        """Constructor for the ReverseMode class.
+
+        Args:
+            func (function): function of interest
+            vars (Reverse, list, or tuple): Reverse object or list/tuple of Reverse objects
+                                            to evaluate the function
+            cache_size (int or None, optional): number of values and derivatives kept in a least
+                                                recently used cache keyed by the values of the
+                                                Reverse objects, None for no limit. Defaults to 0,
+                                                which disables the cache.
+        """
+        self._func = func
+        if not isinstance(vars, list) and not isinstance(vars, tuple):
+            self._vars = [vars]
+        else:
+            self._vars = vars
+        self._res = None
+        self._der = None
+        self._cache = _ResultCache(cache_size)
+
+    @property
+    def func(self):
+        """Get the function of the ReverseMode instance."""
+        return self._func
+
+    @property
+    def vars(self):
+        """Get the Reverse object(s) of the ReverseMode instance."""
+        return self._vars
+
+    @func.setter
+    def func(self, func):
+        """Set the function for the reverse mode.
+
+        Args:
+            func (function): new function to implement reverse mode on
+        """
+        self._func = func
+        # results of the previous function are stale
+        self._res = None
+        self._der = None
+        self._cache.clear()
+
+    @vars.setter
+    def vars(self, vars):
+        """Set the Reverse objects for the reverse mode.
+
+        Args:
+            vars (Reverse or tuple/list of Reverse objects): new Reverse object(s) to implement reverse mode on
+        """
+        if not isinstance(vars, list) and not isinstance(vars, tuple):
+            self._vars = [vars]
+        else:
+            self._vars = vars
+        # results of the previous Reverse objects are stale
+        self._res = None
+        self._der = None
+        self._cache.clear()
+
+    def calculate(self):
+        """Evaluate the given function at the values of the Reverse objects, recording the
+        operations on a Tape (forward sweep), then compute the gradient of each output with
+        a reverse sweep over the Tape. If the cache is enabled and the function was already
+        evaluated at the same values of the Reverse objects, the stored result is used instead.
+        """
+        key = None
+        if self._cache.enabled:
+            key = _cache_key([var.val for var in self._vars])
+            entry = self._cache.get(key)
+            if entry is not None:
+                self._res, self._der = entry
+                return
+        # fresh leaves keep the graphs of the user's Reverse objects untouched
+        leaves = [Reverse(var.val) for var in self._vars]
+        with Tape() as tape:
+            res = self._func(*leaves)
+        if isinstance(res, np.ndarray) and res.dtype == object:
+            # arrays of Reverse objects are flattened, as in Forward
+            res = list(res.ravel())
+        if isinstance(res, list) or isinstance(res, tuple):
+            self._der = np.array([self._gradient(tape, output, leaves) for output in res])
+            self._res = np.array([output.val if isinstance(output, Reverse) else output for output in res])
+        else:
+            self._der = self._gradient(tape, res, leaves)
+            self._res = res.val if isinstance(res, Reverse) else res
+        # only the values are kept, as the outputs reference the Tape and thus the whole graph
+        if key is not None:
+            self._cache.put(key, (self._res, self._der))
+
+    def cache_info(self):
+        """Get the statistics of the cache of results.
+
+        Returns:
+            CacheInfo: named tuple of the number of hits and misses, the maximum size and the
+                       current size of the cache
+        """
+        return self._cache.info()
+
+    def cache_clear(self):
+        """Remove every result from the cache and reset its statistics."""
+        self._cache.clear()
+
+    @staticmethod
+    def _gradient(tape, output, leaves):
+        """Compute the gradient of one output of the function with a reverse sweep.
+
+        Args:
+            tape (Tape): Tape the function was recorded on
+            output (Reverse, int, or float): output of the function
+            leaves (list): Reverse objects the function was evaluated with
+
+        Returns:
+            numpy.ndarray: partial derivatives of the output with respect to each leaf
+        """
+        if not isinstance(output, Reverse):
+            # the output does not depend on the Reverse objects
+            return np.zeros(len(leaves))
+        return tape.gradient(output, leaves)
+
+    @property
+    def value(self):
+        """Get the value of the function evaluated at the Reverse objects.
+
+        Raises:
+            AttributeError: if 'calculate' method has not been called
+
+        Returns:
+            float, int, or numpy.ndarray: value of the function, or array of the values of each output
+        """
+        if self._res is None:
+            raise AttributeError("value and derivative have not been calculated yet, call 'calculate' method")
+        return self._res
+
+    @property
+    def derivative(self):
+        """Get the gradient of the function evaluated at the Reverse objects.
+
+        Raises:
+            AttributeError: if 'calculate' method has not been called
+
+        Returns:
+            numpy.ndarray: gradient of the function, or the Jacobian (one row per output)
+                           for functions returning a list, tuple, or array of outputs
+        """
+        if self._res is None:
+            raise AttributeError("value and derivative have not been calculated yet, call 'calculate' method")
+        return self._der
+
+
+def vjp(func, primals):
+    """Evaluate a function, recording its operations on a Tape, and return its value with a
+    pullback function computing the product of a cotangent vector with its Jacobian (the
+    gradient of the outputs weighted by the cotangent) without forming the Jacobian. Each call
+    of the pullback is a single reverse sweep over the recorded operations, seeded with every
+    output at once, so its cost does not depend on the number of inputs or outputs, and the
+    function is not evaluated again.
+
+    Args:
+        func (function): function of interest, returning a single output or a list/tuple of outputs
+        primals (int, float, list, or tuple): value of each input, or a single value for a
+                                              function of one input
+
+    Returns:
+        tuple: value of the function (an array with one entry per output for functions returning
+               several outputs), and the pullback function, which takes the cotangent (one entry
+               per output, or a number for a single output) and returns an array with one entry
+               per input
+
+    Examples
+    --------
+    >>> value, pullback = vjp(lambda x, y: [x * y, x + y], (3., 4.))
+    >>> value
+    array([12.,  7.])
+    >>> pullback([1., 0.])
+    array([4., 3.])
+    >>> pullback([1., 2.])
+    array([6., 5.])
+    """
+    if not isinstance(primals, list) and not isinstance(primals, tuple):
+        primals = [primals]
+    leaves = [Reverse(primal) for primal in primals]
+    with Tape() as tape:
+        # inputs that are returned as they are must still be on the Tape
+        for leaf in leaves:
+            tape._register(leaf)
+        res = func(*leaves)
+    vector = isinstance(res, list) or isinstance(res, tuple) or (isinstance(res, np.ndarray) and res.dtype == object)
+    outputs = list(np.ravel(res)) if isinstance(res, np.ndarray) else list(res) if vector else [res]
+    for output in outputs:
+        if isinstance(output, Reverse):
+            tape._register(output)
+    values = [output.val if isinstance(output, Reverse) else output for output in outputs]
+
+    def pullback(cotangent):
+        """Compute the product of a cotangent vector with the Jacobian of the function.
+
+        Args:
+            cotangent (int, float, list, tuple, or numpy.ndarray): entry for each output, or a
+                                                                   number for a single output
+
+        Raises:
+            ValueError: if the cotangent does not have one entry per output
+
+        Returns:
+            numpy.ndarray: vector-Jacobian product, with one entry per input
+        """
+        weights = np.ravel(cotangent) if vector else [cotangent]
+        if len(weights) != len(outputs):
+            raise ValueError(f"cotangent must have {len(outputs)} entries, one per output, not {len(weights)}")
+        tape._sweep([(output, weight) for output, weight in zip(outputs, weights) if isinstance(output, Reverse)])
+        adjoints = tape._adjoints
+        return np.array([adjoints[leaf._index] for leaf in leaves])
+
+    return (np.array(values) if vector else values[0]), pullback
@@ -0,0 +1,156 @@
+"""
+This file contains the serving module for the PyADBCXY package. It includes the AsyncEvaluator
+class, which serves the values and derivatives of a compiled function to asyncio code, coalescing
+concurrent requests into micro-batches evaluated off the event loop.
+"""
+import asyncio
+import numpy as np
+
+
+__all__ = ["AsyncEvaluator"]
+
+
+class AsyncEvaluator(object):
+    """
+    This class implements an asyncio-friendly evaluator of a compiled function, i.e. a
+    CompiledFunction returned by trace or a GeneratedFunction returned by generate. Each call of
+    'evaluate' adds a request to the pending micro-batch and waits for its result. The batch is
+    sent as soon as it holds max_batch_size requests, or max_wait seconds after its first request,
+    whichever comes first. It is evaluated in an executor, so that the event loop is never blocked,
+    with a single vectorized call of the compiled function on arrays holding one entry per request,
+    and the result of each request is then set on its future.
+
+    If the evaluation of a batch raises an exception, e.g. because one request lies outside the
+    domain of the function, the requests of the batch are evaluated one at a time, so that the
+    exception is only raised for the requests that cause it.
+
+    Examples
+    --------
+    >>> evaluator = AsyncEvaluator(trace(lambda x, y: x * y, 1., 1.), max_batch_size=32, max_wait=0.001)
+    >>> async def main():
+    ...     return await asyncio.gather(*[evaluator.evaluate(x, 2.) for x in range(3)])
+    >>> asyncio.run(main())
+    [(0.0, array([2., 0.])), (2.0, array([2., 1.])), (4.0, array([2., 2.]))]
+    """
+
+    def __init__(self, compiled, max_batch_size=64, max_wait=0.001, executor=None):
+        """Constructor for the AsyncEvaluator class.
+
+        Args:
+            compiled (CompiledFunction or GeneratedFunction): compiled function to evaluate
+            max_batch_size (int, optional): maximum number of requests evaluated together.
+                                            Defaults to 64.
+            max_wait (float, optional): maximum time in seconds a request waits for other
+                                        requests to join its batch. Defaults to 0.001.
+            executor (concurrent.futures.Executor, optional): executor evaluating the batches.
+                                                              Defaults to None, which uses the
+                                                              default executor of the event loop.
+
+        Raises:
+            ValueError: if max_batch_size is not positive or max_wait is negative
+        """
+        if max_batch_size < 1:
+            raise ValueError(f"max_batch_size must be positive, not {max_batch_size}")
+        if max_wait < 0:
+            raise ValueError(f"max_wait cannot be negative, not {max_wait}")
+        self._compiled = compiled
+        self._max_batch_size = max_batch_size
+        self._max_wait = max_wait
+        self._executor = executor
+        self._pending = []
+        self._timer = None
+
+    def __repr__(self):
+        return f"AsyncEvaluator(max_batch_size = {self._max_batch_size}, max_wait = {self._max_wait})"
+
+    @property
+    def max_batch_size(self):
+        """Get the maximum number of requests evaluated together."""
+        return self._max_batch_size
+
+    @property
+    def max_wait(self):
+        """Get the maximum time in seconds a request waits for other requests to join its batch."""
+        return self._max_wait
+
+    async def evaluate(self, *args):
+        """Evaluate the value and derivative of the function at the values of its inputs, together
+        with the other requests of the same micro-batch.
+
+        Args:
+            args (int or float): values of the inputs
+
+        Returns:
+            tuple: value and derivative of the function, as returned by its 'value_and_derivative'
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((args, future))
+        if len(self._pending) >= self._max_batch_size:
+            self._flush(loop)
+        elif self._timer is None:
+            self._timer = loop.call_later(self._max_wait, self._flush, loop)
+        return await future
+
+    def _flush(self, loop):
+        """Send the pending requests to the executor as one batch.
+
+        Args:
+            loop (asyncio.AbstractEventLoop): event loop of the requests
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        # requests cancelled while waiting are dropped
+        batch = [(args, future) for args, future in self._pending if not future.done()]
+        self._pending = []
+        if not batch:
+            return
+        task = loop.run_in_executor(self._executor, self._evaluate_batch, [args for args, future in batch])
+        task.add_done_callback(lambda task: self._resolve(batch, task))
+
+    @staticmethod
+    def _resolve(batch, task):
+        """Set the result or exception of every request of a batch once it has been evaluated."""
+        if task.exception() is not None:
+            results = [(None, task.exception())] * len(batch)
+        else:
+            results = task.result()
+        for (args, future), (result, exception) in zip(batch, results):
+            if future.done():
+                continue
+            if exception is None:
+                future.set_result(result)
+            else:
+                future.set_exception(exception)
+
+    def _evaluate_batch(self, batch):
+        """Evaluate a batch of requests with a single vectorized call of the compiled function,
+        or one request at a time if that fails.
+
+        Args:
+            batch (list): values of the inputs of each request
+
+        Returns:
+            list: result and exception (one of them None) of each request
+        """
+        try:
+            columns = [np.array(column, dtype=float) for column in zip(*batch)]
+            if any(len(args) != len(columns) for args in batch):
+                raise TypeError("the requests do not all have the same number of inputs")
+            values, derivatives = self._compiled.value_and_derivative(*columns)
+            # a function that does not depend on its inputs is not batched
+            if np.ndim(values) == 0:
+                values = np.broadcast_to(values, (len(batch),))
+            if np.ndim(derivatives) == 1:
+                derivatives = np.broadcast_to(derivatives, (len(batch),) + np.shape(derivatives))
+            return [((values[k].item() if values.ndim == 1 else np.array(values[k]), np.array(derivatives[k])), None)
+                    for k in range(len(batch))]
+        except Exception:
+            results = []
+            for args in batch:
+                try:
+                    results.append((self._compiled.value_and_derivative(*args), None))
+                except Exception as exception:
+                    results.append((None, exception))
+            return results
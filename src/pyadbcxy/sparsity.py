@@ -0,0 +1,194 @@
+"""
+This file contains the sparsity module for the PyADBCXY package. It includes the SparseJacobian
+class, which detects the sparsity pattern of the Jacobian of a traced function and computes the
+non-zero entries with one sweep per color of a graph coloring of its columns or rows.
+"""
+import numpy as np
+from .variable import Variable
+from .tracing import trace
+
+try:
+    from scipy import sparse as _scipy_sparse
+except ImportError:
+    # scipy is only needed to assemble the sparse matrix
+    _scipy_sparse = None
+
+
+__all__ = ["SparseJacobian"]
+
+
+def _greedy_coloring(members, lines):
+    """Color items so that no two items lying on the same line have the same color. Each item
+    receives the smallest color not used by an item it shares a line with.
+
+    Args:
+        members (list): indices of the lines each item lies on
+        lines (list): indices of the items on each line
+
+    Returns:
+        numpy.ndarray: color of each item
+    """
+    colors = [-1] * len(members)
+    for k, item_lines in enumerate(members):
+        forbidden = set(colors[other] for line in item_lines for other in lines[line])
+        color = 0
+        while color in forbidden:
+            color += 1
+        colors[k] = color
+    return np.array(colors, dtype=int)
+
+
+class SparseJacobian(object):
+    """
+    This class implements the computation of sparse Jacobians. The function is traced once, and
+    its sparsity pattern is detected by propagating, through every operation of the plan, the set
+    of inputs each value depends on. Columns that do not share a non-zero row can be computed
+    together: seeding all columns of the same color with the same unit vector, one forward sweep
+    on Variables gives a compressed Jacobian with one column per color. Likewise, rows that do not
+    share a non-zero column can be computed together with one reverse sweep per color. The mode
+    with fewer colors is used by default, so a banded Jacobian costs a few sweeps whatever the
+    number of inputs.
+
+    Examples
+    --------
+    >>> def residual(*u):
+    ...     n = len(u)
+    ...     return [u[i] ** 2 - (u[i - 1] if i > 0 else 0) - (u[i + 1] if i < n - 1 else 0) for i in range(n)]
+    >>> jac = SparseJacobian(residual, *[1.0] * 6)
+    >>> jac.colors
+    3
+    >>> jac(*range(1, 7)).toarray()
+    array([[ 2., -1.,  0.,  0.,  0.,  0.],
+           [-1.,  4., -1.,  0.,  0.,  0.],
+           [ 0., -1.,  6., -1.,  0.,  0.],
+           [ 0.,  0., -1.,  8., -1.,  0.],
+           [ 0.,  0.,  0., -1., 10., -1.],
+           [ 0.,  0.,  0.,  0., -1., 12.]])
+    """
+
+    def __init__(self, func, *args, mode=None):
+        """Constructor for the SparseJacobian class.
+
+        Args:
+            func (function): function of interest, returning a list/tuple of outputs
+            args (int or float): example values of the inputs of the function
+            mode (str, optional): "forward" to color the columns, "reverse" to color the rows.
+                                  Defaults to None, which uses the mode with fewer colors.
+
+        Raises:
+            ValueError: if the mode is not "forward", "reverse", or None
+        """
+        if mode is not None and mode != "forward" and mode != "reverse":
+            raise ValueError(f"mode must be 'forward' or 'reverse', not {mode!r}")
+        self._compiled = trace(func, *args)
+        self._rows, self._cols = self._pattern(self._compiled)
+        m, n = len(self._compiled._outputs), len(self._compiled._inputs)
+        row_members = [[] for _ in range(m)]
+        col_members = [[] for _ in range(n)]
+        for i, j in zip(self._rows, self._cols):
+            row_members[i].append(j)
+            col_members[j].append(i)
+        column_colors = _greedy_coloring(col_members, row_members)
+        row_colors = _greedy_coloring(row_members, col_members)
+        n_column_colors = int(column_colors.max()) + 1 if n else 0
+        n_row_colors = int(row_colors.max()) + 1 if m else 0
+        if mode is None:
+            mode = "forward" if n_column_colors <= n_row_colors else "reverse"
+        self._mode = mode
+        if mode == "forward":
+            self._colors, self._n_colors = column_colors, n_column_colors
+        else:
+            self._colors, self._n_colors = row_colors, n_row_colors
+        self._shape = (m, n)
+
+    @staticmethod
+    def _pattern(compiled):
+        """Detect the sparsity pattern of the Jacobian of a compiled function by propagating the
+        set of inputs each slot depends on through the plan.
+
+        Args:
+            compiled (CompiledFunction): compiled function
+
+        Returns:
+            tuple: row and column indices of the structurally non-zero entries, in row-major order
+        """
+        empty = frozenset()
+        dependencies = dict((slot, frozenset([j])) for j, slot in enumerate(compiled._inputs))
+        for op, out, forward, a, b, da, db in compiled._plan:
+            depends = dependencies.get(a, empty)
+            if b is not None:
+                depends = depends | dependencies.get(b, empty)
+            dependencies[out] = depends
+        rows, cols = [], []
+        for i, output in enumerate(compiled._outputs):
+            for j in sorted(dependencies.get(output, empty)):
+                rows.append(i)
+                cols.append(j)
+        return np.array(rows, dtype=int), np.array(cols, dtype=int)
+
+    def __repr__(self):
+        return f"SparseJacobian(shape = {self._shape}, nonzeros = {len(self._rows)}, mode = {self._mode}, colors = {self._n_colors})"
+
+    @property
+    def shape(self):
+        """Get the shape of the Jacobian (outputs, inputs)."""
+        return self._shape
+
+    @property
+    def pattern(self):
+        """Get the row and column indices of the structurally non-zero entries of the Jacobian."""
+        return self._rows, self._cols
+
+    @property
+    def mode(self):
+        """Get the mode used to compute the Jacobian, "forward" or "reverse"."""
+        return self._mode
+
+    @property
+    def colors(self):
+        """Get the number of colors, which is the number of sweeps needed to compute the Jacobian."""
+        return self._n_colors
+
+    def entries(self, *args):
+        """Compute the non-zero entries of the Jacobian at new values of the inputs.
+
+        Args:
+            args (int or float): values of the inputs
+
+        Returns:
+            numpy.ndarray: value of each entry of 'pattern'
+        """
+        compiled = self._compiled
+        if self._mode == "forward":
+            # every column of the same color is seeded with the same unit vector
+            seeds = np.eye(self._n_colors)
+            vals = compiled._forward([Variable(arg, seeds[color]) for arg, color in zip(args, self._colors)])
+            compressed = np.zeros((self._shape[0], self._n_colors))
+            for i, output in enumerate(compiled._outputs):
+                if isinstance(vals[output], Variable):
+                    compressed[i] = vals[output].der
+            return compressed[self._rows, self._colors[self._cols]]
+        vals = compiled._forward(args)
+        partials = compiled._partials(vals)
+        compressed = np.zeros((self._n_colors, self._shape[1]))
+        for color in range(self._n_colors):
+            outputs = [output for output, c in zip(compiled._outputs, self._colors) if c == color]
+            adjoints = compiled._backward(vals, outputs, partials)
+            compressed[color] = [0.0 if adjoints[slot] is None else adjoints[slot] for slot in compiled._inputs]
+        return compressed[self._colors[self._rows], self._cols]
+
+    def __call__(self, *args):
+        """Compute the Jacobian at new values of the inputs as a sparse matrix.
+
+        Args:
+            args (int or float): values of the inputs
+
+        Raises:
+            ImportError: if scipy is not installed
+
+        Returns:
+            scipy.sparse.csr_matrix: Jacobian of the function
+        """
+        if _scipy_sparse is None:
+            raise ImportError("scipy is required to assemble sparse matrices, use the 'entries' method otherwise")
+        return _scipy_sparse.csr_matrix((self.entries(*args), (self._rows, self._cols)), shape=self._shape)
@@ -0,0 +1,137 @@
+"""
+This file contains the streaming module for the PyADBCXY package. It includes the stream function,
+which lazily evaluates the value and gradient of a function over an unbounded iterator of input
+points, reading and evaluating them in mini-batches.
+"""
+import itertools
+import numpy as np
+from .variable import Variable
+from .forward import Forward
+from .reverse import Reverse, ReverseMode
+
+
+__all__ = ["stream"]
+
+
+def _forward_batch(func, batch):
+    """Evaluate the value and gradient of a function at a batch of points with a single evaluation
+    on batched Variables, whose values are arrays holding one entry per point.
+
+    Args:
+        func (function): function of interest
+        batch (list): values of the inputs at each point
+
+    Returns:
+        tuple: array of the values and array of the gradients (one row per point)
+    """
+    vals = np.array(batch, dtype=float)
+    fmode = Forward(func, [Variable(vals[:, i]) for i in range(vals.shape[1])])
+    fmode.calculate()
+    values = np.broadcast_to(fmode.value, (len(batch),))
+    gradients = np.reshape(fmode.derivative, (len(batch), vals.shape[1]))
+    return values, gradients
+
+
+def _evaluate_point(func, point, mode):
+    """Evaluate the value and gradient of a function at a single point.
+
+    Args:
+        func (function): function of interest
+        point (tuple): values of the inputs
+        mode (str): "forward" or "reverse"
+
+    Returns:
+        tuple: value and gradient (array with one entry per input), or Jacobian (one row per
+               entry of the value) for array values
+    """
+    if mode == "forward":
+        fmode = Forward(func, [Variable(val) for val in point])
+    else:
+        fmode = ReverseMode(func, [Reverse(val) for val in point])
+    fmode.calculate()
+    return fmode.value, np.reshape(fmode.derivative, np.shape(fmode.value) + (len(point),))
+
+
+def stream(func, points, mode="forward", batch_size=64):
+    """Lazily evaluate the value and gradient of a function at every point of an iterator, which
+    may be unbounded. The points are read in mini-batches of batch_size, so that at most one batch
+    is held in memory at a time, and the next batch is only read once the consumer asks for the
+    results past the current one.
+
+    In forward mode, each batch is evaluated at once on batched Variables (the vectorized path).
+    If this raises a ValueError or ZeroDivisionError, e.g. because a point of the batch is outside
+    of the domain of the function or because the function branches on the values, that batch is
+    evaluated one point at a time instead. A TypeError shows that the function does not support
+    batched Variables, so the following batches are also evaluated one point at a time. So are all
+    of the points of a function whose value is an array (e.g. built from NumPy arrays inside the
+    function), as found from the first point, with the Jacobian in place of the gradient. In
+    reverse mode, the points are always evaluated one at a time.
+
+    Args:
+        func (function): function of interest, returning a single output
+        points (iterable): input points, each a list/tuple with one value per input of the
+                           function, or a number for functions of a single input
+        mode (str, optional): "forward" or "reverse". Defaults to "forward".
+        batch_size (int, optional): number of points read and evaluated at a time. Defaults to 64.
+
+    Raises:
+        ValueError: if the mode is not "forward" or "reverse", if batch_size is not positive,
+                    or if the points do not all have the same number of values
+
+    Yields:
+        tuple: value and gradient (array with one entry per input) of the function at each point,
+               or value and Jacobian for functions whose value is an array
+
+    Examples
+    --------
+    >>> import itertools
+    >>> results = stream(lambda x, y: x * y, ((t, t + 1) for t in itertools.count()))
+    >>> next(results)
+    (0.0, array([1., 0.]))
+    >>> next(results)
+    (2.0, array([2., 1.]))
+    """
+    if mode != "forward" and mode != "reverse":
+        raise ValueError(f"mode must be 'forward' or 'reverse', not {mode!r}")
+    if batch_size < 1:
+        raise ValueError(f"batch_size must be positive, not {batch_size}")
+    return _stream(func, iter(points), mode, batch_size)
+
+
+def _stream(func, points, mode, batch_size):
+    """Generator of the stream function, separate so that its arguments are checked when it is called."""
+    var_count = None
+    vectorize = mode == "forward"
+    while True:
+        batch = [point if isinstance(point, (list, tuple, np.ndarray)) else (point,)
+                 for point in itertools.islice(points, batch_size)]
+        if not batch:
+            return
+        if var_count is None:
+            var_count = len(batch[0])
+            # arrays created by the function would broadcast against the points of a batch, so
+            # only functions with a single value per point are evaluated on batched Variables
+            first = _evaluate_point(func, np.array(batch[0], dtype=float).tolist() if vectorize else batch[0], mode)
+            vectorize = vectorize and np.ndim(first[0]) == 0
+            yield first
+            batch = batch[1:]
+            if not batch:
+                continue
+        for point in batch:
+            if len(point) != var_count:
+                raise ValueError(f"every point must have {var_count} value(s), not {len(point)}")
+        if vectorize:
+            try:
+                values, gradients = _forward_batch(func, batch)
+            except TypeError:
+                # the function does not support batched Variables
+                vectorize = False
+            except (ValueError, ZeroDivisionError):
+                # only this batch, whose failing point raises again when evaluated on its own
+                pass
+            else:
+                # plain numbers rather than NumPy scalars, as in the point by point path
+                yield from zip(values.tolist(), gradients)
+                continue
+        for point in batch:
+            yield _evaluate_point(func, point, mode)
@@ -0,0 +1,248 @@
+"""
+This file contains the Tape module for the cs107-BCXY package. It includes the Tape class,
+which records the operations on Reverse objects in a flat Wengert list so that all of the
+adjoints can be computed by a single iterative reverse sweep.
+"""
+import contextvars
+from array import array
+import numpy as np
+from .variable import _log_base
+from .elementary_functions import log, exp, root, sin, sinh, arcsin, cos, cosh, arccos, tan, tanh, arctan
+
+
+__all__ = ["Tape"]
+
+
+# The rules of every operation that can be recorded: a function computing the value from the
+# operands, and for each operand a function computing the partial derivative of the result
+# from the operands and the value. They are written with the elementary functions so that they
+# apply to numbers as well as to Variables, and reuse the value instead of evaluating the same
+# transcendental function again wherever the derivative can be expressed in terms of it.
+_RULES = {
+    "add": (lambda a, b: a + b, (lambda a, b, val: 1, lambda a, b, val: 1)),
+    "sub": (lambda a, b: a - b, (lambda a, b, val: 1, lambda a, b, val: -1)),
+    "mul": (lambda a, b: a * b, (lambda a, b, val: b, lambda a, b, val: a)),
+    "truediv": (lambda a, b: a / b, (lambda a, b, val: 1 / b, lambda a, b, val: - val / b)),
+    "pow": (lambda a, b: a ** b, (lambda a, b, val: b * a ** (b - 1), lambda a, b, val: log(a) * val)),
+    # the base is a constant, whose logarithm is cached
+    "log": (log, (lambda a, base, val: 1 / (a * _log_base(base)), None)),
+    "exp": (exp, (lambda a, val: val,)),
+    "sin": (sin, (lambda a, val: cos(a),)),
+    "cos": (cos, (lambda a, val: -sin(a),)),
+    "tan": (tan, (lambda a, val: 1 / (cos(a) ** 2),)),
+    "sinh": (sinh, (lambda a, val: cosh(a),)),
+    "cosh": (cosh, (lambda a, val: sinh(a),)),
+    "tanh": (tanh, (lambda a, val: 1 - val ** 2,)),
+    "arcsin": (arcsin, (lambda a, val: 1 / root(1 - a ** 2),)),
+    "arccos": (arccos, (lambda a, val: -1 / root(1 - a ** 2),)),
+    "arctan": (arctan, (lambda a, val: 1 / (1 + a ** 2),)),
+}
+
+
+# stack of the tapes entered with a 'with' statement, the innermost one records; it is local to
+# each thread (and asyncio task), so that concurrent evaluations do not record on each other's tapes
+_active_tapes = contextvars.ContextVar("active_tapes", default=())
+
+
+def _current_tape():
+    """Get the innermost active Tape of the current thread, or None if no Tape is recording."""
+    tapes = _active_tapes.get()
+    return tapes[-1] if tapes else None
+
+
+class Tape(object):
+    """
+    This class implements a tape (Wengert list) for the reverse mode of automatic differentiation.
+    While a Tape is active, every operation on Reverse objects is appended to flat arrays holding
+    the operation, the indices of its operands and the local partial derivatives, instead of being
+    stored in Python lists on the operands. Since operations are recorded in the order they are
+    executed, the tape is already in topological order and one reverse sweep fills every adjoint
+    in O(nodes + edges) without recursion. A Tape only records the operations of the thread (or
+    asyncio task) that entered it, so functions can be differentiated concurrently.
+
+    Examples
+    --------
+    >>> x = Reverse(3)
+    >>> y = Reverse(4)
+    >>> with Tape() as tape:
+    ...     z = x * y + x.sin()
+    >>> tape.gradient(z, [x, y])
+    array([3.0100075, 3.       ])
+    >>> x.grad
+    3.010007503399555
+
+    # Re-evaluate the recorded operations with new values of the leaves
+    >>> x.val = 1
+    >>> tape.replay()
+    >>> z.val
+    4.841470984807897
+    >>> tape.gradient(z, [x, y])
+    array([4.54030231, 1.        ])
+    """
+
+    def __init__(self):
+        """Constructor for the Tape class."""
+        self._nodes = []
+        self._ops = []
+        # the constant operands of each operation, None where the operand is a node
+        self._consts = []
+        # the edges of node i are stored at positions offsets[i] to offsets[i + 1]
+        self._offsets = array('q', [0])
+        self._parents = array('q')
+        self._weights = array('d')
+        self._adjoints = None
+
+    def __enter__(self):
+        """Start recording operations on this Tape."""
+        _active_tapes.set(_active_tapes.get() + (self,))
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Stop recording operations on this Tape."""
+        tapes = _active_tapes.get()
+        i = tapes.index(self)
+        _active_tapes.set(tapes[:i] + tapes[i + 1:])
+        return False
+
+    def __len__(self):
+        """Get the number of nodes recorded on the Tape."""
+        return len(self._nodes)
+
+    def __repr__(self):
+        return f"Tape(nodes = {len(self._nodes)}, edges = {len(self._parents)})"
+
+    def _register(self, node):
+        """Record a Reverse object that is not the result of a recorded operation as a leaf.
+
+        Args:
+            node (Reverse): leaf to record
+
+        Raises:
+            ValueError: if the Reverse object was recorded on another Tape
+        """
+        if node._tape is self:
+            return
+        if node._tape is not None:
+            raise ValueError("Reverse object was recorded on another Tape")
+        self._record(node, None, ())
+
+    def _record(self, node, op, edges, consts=None):
+        """Append a node and the edges to its operands to the Tape.
+
+        Args:
+            node (Reverse): result of the operation
+            op (str or None): name of the operation, None for leaves
+            edges (tuple): (partial derivative, operand) pairs of the operation
+            consts (tuple, optional): all operands of the operation, with None in place of the
+                                      operands that are nodes. Defaults to None, meaning that
+                                      every operand is a node.
+        """
+        # operands must be on the Tape before the edges of this node are appended
+        for weight, parent in edges:
+            if parent._tape is not self:
+                self._register(parent)
+        for weight, parent in edges:
+            self._parents.append(parent._index)
+            self._weights.append(weight)
+        node._tape = self
+        node._index = len(self._nodes)
+        self._nodes.append(node)
+        self._ops.append(op)
+        self._consts.append(consts)
+        self._offsets.append(len(self._parents))
+
+    def replay(self):
+        """Re-evaluate the values and partial derivatives of every recorded operation from the
+        current values of the leaves, without building a new graph. The leaves are updated by
+        setting their 'val'. Since the recorded sequence of operations is replayed, the function
+        must not branch on the values of its inputs.
+        """
+        nodes, consts = self._nodes, self._consts
+        offsets, parents, weights = self._offsets, self._parents, self._weights
+        for i, op in enumerate(self._ops):
+            if op is None:
+                continue
+            start, end = offsets[i], offsets[i + 1]
+            if consts[i] is None:
+                vals = [nodes[j]._val for j in parents[start:end]]
+            else:
+                operands = iter(parents[start:end])
+                vals = [nodes[next(operands)]._val if const is None else const for const in consts[i]]
+            forward, partials = _RULES[op]
+            val = forward(*vals)
+            nodes[i]._val = val
+            e = start
+            for k, partial in enumerate(partials):
+                if consts[i] is None or consts[i][k] is None:
+                    weights[e] = partial(*vals, val)
+                    e += 1
+        self._adjoints = None
+
+    def zero_grad(self):
+        """Set the adjoints of every recorded node to zero."""
+        self._adjoints = array('d', bytes(8*len(self._nodes)))
+
+    def clear(self):
+        """Release every recorded node and operation. The Reverse objects are detached from the
+        Tape, so that the leaves can be reused on another Tape and the intermediate nodes can be
+        garbage collected.
+        """
+        for node in self._nodes:
+            node._tape = None
+            node._index = None
+        self.__init__()
+
+    def backward(self, output, seed=1.0):
+        """Compute the adjoints of every recorded node with respect to output by a single
+        reverse sweep over the Tape. Afterwards, the 'grad' of each recorded Reverse object
+        holds its adjoint.
+
+        Args:
+            output (Reverse): node to differentiate
+            seed (int or float, optional): adjoint of the output. Defaults to 1.0.
+        """
+        self._register(output)
+        self._sweep([(output, seed)])
+
+    def _sweep(self, seeds):
+        """Compute the adjoints of every recorded node with respect to a weighted sum of nodes by a
+        single reverse sweep over the Tape.
+
+        Args:
+            seeds (list): (node, adjoint) pairs of recorded nodes and their weights in the sum
+        """
+        offsets, parents, weights = self._offsets, self._parents, self._weights
+        adjoints = array('d', bytes(8*len(self._nodes)))
+        last = -1
+        for node, seed in seeds:
+            adjoints[node._index] += seed
+            last = max(last, node._index)
+        # nodes after the last output cannot contribute to it
+        for i in range(last, -1, -1):
+            adjoint = adjoints[i]
+            if adjoint:
+                for e in range(offsets[i], offsets[i + 1]):
+                    adjoints[parents[e]] += weights[e]*adjoint
+        self._adjoints = adjoints
+
+    def gradient(self, output, inputs):
+        """Compute the gradient of output with respect to inputs.
+
+        Args:
+            output (Reverse): node to differentiate
+            inputs (list or tuple): Reverse objects to differentiate with respect to
+
+        Returns:
+            numpy.ndarray: partial derivatives of output with respect to each input
+
+        Examples
+        --------
+        >>> x = Reverse(2)
+        >>> with Tape() as tape:
+        ...     z = x * x
+        >>> tape.gradient(z, [x])
+        array([4.])
+        """
+        self.backward(output)
+        adjoints = self._adjoints
+        return np.array([adjoints[node._index] if node._tape is self else 0.0 for node in inputs])
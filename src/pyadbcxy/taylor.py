@@ -0,0 +1,461 @@
+"""
+This file contains the Taylor module for the PyADBCXY package. It includes the Taylor class, which
+implements truncated Taylor polynomial arithmetic (Taylor mode) to compute derivatives of arbitrary
+order in a single evaluation of a function.
+"""
+import math
+import numbers
+import numpy as np
+from .variable import _NUMBER_TYPES, _any, _log, _log_base, _power
+from .elementary_functions import (_exp, _sin, _cos, _tan, _sinh, _cosh, _tanh, _arcsin, _arccos,
+                                   _arctan)
+
+
+__all__ = ["Taylor"]
+
+
+# The functions below work on lists of normalized Taylor coefficients, the jth coefficient being
+# the jth derivative divided by j!. Each coefficient of a result is computed from the lower ones
+# with a convolution, so a polynomial of order k costs O(k^2) operations.
+
+
+def _truncate(a, b):
+    """Truncate two lists of coefficients to the lower of their orders."""
+    k = min(len(a), len(b))
+    return a[:k], b[:k]
+
+
+def _multiply(a, b):
+    """Coefficients of the product of two polynomials (Cauchy product)."""
+    return [sum(a[i]*b[j - i] for i in range(j + 1)) for j in range(len(a))]
+
+
+def _divide(a, b):
+    """Coefficients of the quotient of two polynomials, solving b * w = a for w."""
+    if _any(b[0] == 0):
+        raise ZeroDivisionError("division by zero")
+    w = []
+    for j in range(len(a)):
+        s = a[j]
+        for i in range(1, j + 1):
+            s = s - b[i]*w[j - i]
+        w.append(s/b[0])
+    return w
+
+
+def _derivative(u):
+    """Coefficients of the derivative of a polynomial, of one order less."""
+    return [(j + 1)*u[j + 1] for j in range(len(u) - 1)]
+
+
+def _integral(w0, d):
+    """Coefficients of the polynomial whose value is w0 and whose derivative is d."""
+    return [w0] + [d[j]/(j + 1) for j in range(len(d))]
+
+
+def _exponential(u):
+    """Coefficients of exp(u), from w' = u' w."""
+    w = [_exp(u[0])]
+    for j in range(1, len(u)):
+        w.append(sum(i*u[i]*w[j - i] for i in range(1, j + 1))/j)
+    return w
+
+
+def _logarithm(u):
+    """Coefficients of the natural logarithm of u, from u w' = u'."""
+    if _any(u[0] <= 0):
+        raise ValueError("math domain error")
+    w = [_log(u[0])]
+    for j in range(1, len(u)):
+        w.append((u[j] - sum(i*w[i]*u[j - i] for i in range(1, j))/j)/u[0])
+    return w
+
+
+def _power_constant(u, r):
+    """Coefficients of u ** r for a constant exponent r, from u w' = r u' w."""
+    if isinstance(r, numbers.Integral) or (not isinstance(r, np.ndarray) and float(r).is_integer()):
+        # integer exponents are exact, and defined for any u, by repeated squaring
+        r = int(r)
+        if r < 0:
+            return _divide([1.0] + [0.0]*(len(u) - 1), _power_constant(u, -r))
+        w, square = [1] + [0]*(len(u) - 1), u
+        while r:
+            if r & 1:
+                w = _multiply(w, square)
+            r >>= 1
+            if r:
+                square = _multiply(square, square)
+        return w
+    if _any(u[0] <= 0):
+        raise ValueError("math domain error: the base of exponentiation cannot be non-positive")
+    w = [_power(u[0], r)]
+    for j in range(1, len(u)):
+        w.append(sum((r*i - (j - i))*u[i]*w[j - i] for i in range(1, j + 1))/(j*u[0]))
+    return w
+
+
+def _sine_cosine(u, sign):
+    """Coefficients of sin(u) and cos(u) (sign = -1), or sinh(u) and cosh(u) (sign = 1), which are
+    each other's derivatives and are computed together."""
+    if sign < 0:
+        s, c = [_sin(u[0])], [_cos(u[0])]
+    else:
+        s, c = [_sinh(u[0])], [_cosh(u[0])]
+    for j in range(1, len(u)):
+        s.append(sum(i*u[i]*c[j - i] for i in range(1, j + 1))/j)
+        c.append(sign*sum(i*u[i]*s[j - i] for i in range(1, j + 1))/j)
+    return s, c
+
+
+def _tangent(u, sign):
+    """Coefficients of tan(u) (sign = 1) or tanh(u) (sign = -1), from w' = (1 + sign w^2) u'."""
+    w = [_tan(u[0])] if sign > 0 else [_tanh(u[0])]
+    # coefficients of 1 + sign w^2, the derivative of the function at u
+    v = [1 + sign*w[0]**2]
+    for j in range(1, len(u)):
+        w.append(sum(i*u[i]*v[j - i] for i in range(1, j + 1))/j)
+        v.append(sign*sum(w[i]*w[j - i] for i in range(j + 1)))
+    return w
+
+
+class Taylor(object):
+    """
+    This class implements truncated Taylor polynomials (generalized dual numbers) for the Taylor
+    mode of automatic differentiation. A Taylor object of order k holds the k + 1 normalized
+    Taylor coefficients f(x0), f'(x0), f''(x0) / 2!, ..., f^(k)(x0) / k! of a function at a point,
+    and the operators and elementary functions propagate all of them at once with recurrences
+    costing O(k^2) operations, instead of the exponential cost of nesting Variables.
+
+    The input is created with its value, its derivative (1 by default) and the order of the
+    highest derivative needed. Seeding the derivative with a direction dx gives the derivatives
+    of t -> f(x0 + t dx) at t = 0, i.e. directional derivatives of functions of several inputs.
+    Values may also be numpy arrays, to expand a function at several points at once.
+
+    Examples
+    --------
+    >>> x = Taylor(0.5, order=4)
+    >>> y = sin(x) * exp(x)
+    >>> y.val
+    0.7904390832136149
+    >>> y.derivatives
+    array([ 0.79043908,  2.23732812,  2.89377807,  1.31289991, -3.16175633])
+    >>> y.derivative(3)
+    1.3128999067411091
+
+    # Coefficients of the series expansion of 1 / (1 - x) at 0
+    >>> (1 / (1 - Taylor(0., order=5))).coefficients
+    array([1., 1., 1., 1., 1., 1.])
+    """
+
+    __slots__ = ("_coefs",)
+    __array_ufunc__ = None
+
+    def __init__(self, val, der=1, order=1):
+        """Constructor for the Taylor class.
+
+        Args:
+            val (int, float, or numpy.ndarray): value of the input
+            der (int, float, or numpy.ndarray, optional): derivative of the input, or direction
+                along which a function of several inputs is expanded. Defaults to 1.
+            order (int, optional): order of the highest derivative. Defaults to 1.
+
+        Raises:
+            ValueError: if order is negative
+        """
+        if order < 0:
+            raise ValueError(f"order cannot be negative, not {order}")
+        self._coefs = ([val, der] + [0]*(order - 1))[:order + 1]
+
+    @classmethod
+    def _new(cls, coefs):
+        """Create a Taylor object from its list of coefficients."""
+        new = cls.__new__(cls)
+        new._coefs = coefs
+        return new
+
+    def __str__(self):
+        return f"Taylor(coefficients = {self._coefs})"
+
+    def __repr__(self):
+        return str(self)
+
+    @property
+    def val(self):
+        """Get the value of the Taylor polynomial."""
+        return self._coefs[0]
+
+    @property
+    def order(self):
+        """Get the order of the highest derivative held by the Taylor polynomial."""
+        return len(self._coefs) - 1
+
+    @property
+    def coefficients(self):
+        """Get the normalized Taylor coefficients, f^(j)(x0) / j! for j = 0, ..., order (along the
+        first axis for array values)."""
+        for coef in self._coefs:
+            if isinstance(coef, np.ndarray):
+                return np.array(np.broadcast_arrays(*self._coefs))
+        return np.array(self._coefs)
+
+    @property
+    def derivatives(self):
+        """Get the derivatives f^(j)(x0) for j = 0, ..., order (along the first axis for array values)."""
+        coefficients = self.coefficients
+        factorials = [math.factorial(j) for j in range(len(self._coefs))]
+        return coefficients*np.reshape(factorials, (-1,) + (1,)*(coefficients.ndim - 1))
+
+    def derivative(self, n=1):
+        """Get the derivative of order n.
+
+        Args:
+            n (int, optional): order of the derivative. Defaults to 1.
+
+        Raises:
+            ValueError: if n is negative or greater than the order of the Taylor polynomial
+
+        Returns:
+            int, float, or numpy.ndarray: nth derivative
+        """
+        if n < 0 or n > self.order:
+            raise ValueError(f"derivative of order {n} is not available, the order is {self.order}")
+        return self._coefs[n]*math.factorial(n)
+
+    def __add__(self, other):
+        """Overload of the '+' operator (Taylor + other).
+
+        Args:
+            other (Taylor, real number, or numpy.ndarray): item to be added to the Taylor object
+
+        Returns:
+            Taylor: resulting Taylor object
+        """
+        if isinstance(other, Taylor):
+            a, b = _truncate(self._coefs, other._coefs)
+            return Taylor._new([x + y for x, y in zip(a, b)])
+        elif isinstance(other, _NUMBER_TYPES):
+            return Taylor._new([self._coefs[0] + other] + self._coefs[1:])
+        elif isinstance(other, numbers.Real):
+            return self + float(other)
+        else:
+            raise TypeError(f"unsupported operand type(s) for +: '{type(self)}' and '{type(other)}'")
+
+    def __radd__(self, other):
+        return self.__add__(other)
+
+    def __neg__(self):
+        """Overload of the negation '-' operator."""
+        return Taylor._new([-coef for coef in self._coefs])
+
+    def __sub__(self, other):
+        """Overload of the '-' operator (Taylor - other).
+
+        Args:
+            other (Taylor, real number, or numpy.ndarray): item to be subtracted from the Taylor object
+
+        Returns:
+            Taylor: resulting Taylor object
+        """
+        if isinstance(other, Taylor):
+            a, b = _truncate(self._coefs, other._coefs)
+            return Taylor._new([x - y for x, y in zip(a, b)])
+        elif isinstance(other, _NUMBER_TYPES):
+            return Taylor._new([self._coefs[0] - other] + self._coefs[1:])
+        elif isinstance(other, numbers.Real):
+            return self - float(other)
+        else:
+            raise TypeError(f"unsupported operand type(s) for -: '{type(self)}' and '{type(other)}'")
+
+    def __rsub__(self, other):
+        """Overload of the '-' operator (other - Taylor)."""
+        if isinstance(other, _NUMBER_TYPES) or isinstance(other, numbers.Real):
+            return -self + other
+        raise TypeError(f"unsupported operand type(s) for -: '{type(other)}' and '{type(self)}'")
+
+    def __mul__(self, other):
+        """Overload of the '*' operator (Taylor * other).
+
+        Args:
+            other (Taylor, real number, or numpy.ndarray): item to be multiplied by the Taylor object
+
+        Returns:
+            Taylor: resulting Taylor object
+        """
+        if isinstance(other, Taylor):
+            return Taylor._new(_multiply(*_truncate(self._coefs, other._coefs)))
+        elif isinstance(other, _NUMBER_TYPES):
+            return Taylor._new([coef*other for coef in self._coefs])
+        elif isinstance(other, numbers.Real):
+            return self * float(other)
+        else:
+            raise TypeError(f"unsupported operand type(s) for *: '{type(self)}' and '{type(other)}'")
+
+    def __rmul__(self, other):
+        return self.__mul__(other)
+
+    def __truediv__(self, other):
+        """Overload of the '/' operator (Taylor / other).
+
+        Args:
+            other (Taylor, real number, or numpy.ndarray): item the Taylor object is to be divided by
+
+        Raises:
+            ZeroDivisionError: if the value of other is zero
+
+        Returns:
+            Taylor: resulting Taylor object
+        """
+        if isinstance(other, Taylor):
+            return Taylor._new(_divide(*_truncate(self._coefs, other._coefs)))
+        elif isinstance(other, _NUMBER_TYPES):
+            if _any(other == 0):
+                raise ZeroDivisionError("division by zero")
+            inverse = _power(other, -1)
+            return Taylor._new([coef*inverse for coef in self._coefs])
+        elif isinstance(other, numbers.Real):
+            return self / float(other)
+        else:
+            raise TypeError(f"unsupported operand type(s) for /: '{type(self)}' and '{type(other)}'")
+
+    def __rtruediv__(self, other):
+        """Overload of the '/' operator (other / Taylor)."""
+        if isinstance(other, _NUMBER_TYPES):
+            return Taylor._new(_divide([other] + [0]*self.order, self._coefs))
+        elif isinstance(other, numbers.Real):
+            return float(other) / self
+        else:
+            raise TypeError(f"unsupported operand type(s) for /: '{type(other)}' and '{type(self)}'")
+
+    def __pow__(self, other):
+        """Overload of the '**' or 'pow()' operator (Taylor**other). Integer exponents are computed
+        by repeated multiplication, so they are exact and allow any value of the base.
+
+        Args:
+            other (Taylor, real number, or numpy.ndarray): item the Taylor object is to be raised to
+
+        Raises:
+            ValueError: if the base is not positive and the exponent is not an integer
+
+        Returns:
+            Taylor: resulting Taylor object
+        """
+        if isinstance(other, Taylor):
+            a, b = _truncate(self._coefs, other._coefs)
+            if _any(a[0] <= 0):
+                raise ValueError("math domain error: the base of exponentiation cannot be non-positive")
+            return Taylor._new(_exponential(_multiply(b, _logarithm(a))))
+        elif isinstance(other, _NUMBER_TYPES):
+            return Taylor._new(_power_constant(self._coefs, other))
+        elif isinstance(other, numbers.Real):
+            return self ** float(other)
+        else:
+            raise TypeError(f"unsupported operand type(s) for ** or pow(): '{type(self)}' and '{type(other)}'")
+
+    def __rpow__(self, other):
+        """Overload of the '**' or 'pow()' operator (other**Taylor)."""
+        if isinstance(other, _NUMBER_TYPES):
+            if _any(other <= 0):
+                raise ValueError("math domain error: the base of exponentiation cannot be non-positive")
+            log_base = _log_base(other)
+            return Taylor._new(_exponential([coef*log_base for coef in self._coefs]))
+        elif isinstance(other, numbers.Real):
+            return float(other) ** self
+        else:
+            raise TypeError(f"unsupported operand type(s) for ** or pow(): '{type(other)}' and '{type(self)}'")
+
+    def __eq__(self, other):
+        """Overload of the '==' operator. Taylor objects are equal if all of their coefficients are."""
+        if not isinstance(other, Taylor) or len(self._coefs) != len(other._coefs):
+            return False
+        return all(_any(np.all(x == y)) for x, y in zip(self._coefs, other._coefs))
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    __hash__ = None
+
+    def log(self, base=np.e):
+        """Logarithm of the Taylor object, used by the log elementary function.
+
+        Args:
+            base (int or float, optional): logarithm base. Defaults to np.e.
+
+        Raises:
+            ValueError: if the value is not positive or the base is not positive
+            ZeroDivisionError: if the base is 1
+
+        Returns:
+            Taylor: resulting Taylor object
+        """
+        if base == 1:
+            raise ZeroDivisionError("float division by zero")
+        if base <= 0:
+            raise ValueError("math domain error")
+        log_base = _log_base(base)
+        return Taylor._new([coef/log_base for coef in _logarithm(self._coefs)])
+
+    def exp(self):
+        """Exponential of the Taylor object, used by the exp elementary function."""
+        return Taylor._new(_exponential(self._coefs))
+
+    def sin(self):
+        """Sine of the Taylor object, used by the sin elementary function."""
+        return Taylor._new(_sine_cosine(self._coefs, -1)[0])
+
+    def cos(self):
+        """Cosine of the Taylor object, used by the cos elementary function."""
+        return Taylor._new(_sine_cosine(self._coefs, -1)[1])
+
+    def tan(self):
+        """Tangent of the Taylor object, used by the tan elementary function."""
+        return Taylor._new(_tangent(self._coefs, 1))
+
+    def sinh(self):
+        """Hyperbolic sine of the Taylor object, used by the sinh elementary function."""
+        return Taylor._new(_sine_cosine(self._coefs, 1)[0])
+
+    def cosh(self):
+        """Hyperbolic cosine of the Taylor object, used by the cosh elementary function."""
+        return Taylor._new(_sine_cosine(self._coefs, 1)[1])
+
+    def tanh(self):
+        """Hyperbolic tangent of the Taylor object, used by the tanh elementary function."""
+        return Taylor._new(_tangent(self._coefs, -1))
+
+    def _inverse_trigonometric(self, w0, scale, sign):
+        """Inverse trigonometric function whose value is w0 and whose derivative is
+        scale * u' / sqrt(1 + sign u^2) for sign = -1, or scale * u' / (1 + u^2) for sign = 1.
+        The derivative is only needed to one order less than the result."""
+        u = self._coefs
+        if len(u) == 1:
+            return Taylor._new([w0])
+        inner = Taylor._new(u[:-1])
+        denominator = 1 + sign*inner*inner
+        if sign < 0:
+            denominator = denominator ** 0.5
+        derivative = scale*Taylor._new(_derivative(u)) / denominator
+        return Taylor._new(_integral(w0, derivative._coefs))
+
+    def arcsin(self):
+        """Arc sine of the Taylor object, used by the arcsin elementary function.
+
+        Raises:
+            ValueError: if the value is not between -1 and 1
+        """
+        if _any(self._coefs[0] < -1) or _any(self._coefs[0] > 1):
+            raise ValueError("math domain error")
+        return self._inverse_trigonometric(_arcsin(self._coefs[0]), 1, -1)
+
+    def arccos(self):
+        """Arc cosine of the Taylor object, used by the arccos elementary function.
+
+        Raises:
+            ValueError: if the value is not between -1 and 1
+        """
+        if _any(self._coefs[0] < -1) or _any(self._coefs[0] > 1):
+            raise ValueError("math domain error")
+        return self._inverse_trigonometric(_arccos(self._coefs[0]), -1, -1)
+
+    def arctan(self):
+        """Arc tangent of the Taylor object, used by the arctan elementary function."""
+        return self._inverse_trigonometric(_arctan(self._coefs[0]), 1, 1)
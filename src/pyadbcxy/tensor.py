@@ -0,0 +1,477 @@
+"""
+This file contains the Tensor module for the PyADBCXY package. It includes the Tensor class, which
+implements the reverse mode of automatic differentiation on array-valued nodes, so that an
+operation on a whole array (e.g. a matrix product) is a single node of the graph whose backward
+pass is a single NumPy call.
+"""
+import numbers
+import numpy as np
+from .variable import _NUMBER_TYPES, _any, _log_base
+
+
+__all__ = ["Tensor"]
+
+
+def _unbroadcast(grad, shape):
+    """Sum an adjoint over the axes its operand was broadcast along, to get back to its shape.
+
+    Args:
+        grad (numpy.ndarray): adjoint with the shape of the result of the operation
+        shape (tuple): shape of the operand
+
+    Returns:
+        numpy.ndarray: adjoint with the shape of the operand
+    """
+    while grad.ndim > len(shape):
+        grad = grad.sum(axis=0)
+    for axis, size in enumerate(shape):
+        if size == 1 and grad.shape[axis] != 1:
+            grad = grad.sum(axis=axis, keepdims=True)
+    return grad
+
+
+class Tensor(object):
+    """
+    This class implements array-valued nodes for the reverse mode of automatic differentiation.
+    Each operation on Tensor objects creates one node holding the resulting array and, for each
+    operand that is a Tensor, a function computing the adjoint of the operand from the adjoint of
+    the result (vector-Jacobian product) with one NumPy call. The operators apply element-wise
+    with NumPy broadcasting, and the matrix product ('@', 'dot'), the reductions ('sum', 'mean'),
+    'reshape', 'transpose' and indexing are supported as well as every elementary function.
+
+    Calling 'backward' on a result runs one reverse sweep over the graph, in topological order,
+    after which the 'grad' of every Tensor it depends on holds the adjoint of that Tensor, with
+    the same shape as its value. A matrix-vector product of size n x n is therefore a single node,
+    rather than the n^2 scalar nodes built with Reverse objects.
+
+    Examples
+    --------
+    >>> A = Tensor(np.array([[1., 2.], [3., 4.]]))
+    >>> x = Tensor(np.array([1., -1.]))
+    >>> loss = (tanh(A @ x) ** 2).sum()
+    >>> loss.backward()
+    >>> x.grad
+    array([-2.55880003, -3.83820005])
+    >>> A.grad.shape
+    (2, 2)
+    """
+
+    __slots__ = ("_val", "_grad", "_parents")
+    __array_ufunc__ = None
+
+    def __init__(self, val):
+        """Constructor for the Tensor class.
+
+        Args:
+            val (int, float, list, or numpy.ndarray): value of the Tensor, converted to an array of floats
+        """
+        self._val = np.array(val, dtype=float)
+        self._grad = None
+        # (operand, vector-Jacobian product) pairs of the operation that created the Tensor
+        self._parents = ()
+
+    @classmethod
+    def _node(cls, val, parents):
+        """Create the Tensor resulting from an operation.
+
+        Args:
+            val (numpy.ndarray): value of the result
+            parents (list): (operand, vector-Jacobian product) pairs, including only the
+                            operands that are Tensor objects
+
+        Returns:
+            Tensor: resulting Tensor object
+        """
+        new = cls.__new__(cls)
+        new._val = val
+        new._grad = None
+        new._parents = tuple((parent, vjp) for parent, vjp in parents if isinstance(parent, Tensor))
+        return new
+
+    def __str__(self):
+        return f"Tensor(val = {self._val})"
+
+    def __repr__(self):
+        return str(self)
+
+    @property
+    def val(self):
+        """Get the value of the Tensor."""
+        return self._val
+
+    @property
+    def grad(self):
+        """Get the adjoint of the Tensor from the last call of 'backward', zeros if the output
+        did not depend on it."""
+        if self._grad is None:
+            return np.zeros_like(self._val)
+        return self._grad
+
+    @property
+    def shape(self):
+        """Get the shape of the value of the Tensor."""
+        return self._val.shape
+
+    @property
+    def ndim(self):
+        """Get the number of dimensions of the value of the Tensor."""
+        return self._val.ndim
+
+    def _topological_order(self):
+        """Get the Tensor objects this Tensor depends on, each one after its operands, without recursion."""
+        order = []
+        visited = {id(self)}
+        stack = [(self, iter(self._parents))]
+        while stack:
+            node, parents = stack[-1]
+            for parent, vjp in parents:
+                if id(parent) not in visited:
+                    visited.add(id(parent))
+                    stack.append((parent, iter(parent._parents)))
+                    break
+            else:
+                stack.pop()
+                order.append(node)
+        return order
+
+    def backward(self, seed=None):
+        """Compute the adjoint of every Tensor this Tensor depends on by a single reverse sweep.
+        The adjoints of a previous call are discarded.
+
+        Args:
+            seed (int, float, or numpy.ndarray, optional): adjoint of this Tensor. Defaults to
+                                                           None, which is 1 for a Tensor holding a
+                                                           single value.
+
+        Raises:
+            ValueError: if no seed is given for a Tensor holding several values
+        """
+        if seed is None:
+            if self._val.size != 1:
+                raise ValueError(f"a seed must be given for a Tensor of shape {self.shape}")
+            seed = 1.0
+        order = self._topological_order()
+        for node in order:
+            node._grad = None
+        self._grad = np.array(np.broadcast_to(seed, self.shape), dtype=float)
+        for node in reversed(order):
+            if node._grad is None:
+                continue
+            for parent, vjp in node._parents:
+                contribution = vjp(node._grad)
+                parent._grad = contribution if parent._grad is None else parent._grad + contribution
+
+    @staticmethod
+    def _value(other, symbol):
+        """Get the value of the other operand of a binary operator.
+
+        Raises:
+            TypeError: if other is not a Tensor, a real number or a numpy array
+        """
+        if isinstance(other, Tensor):
+            return other._val
+        elif isinstance(other, _NUMBER_TYPES) or isinstance(other, numbers.Real):
+            return np.asarray(other, dtype=float)
+        raise TypeError(f"unsupported operand type(s) for {symbol}: 'Tensor' and '{type(other)}'")
+
+    def __add__(self, other):
+        """Overload of the '+' operator (Tensor + other), with broadcasting.
+
+        Args:
+            other (Tensor, real number, or numpy.ndarray): item to be added to the Tensor
+
+        Returns:
+            Tensor: resulting Tensor object
+        """
+        a, b = self._val, self._value(other, "+")
+        return Tensor._node(a + b, [(self, lambda g: _unbroadcast(g, a.shape)),
+                                    (other, lambda g: _unbroadcast(g, b.shape))])
+
+    def __radd__(self, other):
+        return self.__add__(other)
+
+    def __neg__(self):
+        """Overload of the negation '-' operator."""
+        return Tensor._node(-self._val, [(self, lambda g: -g)])
+
+    def __sub__(self, other):
+        """Overload of the '-' operator (Tensor - other), with broadcasting."""
+        a, b = self._val, self._value(other, "-")
+        return Tensor._node(a - b, [(self, lambda g: _unbroadcast(g, a.shape)),
+                                    (other, lambda g: -_unbroadcast(g, b.shape))])
+
+    def __rsub__(self, other):
+        return (-self).__add__(other)
+
+    def __mul__(self, other):
+        """Overload of the '*' operator (Tensor * other), element-wise with broadcasting."""
+        a, b = self._val, self._value(other, "*")
+        return Tensor._node(a * b, [(self, lambda g: _unbroadcast(g * b, a.shape)),
+                                    (other, lambda g: _unbroadcast(g * a, b.shape))])
+
+    def __rmul__(self, other):
+        return self.__mul__(other)
+
+    def __truediv__(self, other):
+        """Overload of the '/' operator (Tensor / other), element-wise with broadcasting.
+
+        Raises:
+            ZeroDivisionError: if other has a zero entry
+        """
+        a, b = self._val, self._value(other, "/")
+        if _any(b == 0):
+            raise ZeroDivisionError("division by zero")
+        val = a / b
+        return Tensor._node(val, [(self, lambda g: _unbroadcast(g / b, a.shape)),
+                                  (other, lambda g: _unbroadcast(-g * val / b, b.shape))])
+
+    def __rtruediv__(self, other):
+        """Overload of the '/' operator (other / Tensor)."""
+        a, b = self._value(other, "/"), self._val
+        if _any(b == 0):
+            raise ZeroDivisionError("division by zero")
+        val = a / b
+        return Tensor._node(val, [(self, lambda g: _unbroadcast(-g * val / b, b.shape))])
+
+    def __pow__(self, other):
+        """Overload of the '**' or 'pow()' operator (Tensor**other), element-wise with broadcasting.
+
+        Raises:
+            ValueError: if the exponent is a Tensor and the base has a non-positive entry
+        """
+        a, b = self._val, self._value(other, "**")
+        if isinstance(other, Tensor):
+            if _any(a <= 0):
+                raise ValueError("math domain error: the base of exponentiation cannot be non-positive")
+            val = a ** b
+            return Tensor._node(val, [(self, lambda g: _unbroadcast(g * b * a ** (b - 1), a.shape)),
+                                      (other, lambda g: _unbroadcast(g * np.log(a) * val, b.shape))])
+        return Tensor._node(a ** b, [(self, lambda g: _unbroadcast(g * b * a ** (b - 1), a.shape))])
+
+    def __rpow__(self, other):
+        """Overload of the '**' or 'pow()' operator (other**Tensor).
+
+        Raises:
+            ValueError: if the base has a non-positive entry
+        """
+        a, b = self._value(other, "**"), self._val
+        if _any(a <= 0):
+            raise ValueError("math domain error: the base of exponentiation cannot be non-positive")
+        val = a ** b
+        return Tensor._node(val, [(self, lambda g: _unbroadcast(g * val * np.log(a), b.shape))])
+
+    @staticmethod
+    def _matmul(x, y, a, b):
+        """Matrix product of two operands, promoting vectors to matrices as numpy.matmul does.
+
+        Args:
+            x, y (Tensor or numpy.ndarray): operands
+            a, b (numpy.ndarray): values of the operands
+
+        Returns:
+            Tensor: resulting Tensor object
+        """
+        val = np.matmul(a, b)
+        # vectors are matrices of one row (left) or one column (right)
+        a2 = a[np.newaxis, :] if a.ndim == 1 else a
+        b2 = b[:, np.newaxis] if b.ndim == 1 else b
+        shape = np.broadcast(np.empty(a2.shape[:-2]), np.empty(b2.shape[:-2])).shape + (a2.shape[-2], b2.shape[-1])
+        return Tensor._node(val, [
+            (x, lambda g: _unbroadcast(np.matmul(g.reshape(shape), np.swapaxes(b2, -1, -2)), a2.shape).reshape(a.shape)),
+            (y, lambda g: _unbroadcast(np.matmul(np.swapaxes(a2, -1, -2), g.reshape(shape)), b2.shape).reshape(b.shape)),
+        ])
+
+    def __matmul__(self, other):
+        """Overload of the '@' operator (Tensor @ other), the matrix product as in numpy.matmul.
+
+        Args:
+            other (Tensor or numpy.ndarray): item to multiply the Tensor with
+
+        Returns:
+            Tensor: resulting Tensor object
+        """
+        return self._matmul(self, other, self._val, self._value(other, "@"))
+
+    def __rmatmul__(self, other):
+        """Overload of the '@' operator (other @ Tensor)."""
+        return self._matmul(other, self, self._value(other, "@"), self._val)
+
+    def dot(self, other):
+        """Dot product of two vectors, or matrix product of vectors and matrices. Same as the
+        '@' operator for operands of one or two dimensions.
+
+        Args:
+            other (Tensor or numpy.ndarray): item to multiply the Tensor with
+
+        Raises:
+            ValueError: if an operand has more than two dimensions
+
+        Returns:
+            Tensor: resulting Tensor object
+        """
+        b = self._value(other, "dot")
+        if self.ndim > 2 or b.ndim > 2:
+            raise ValueError("dot is only defined for operands of one or two dimensions, use '@' instead")
+        return self._matmul(self, other, self._val, b)
+
+    def sum(self, axis=None, keepdims=False):
+        """Sum of the entries of the Tensor, over all of them or along some axes.
+
+        Args:
+            axis (int or tuple, optional): axes to sum along. Defaults to None, which sums every entry.
+            keepdims (bool, optional): whether to keep the summed axes with a size of 1. Defaults to False.
+
+        Returns:
+            Tensor: resulting Tensor object
+        """
+        a = self._val
+        val = a.sum(axis=axis, keepdims=keepdims)
+
+        def vjp(g):
+            if axis is not None and not keepdims:
+                g = np.expand_dims(g, axis)
+            return np.broadcast_to(g, a.shape).copy()
+        return Tensor._node(val, [(self, vjp)])
+
+    def mean(self, axis=None, keepdims=False):
+        """Mean of the entries of the Tensor, over all of them or along some axes.
+
+        Args:
+            axis (int or tuple, optional): axes to average along. Defaults to None, which averages every entry.
+            keepdims (bool, optional): whether to keep the averaged axes with a size of 1. Defaults to False.
+
+        Returns:
+            Tensor: resulting Tensor object
+        """
+        total = self.sum(axis, keepdims)
+        return total * (total._val.size / self._val.size)
+
+    def reshape(self, *shape):
+        """Give the value of the Tensor a new shape, as numpy.reshape does.
+
+        Args:
+            shape (int or tuple): new shape
+
+        Returns:
+            Tensor: resulting Tensor object
+        """
+        a = self._val
+        return Tensor._node(a.reshape(*shape), [(self, lambda g: g.reshape(a.shape))])
+
+    def transpose(self, *axes):
+        """Permute the axes of the Tensor, as numpy.transpose does.
+
+        Args:
+            axes (int or tuple, optional): permutation of the axes. Defaults to reversing them.
+
+        Returns:
+            Tensor: resulting Tensor object
+        """
+        val = self._val.transpose(*axes)
+        if len(axes) == 1 and isinstance(axes[0], (list, tuple)):
+            axes = axes[0]
+        inverse = np.argsort(axes) if axes else None
+        return Tensor._node(val, [(self, lambda g: g.transpose(inverse))])
+
+    @property
+    def T(self):
+        """Get the Tensor with its axes reversed."""
+        return self.transpose()
+
+    def __getitem__(self, index):
+        """Overload of indexing and slicing (Tensor[index]), as for numpy arrays.
+
+        Args:
+            index (int, slice, tuple, list, or numpy.ndarray): index of the entries
+
+        Returns:
+            Tensor: resulting Tensor object
+        """
+        a = self._val
+
+        def vjp(g):
+            grad = np.zeros_like(a)
+            # entries selected several times by an integer array index get every contribution
+            np.add.at(grad, index, g)
+            return grad
+        return Tensor._node(a[index], [(self, vjp)])
+
+    def _elementwise(self, val, derivative):
+        """Apply an element-wise function to the Tensor.
+
+        Args:
+            val (numpy.ndarray): value of the function at the entries of the Tensor
+            derivative (numpy.ndarray): derivative of the function at the entries of the Tensor
+
+        Returns:
+            Tensor: resulting Tensor object
+        """
+        return Tensor._node(val, [(self, lambda g: g * derivative)])
+
+    def log(self, base=np.e):
+        """Logarithm of the entries of the Tensor, used by the log elementary function.
+
+        Raises:
+            ValueError: if the Tensor has a non-positive entry or the base is not positive
+            ZeroDivisionError: if the base is 1
+        """
+        if base == 1:
+            raise ZeroDivisionError("float division by zero")
+        if base <= 0 or _any(self._val <= 0):
+            raise ValueError("math domain error")
+        log_base = _log_base(base)
+        return self._elementwise(np.log(self._val) / log_base, 1 / (self._val * log_base))
+
+    def exp(self):
+        """Exponential of the entries of the Tensor, used by the exp elementary function."""
+        val = np.exp(self._val)
+        return self._elementwise(val, val)
+
+    def sin(self):
+        """Sine of the entries of the Tensor, used by the sin elementary function."""
+        return self._elementwise(np.sin(self._val), np.cos(self._val))
+
+    def cos(self):
+        """Cosine of the entries of the Tensor, used by the cos elementary function."""
+        return self._elementwise(np.cos(self._val), -np.sin(self._val))
+
+    def tan(self):
+        """Tangent of the entries of the Tensor, used by the tan elementary function."""
+        return self._elementwise(np.tan(self._val), 1 / np.cos(self._val) ** 2)
+
+    def sinh(self):
+        """Hyperbolic sine of the entries of the Tensor, used by the sinh elementary function."""
+        return self._elementwise(np.sinh(self._val), np.cosh(self._val))
+
+    def cosh(self):
+        """Hyperbolic cosine of the entries of the Tensor, used by the cosh elementary function."""
+        return self._elementwise(np.cosh(self._val), np.sinh(self._val))
+
+    def tanh(self):
+        """Hyperbolic tangent of the entries of the Tensor, used by the tanh elementary function."""
+        val = np.tanh(self._val)
+        return self._elementwise(val, 1 - val ** 2)
+
+    def arcsin(self):
+        """Arc sine of the entries of the Tensor, used by the arcsin elementary function.
+
+        Raises:
+            ValueError: if the Tensor has an entry outside of [-1, 1]
+        """
+        if _any(self._val < -1) or _any(self._val > 1):
+            raise ValueError("math domain error")
+        return self._elementwise(np.arcsin(self._val), 1 / np.sqrt(1 - self._val ** 2))
+
+    def arccos(self):
+        """Arc cosine of the entries of the Tensor, used by the arccos elementary function.
+
+        Raises:
+            ValueError: if the Tensor has an entry outside of [-1, 1]
+        """
+        if _any(self._val < -1) or _any(self._val > 1):
+            raise ValueError("math domain error")
+        return self._elementwise(np.arccos(self._val), -1 / np.sqrt(1 - self._val ** 2))
+
+    def arctan(self):
+        """Arc tangent of the entries of the Tensor, used by the arctan elementary function."""
+        return self._elementwise(np.arctan(self._val), 1 / (1 + self._val ** 2))
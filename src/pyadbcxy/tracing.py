@@ -0,0 +1,430 @@
+"""
+This file contains the tracing module for the PyADBCXY package. It includes the trace function,
+which records the operations of a function once on a Tape, and the CompiledFunction class, which
+replays the recorded operations from a flat plan to compute the value and derivative of the
+function at new inputs without creating any Variable or Reverse objects. Before it is used, the
+plan is optimized by folding constant operations, merging repeated operations and dropping the
+operations the outputs do not depend on. Second derivatives are computed by running the same plan
+on Variables (forward-over-reverse).
+"""
+import numpy as np
+from .variable import Variable
+from .forward import _batch_shape, _stack
+from .reverse import Reverse
+from .tape import Tape, _RULES
+
+
+__all__ = ["trace", "CompiledFunction"]
+
+
+# operations whose operands can be swapped, so that x * y and y * x are merged
+_COMMUTATIVE = ("add", "mul")
+
+
+def trace(func, *args, optimize=True):
+    """Record the operations of a function at example values of its inputs and compile them
+    into a CompiledFunction. The function is executed once with Reverse objects, so it may use
+    the arithmetic operators as well as the elementary functions. Since only the executed
+    operations are recorded, the function must not branch on the values of its inputs.
+
+    Args:
+        func (function): function of interest, returning a single output or a list/tuple of outputs
+        args (int or float): example values of the inputs of the function
+        optimize (bool, optional): whether to optimize the recorded operations. Defaults to True.
+
+    Raises:
+        TypeError: if an example value is not a real number
+
+    Returns:
+        CompiledFunction: the compiled function
+
+    Examples
+    --------
+    >>> f = trace(lambda x, y: x * y + sin(x), 3, 4)
+    >>> f(1, 2)
+    2.8414709848078967
+    >>> f.derivative(1, 2)
+    array([2.54030231, 1.        ])
+    """
+    for arg in args:
+        if not isinstance(arg, int) and not isinstance(arg, float):
+            raise TypeError(f"example values must be int or float, not {type(arg)}")
+    leaves = [Reverse(arg) for arg in args]
+    with Tape() as tape:
+        # inputs that are returned as they are must still have a slot
+        for leaf in leaves:
+            tape._register(leaf)
+        res = func(*leaves)
+    return CompiledFunction(tape, leaves, res, optimize)
+
+
+class CompiledFunction(object):
+    """
+    This class implements a function compiled from the operations recorded on a Tape. The
+    recorded operations are turned into a flat plan of steps, each holding the name and rule of
+    the operation and the slots of its result and operands in a list of values. Evaluating the
+    function runs through the plan once (forward sweep), and its derivative is computed by
+    running through the plan backwards while accumulating the adjoint of each slot (reverse
+    sweep). The inputs may be numbers or numpy arrays, in which case the function is
+    evaluated element-wise for every entry at once.
+
+    Running both sweeps on Variables instead of numbers differentiates the gradient in forward
+    mode (forward-over-reverse): seeding the inputs with a direction gives the exact product of
+    the Hessian with that direction at the cost of about two gradients, and seeding them with
+    the unit vectors gives the whole Hessian in one pass.
+
+    The plan is optimized once, when it is compiled: operations whose operands are all constants
+    are folded into constants, operations repeating an earlier one on the same operands (such as
+    the second sin(x) in sin(x) * cos(x) + sin(x) ** 2) reuse its result, and operations the
+    outputs do not depend on are dropped, together with their slots. A dropped operation is not
+    evaluated any more, so it cannot raise an error for inputs outside of its domain either.
+
+    CompiledFunction objects are created with the trace function.
+
+    Examples
+    --------
+    >>> f = trace(lambda x, y: [x * y, x + y], 3, 4)
+    >>> f(1, 2)
+    array([2, 3])
+    >>> f.derivative(1, 2)
+    array([[2., 1.],
+           [1., 1.]])
+
+    # Evaluate the function at several points at once
+    >>> g = trace(lambda x: x ** 2, 3)
+    >>> g.derivative(np.array([1., 2., 3.]))
+    array([[2.],
+           [4.],
+           [6.]])
+
+    # Second derivatives
+    >>> h = trace(lambda x, y: x ** 2 * y, 3, 4)
+    >>> h.hessian(1, 2)
+    array([[4., 2.],
+           [2., 0.]])
+    >>> h.hvp((1, 2), (1, 0))
+    array([4., 2.])
+
+    # Repeated operations are only evaluated once
+    >>> len(trace(lambda x: sin(x) * cos(x) + sin(x) ** 2, 1))
+    5
+    """
+
+    def __init__(self, tape, inputs, outputs, optimize=True):
+        """Constructor for the CompiledFunction class.
+
+        Args:
+            tape (Tape): Tape the operations of the function were recorded on
+            inputs (list): Reverse objects the function was recorded with
+            outputs (Reverse, int, float, list, or tuple): output(s) of the function
+            optimize (bool, optional): whether to optimize the plan. Defaults to True.
+        """
+        nodes, ops, consts = tape._nodes, tape._ops, tape._consts
+        offsets, parents = tape._offsets, tape._parents
+        # the first slots hold the recorded nodes, the following ones the constants
+        values = [node.val for node in nodes]
+
+        def constant_slot(const):
+            values.append(const)
+            return len(values) - 1
+
+        self._inputs = tuple(leaf._index if leaf._tape is tape else constant_slot(leaf.val) for leaf in inputs)
+        plan = []
+        for i, op in enumerate(ops):
+            if op is None:
+                continue
+            forward, partials = _RULES[op]
+            operands = iter(parents[offsets[i]:offsets[i + 1]])
+            if consts[i] is None:
+                slots = [next(operands) for _ in partials]
+                derivatives = list(partials)
+            else:
+                slots = [next(operands) if const is None else constant_slot(const) for const in consts[i]]
+                derivatives = [partial if const is None else None for partial, const in zip(partials, consts[i])]
+            if len(slots) == 1:
+                plan.append((op, i, forward, slots[0], None, derivatives[0], None))
+            else:
+                plan.append((op, i, forward, slots[0], slots[1], derivatives[0], derivatives[1]))
+        self._plan = plan
+        self._vector = isinstance(outputs, list) or isinstance(outputs, tuple)
+        if not self._vector:
+            outputs = [outputs]
+        self._outputs = tuple(output._index if isinstance(output, Reverse) and output._tape is tape
+                              else constant_slot(output.val if isinstance(output, Reverse) else output)
+                              for output in outputs)
+        # values of the inputs are overwritten on every call
+        self._values = values
+        if optimize:
+            self._optimize()
+
+    def _optimize(self):
+        """Optimize the plan in place. Constant operations are folded, since the values of their
+        results were already recorded when the function was traced. Repeated operations are
+        merged by hash-consing each operation with its operands, where constant operands are
+        identified by their value and the operands of commutative operations are unordered.
+        Operations the outputs do not depend on are then dropped, and the remaining slots are
+        renumbered so that the list of values copied on every call is as short as possible.
+        """
+        values = self._values
+        # slots whose value changes from one call to the next
+        variable = set(self._inputs)
+        # slot of the earlier operation each merged slot is replaced with
+        aliases = {}
+        results = {}
+
+        def key(slot):
+            if slot in variable:
+                return slot
+            val = values[slot]
+            if isinstance(val, int) or isinstance(val, float):
+                # the repr distinguishes 0.0 from -0.0 and never merges nan with itself
+                return (type(val), repr(val)) if val == val else slot
+            return slot
+
+        plan = []
+        for op, out, forward, a, b, da, db in self._plan:
+            a = aliases.get(a, a)
+            b = aliases.get(b, b)
+            if a not in variable and (b is None or b not in variable):
+                # the recorded value of a constant operation is its value on every call
+                continue
+            operands = (key(a),) if b is None else (key(a), key(b))
+            if op in _COMMUTATIVE:
+                operands = frozenset(operands)
+            earlier = results.get((op, operands))
+            if earlier is not None:
+                aliases[out] = earlier
+                continue
+            results[(op, operands)] = out
+            variable.add(out)
+            plan.append((op, out, forward, a, b, da, db))
+        outputs = [aliases.get(output, output) for output in self._outputs]
+
+        # only the steps the outputs depend on are kept
+        needed = set(outputs)
+        live = []
+        for step in reversed(plan):
+            op, out, forward, a, b, da, db = step
+            if out in needed:
+                needed.update((a,) if b is None else (a, b))
+                live.append(step)
+        live.reverse()
+
+        slots = {}
+        for slot in list(self._inputs) + [slot for step in live for slot in (step[1], step[3], step[4])] + outputs:
+            if slot is not None and slot not in slots:
+                slots[slot] = len(slots)
+        self._values = [None] * len(slots)
+        for slot, new in slots.items():
+            self._values[new] = values[slot]
+        self._inputs = tuple(slots[slot] for slot in self._inputs)
+        self._outputs = tuple(slots[output] for output in outputs)
+        self._plan = [(op, slots[out], forward, slots[a], None if b is None else slots[b], da, db)
+                      for op, out, forward, a, b, da, db in live]
+
+    def __len__(self):
+        """Get the number of operations in the plan."""
+        return len(self._plan)
+
+    def __repr__(self):
+        return f"CompiledFunction(inputs = {len(self._inputs)}, outputs = {len(self._outputs)}, operations = {len(self._plan)})"
+
+    def __call__(self, *args):
+        """Evaluate the function at new values of the inputs. Same as the 'value' method."""
+        return self.value(*args)
+
+    def _forward(self, args):
+        """Compute the value of every slot by running through the plan (forward sweep).
+
+        Args:
+            args (tuple): values of the inputs
+
+        Raises:
+            TypeError: if the number of values does not match the number of inputs
+
+        Returns:
+            list: values of every slot
+        """
+        if len(args) != len(self._inputs):
+            raise TypeError(f"compiled function takes {len(self._inputs)} inputs but {len(args)} were given")
+        vals = list(self._values)
+        for slot, arg in zip(self._inputs, args):
+            vals[slot] = arg
+        for op, out, forward, a, b, da, db in self._plan:
+            if b is None:
+                vals[out] = forward(vals[a])
+            else:
+                vals[out] = forward(vals[a], vals[b])
+        return vals
+
+    def _partials(self, vals):
+        """Compute the local partial derivatives of every step of the plan. They only depend on
+        the values from the forward sweep, so they are computed once and shared by the reverse
+        sweeps of every output.
+
+        Args:
+            vals (list): values of every slot from the forward sweep
+
+        Returns:
+            list: partial derivatives of each step with respect to its operands, None for constants
+        """
+        partials = []
+        for op, out, forward, a, b, da, db in self._plan:
+            if b is None:
+                operands = (vals[a], vals[out])
+            else:
+                operands = (vals[a], vals[b], vals[out])
+            partials.append((None if da is None else da(*operands), None if db is None else db(*operands)))
+        return partials
+
+    def _backward(self, vals, outputs, partials=None):
+        """Compute the adjoints of every slot with respect to the sum of some outputs by running
+        backwards through the plan (reverse sweep).
+
+        Args:
+            vals (list): values of every slot from the forward sweep
+            outputs (list): slots of the outputs, each with an adjoint of 1
+            partials (list, optional): local partial derivatives from '_partials'. Defaults to None,
+                                       which computes them.
+
+        Returns:
+            list: adjoint of every slot, None for the slots the output does not depend on
+        """
+        if partials is None:
+            partials = self._partials(vals)
+        adjoints = [None] * len(vals)
+        for output in outputs:
+            adjoints[output] = 1.0
+        # steps after the output cannot contribute to it
+        for (op, out, forward, a, b, da, db), (pa, pb) in zip(reversed(self._plan), reversed(partials)):
+            adjoint = adjoints[out]
+            if adjoint is None:
+                continue
+            if pa is not None:
+                contribution = pa * adjoint
+                adjoints[a] = contribution if adjoints[a] is None else adjoints[a] + contribution
+            if pb is not None:
+                contribution = pb * adjoint
+                adjoints[b] = contribution if adjoints[b] is None else adjoints[b] + contribution
+        return adjoints
+
+    # stacks the values of several outputs or inputs along a new last axis
+    _stack = staticmethod(_stack)
+
+    def _result(self, vals):
+        """Get the value of the output(s) from the values of every slot."""
+        if not self._vector:
+            return vals[self._outputs[0]]
+        return self._stack([vals[output] for output in self._outputs])
+
+    def _derivative(self, vals):
+        """Get the gradient of the output, or the Jacobian of the outputs, from the values of every slot."""
+        rows = []
+        partials = self._partials(vals)
+        for output in self._outputs:
+            adjoints = self._backward(vals, [output], partials)
+            rows.append(self._stack([0.0 if adjoints[slot] is None else adjoints[slot] for slot in self._inputs]))
+        if not self._vector:
+            return rows[0]
+        return np.stack(np.broadcast_arrays(*rows), axis=-2)
+
+    def value(self, *args):
+        """Evaluate the function at new values of the inputs.
+
+        Args:
+            args (int, float, or numpy.ndarray): values of the inputs
+
+        Returns:
+            int, float, or numpy.ndarray: value of the function, or array of the values of each output
+                                          (along the last axis) for functions returning a list or tuple
+        """
+        return self._result(self._forward(args))
+
+    def derivative(self, *args):
+        """Compute the derivative of the function at new values of the inputs.
+
+        Args:
+            args (int, float, or numpy.ndarray): values of the inputs
+
+        Returns:
+            numpy.ndarray: gradient of the function (partial derivatives along the last axis), or the
+                           Jacobian (one row per output) for functions returning a list or tuple
+        """
+        return self._derivative(self._forward(args))
+
+    def value_and_derivative(self, *args):
+        """Compute the value and derivative of the function at new values of the inputs with a
+        single forward sweep.
+
+        Args:
+            args (int, float, or numpy.ndarray): values of the inputs
+
+        Returns:
+            tuple: value and derivative of the function, as returned by 'value' and 'derivative'
+        """
+        vals = self._forward(args)
+        return self._result(vals), self._derivative(vals)
+
+    def _second_order(self, args, seeds):
+        """Run the forward and reverse sweeps on Variables seeded with the given directions, so
+        that the adjoint of each input holds its partial derivative in 'val' and the directional
+        derivative of that partial derivative in 'der' (forward-over-reverse).
+
+        Args:
+            args (tuple): values of the inputs
+            seeds (list): direction of each input
+
+        Raises:
+            ValueError: if the function has several outputs
+
+        Returns:
+            list: adjoints of the inputs, or None for the inputs the output does not depend on
+                  through a Variable
+        """
+        if self._vector:
+            raise ValueError("second derivatives are only defined for functions with a single output")
+        vals = self._forward([Variable(arg, seed) for arg, seed in zip(args, seeds)])
+        adjoints = self._backward(vals, self._outputs)
+        return [adjoints[slot] if isinstance(adjoints[slot], Variable) else None for slot in self._inputs]
+
+    def hvp(self, args, vector):
+        """Compute the product of the Hessian of the function with a vector, without forming the
+        Hessian, with one forward-over-reverse pass.
+
+        Args:
+            args (list or tuple): values of the inputs
+            vector (list, tuple, or numpy.ndarray): vector to multiply the Hessian with
+
+        Raises:
+            ValueError: if the vector does not have one entry per input, or the function has
+                        several outputs
+
+        Returns:
+            numpy.ndarray: Hessian-vector product (entries along the last axis)
+        """
+        if len(vector) != len(args):
+            raise ValueError(f"vector must have {len(args)} entries, not {len(vector)}")
+        adjoints = self._second_order(args, list(vector))
+        return self._stack([0.0 if adjoint is None else adjoint.der for adjoint in adjoints])
+
+    def hessian(self, *args):
+        """Compute the Hessian of the function with one forward-over-reverse pass, seeding the
+        inputs with the unit vectors.
+
+        Args:
+            args (int, float, or numpy.ndarray): values of the inputs
+
+        Raises:
+            ValueError: if the function has several outputs
+
+        Returns:
+            numpy.ndarray: Hessian of the function (along the last two axes)
+        """
+        n = len(args)
+        batch_shape = _batch_shape(args)
+        # the seed axis comes last, after the axes of the values
+        seeds = [np.broadcast_to(np.eye(n)[i], batch_shape + (n,)) for i in range(n)]
+        adjoints = self._second_order(args, seeds)
+        rows = [np.zeros(batch_shape + (n,)) if adjoint is None else np.broadcast_to(adjoint.der, batch_shape + (n,))
+                for adjoint in adjoints]
+        return np.stack(rows, axis=-2)
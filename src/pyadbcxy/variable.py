@@ -3,12 +3,100 @@ This file contains the Variable module for the cs107-BCXY package. It includes t
 which implements the creation of the Variable object, as well as numerous basic operations on the
 Variable.
 """
+import functools
+import math
+import numbers
 import numpy as np
 
 
 __all__ = ["Variable"]
 
 
+# The constants a Variable can be combined with directly, checked with a single isinstance call.
+# Other real numbers (numbers.Real, e.g. fractions.Fraction), which NumPy cannot compute with, are
+# converted to float first, here and in the elementary functions.
+_NUMBER_TYPES = (int, float, np.ndarray, np.integer, np.floating)
+# The same without arrays, whose derivative rules need the seed axis handled (see _chain).
+_SCALAR_TYPES = (int, float, np.integer, np.floating)
+
+
+def _any(condition):
+	"""Reduce an element-wise condition to a single bool. Python and NumPy scalars are returned
+	as they are, which is much faster than going through np.any.
+	"""
+	if isinstance(condition, np.ndarray):
+		return condition.any()
+	return condition
+
+
+def _power(base, exponent):
+	"""Raise base to exponent. Integer arrays and NumPy integers are promoted to floats so that
+	negative integer exponents are allowed, just as they are for Python ints.
+	"""
+	if isinstance(base, np.ndarray) or isinstance(exponent, np.ndarray) or isinstance(base, np.integer):
+		return np.power(base, exponent, dtype=float)
+	return base**exponent
+
+
+def _scalar_kernel(math_function, numpy_function):
+	"""Combine the math module and NumPy versions of an elementary function. Python ints and floats
+	go to the math function, which is several times faster than dispatching a ufunc and returns a
+	float instead of a numpy.float64, and everything else (arrays, NumPy scalars) goes to NumPy.
+	Results too large for a float and arguments the math function rejects (e.g. sin of inf) fall
+	back to NumPy, which returns inf or nan with a RuntimeWarning instead of raising.
+	"""
+	def kernel(x):
+		if isinstance(x, float) or type(x) is int:
+			try:
+				return math_function(x)
+			except (OverflowError, ValueError):
+				# as a float, since NumPy cannot compute with ints beyond 64 bits
+				return numpy_function(float(x))
+		return numpy_function(x)
+	kernel.__name__ = numpy_function.__name__
+	return kernel
+
+
+def _chain(der, val, factor):
+	"""Multiply the derivative of an operand by the local derivative factor of an operation (chain
+	rule). A derivative with more dimensions than the value of its operand carries a trailing seed
+	axis of partial derivatives (see Forward), so an array factor, which is shaped like the values,
+	gets a new last axis to broadcast against the values rather than against the seed axis.
+
+	The derivative rules multiply directly when the factor is a float, which is much cheaper than
+	calling this function and checking for arrays.
+	"""
+	if isinstance(factor, np.ndarray) and isinstance(der, np.ndarray) and der.ndim > np.ndim(val):
+		return der * factor[..., np.newaxis]
+	return der * factor
+
+
+def _extend(der, val, result):
+	"""Keep the seed axis of a derivative last when the value of the result of an operation has
+	more dimensions than its operand, by prepending axes of length 1 to the derivative.
+	"""
+	if isinstance(der, np.ndarray) and isinstance(result, np.ndarray) and np.ndim(val) < der.ndim <= result.ndim:
+		return der.reshape((1,) * (result.ndim + 1 - der.ndim) + der.shape)
+	return der
+
+
+_log = _scalar_kernel(math.log, np.log)
+
+
+@functools.lru_cache(maxsize=128, typed=True)
+def _cached_log(base):
+	return _log(base)
+
+
+def _log_base(base):
+	"""Natural logarithm of a constant base of a logarithm or exponentiation. The result is cached
+	for scalars, since the same few bases are used over and over.
+	"""
+	if isinstance(base, np.ndarray):
+		return np.log(base)
+	return _cached_log(base)
+
+
 class Variable(object):
 	"""
 	This class implements all variables, to include the basic operations necessary
@@ -24,14 +112,34 @@ class Variable(object):
 	9
 	>>> f.der
 	6
+
+	# Seed the derivative with a vector to carry several partial derivatives at once
+	>>> x = Variable(3, np.array([1., 0.]))
+	>>> y = Variable(4, np.array([0., 1.]))
+	>>> (x*y).der
+	array([4., 3.])
+
+	# Hold an array of values to evaluate a batch of points at once
+	>>> x = Variable(np.array([1., 2., 3.]))
+	>>> (x**2).der
+	array([2., 4., 6.])
 	"""
 
+	# no per-instance __dict__, since a node is created for every intermediate result (as for the
+	# Reverse, Taylor and Tensor classes)
+	__slots__ = ("_val", "_der")
+
+	# let NumPy defer to the reflected operators, e.g. (ndarray + Variable), as do the other node classes
+	__array_ufunc__ = None
+
 	def __init__(self, val, der=1):
 		"""Constructor for Variable class
 
 		Args:
-			val (int or float): value of the variable
-			der (int or float, optional): derivative of the variable. Defaults to 1.
+			val (int, float, or numpy.ndarray): value of the variable
+			der (int, float, or numpy.ndarray, optional): derivative of the variable, or a seed
+				vector of partial derivatives with respect to several inputs, along an extra last
+				axis after the axes of val. Defaults to 1.
 		"""
 		self._val = val
 		self._der = der
@@ -65,7 +173,7 @@ class Variable(object):
 		"""Set the value of the Variable
 
 		Args:
-			val (int or float): new value of the variable
+			val (int, float, or numpy.ndarray): new value of the variable
 
 		Examples
 		--------
@@ -100,7 +208,7 @@ class Variable(object):
 		from the addition of two variables or a variable and other object.
 
 		Args:
-			other (Variable, int, or float): item to be added to the Variable
+			other (Variable, real number, or numpy.ndarray): item to be added to the Variable
 
 		Returns:
 			Variable: resulting Variable object
@@ -119,12 +227,18 @@ class Variable(object):
 		>>> print(x5)
 		"Variable(val = 6.0, der = 1)
 		"""
-		if isinstance(other, int) or isinstance(other, float):
-			return Variable(val = self.val + other, der = self.der)
-		elif isinstance(other, Variable):
-			return Variable(val = self.val + other.val, der = self.der + other.der)
+		# the Variable-Variable case is the most common and is checked first
+		if isinstance(other, Variable):
+			return Variable(self._val + other._val, self._der + other._der)
+		elif isinstance(other, _SCALAR_TYPES):
+			return Variable(self._val + other, self._der)
+		elif isinstance(other, np.ndarray):
+			val = self._val + other
+			return Variable(val, _extend(self._der, self._val, val))
+		elif isinstance(other, numbers.Real):
+			return self + float(other)
 		else:
-			# other is not Variable, int, or float
+			# other is not Variable, a real number, or numpy.ndarray
 			raise TypeError(f"unsupported operand type(s) for +: '{type(self)}' and '{type(other)}'")
 
 	def __radd__(self, other):
@@ -132,7 +246,7 @@ class Variable(object):
 		from the addition of two variables or a variable and other object.
 
 		Args:
-			other (Variable, int, or float): item to be added to the Variable
+			other (Variable, real number, or numpy.ndarray): item to be added to the Variable
 
 		Returns:
 			Variable: resulting Variable object
@@ -144,7 +258,7 @@ class Variable(object):
 		from the multiplication of two variables or a variable and other object.
 
 		Args:
-			other (Variable, int, or float): item to be multiplied with the Variable
+			other (Variable, real number, or numpy.ndarray): item to be multiplied with the Variable
 
 		Returns:
 			Variable: resulting Variable object
@@ -163,12 +277,19 @@ class Variable(object):
 		>>> print(x5)
 		"Variable(val = 8.0, der = 2.0)"
 		"""
-		if isinstance(other, int) or isinstance(other, float):
-				return Variable(val = self.val*other, der = self.der*other)
-		elif isinstance(other, Variable):
-			return Variable(val = self.val*other.val, der = self.der*other.val + self.val*other.der)
+		if isinstance(other, Variable):
+			a, b = self._val, other._val
+			if type(a) is float and type(b) is float:
+				return Variable(a*b, self._der*b + a*other._der)
+			return Variable(a*b, _chain(self._der, a, b) + _chain(other._der, b, a))
+		elif isinstance(other, _SCALAR_TYPES):
+			return Variable(self._val*other, self._der*other)
+		elif isinstance(other, np.ndarray):
+			return Variable(self._val*other, _chain(self._der, self._val, other))
+		elif isinstance(other, numbers.Real):
+			return self * float(other)
 		else:
-			# other is not Variable, int, or float
+			# other is not Variable, a real number, or numpy.ndarray
 			raise TypeError(f"unsupported operand type(s) for *: '{type(self)}' and '{type(other)}'")
 
 	def __rmul__(self, other):
@@ -176,7 +297,7 @@ class Variable(object):
 		from the multiplication of two variables or a variable and other object.
 
 		Args:
-			other (Variable, int, or float): item to be multiplied with the Variable
+			other (Variable, real number, or numpy.ndarray): item to be multiplied with the Variable
 
 		Returns:
 			Variable: resulting Variable object
@@ -196,14 +317,14 @@ class Variable(object):
 		>>> print(-x)
 		"Variable(val = -3, der = -1)"
 		"""
-		return -1*self
+		return Variable(-self._val, -self._der)
 
 	def __sub__(self, other):
 		"""Overload of the subtraction '-' operator (Variable - other). Calculates the value and derivative resulting
 		from the subtraction of one Variable (or other object) from a Variable.
 
 		Args:
-			other (Variable, int, or float): item to be subtracted from the Variable
+			other (Variable, real number, or numpy.ndarray): item to be subtracted from the Variable
 
 		Returns:
 			Variable: resulting Variable object
@@ -222,8 +343,15 @@ class Variable(object):
 		>>> print(x5)
 		"Variable(val = 2.0, der = 1)
 		"""
-		if isinstance(other, int) or isinstance(other, float) or isinstance(other, Variable):
-			return self + (-1)*other
+		if isinstance(other, Variable):
+			return Variable(self._val - other._val, self._der - other._der)
+		elif isinstance(other, _SCALAR_TYPES):
+			return Variable(self._val - other, self._der)
+		elif isinstance(other, np.ndarray):
+			val = self._val - other
+			return Variable(val, _extend(self._der, self._val, val))
+		elif isinstance(other, numbers.Real):
+			return self - float(other)
 		else:
 			raise TypeError(f"unsupported operand type(s) for -: '{type(self)}' and '{type(other)}'")
 
@@ -232,13 +360,18 @@ class Variable(object):
 		from the subtraction of one Variable (or other object) from a Variable.
 
 		Args:
-			other (Variable, int, or float): item to be subtracted from the Variable
+			other (Variable, real number, or numpy.ndarray): item to be subtracted from the Variable
 
 		Returns:
 			Variable: resulting Variable object
 		"""
-		if isinstance(other, int) or isinstance(other, float):
-			return (-1)*self + other
+		if isinstance(other, _SCALAR_TYPES):
+			return Variable(other - self._val, -self._der)
+		elif isinstance(other, np.ndarray):
+			val = other - self._val
+			return Variable(val, _extend(-self._der, self._val, val))
+		elif isinstance(other, numbers.Real):
+			return float(other) - self
 		else:
 			raise TypeError(f"unsupported operand type(s) for -: '{type(other)}' and '{type(self)}'")
 
@@ -247,7 +380,7 @@ class Variable(object):
 		from the division of one Variable (or other object) from a Variable.
 
 		Args:
-			other (Variable, int, or float): item the Variable is to be divided by
+			other (Variable, real number, or numpy.ndarray): item the Variable is to be divided by
 
 		Returns:
 			Variable: resulting Variable object
@@ -266,16 +399,24 @@ class Variable(object):
 		>>> print(x5)
 		"Variable(val = 2.0, der = 1)
 		"""
-		if isinstance(other, int) or isinstance(other, float):
-			if other == 0:
+		if isinstance(other, Variable):
+			if _any(other._val == 0):
 				raise ZeroDivisionError("division by zero")
-			else:
-				return self*(other**-1)
-		elif isinstance(other, Variable):
-			if other.val == 0:
+			# product rule with the reciprocal of other
+			a, b = self._val, other._val
+			inverse = _power(b, -1)
+			if type(a) is float and type(b) is float:
+				return Variable(a*inverse, self._der*inverse + a*(-1*_power(b, -2)*other._der))
+			return Variable(a*inverse, _chain(self._der, a, inverse) + _chain(other._der, b, -1*a*_power(b, -2)))
+		elif isinstance(other, _NUMBER_TYPES):
+			if _any(other == 0):
 				raise ZeroDivisionError("division by zero")
-			else:
-				return self*(other**-1)
+			inverse = _power(other, -1)
+			if type(inverse) is float:
+				return Variable(self._val*inverse, self._der*inverse)
+			return Variable(self._val*inverse, _chain(self._der, self._val, inverse))
+		elif isinstance(other, numbers.Real):
+			return self / float(other)
 		else:
 			raise TypeError(f"unsupported operand type(s) for /: '{type(self)}' and '{type(other)}'")
 
@@ -284,13 +425,18 @@ class Variable(object):
 		from the division of one Variable (or other object) from a Variable.
 
 		Args:
-			other (Variable, int, or float): item to be divided by the Variable
+			other (Variable, real number, or numpy.ndarray): item to be divided by the Variable
 
 		Returns:
 			Variable: resulting Variable object
 		"""
-		if isinstance(other, int) or isinstance(other, float):
-			return other*(self**-1)
+		if isinstance(other, _NUMBER_TYPES):
+			factor = -1*_power(self._val, -2)*other
+			if type(factor) is float:
+				return Variable(_power(self._val, -1)*other, factor*self._der)
+			return Variable(_power(self._val, -1)*other, _chain(self._der, self._val, factor))
+		elif isinstance(other, numbers.Real):
+			return float(other) / self
 		else:
 			raise TypeError(f"unsupported operand type(s) for /: '{type(other)}' and '{type(self)}'")
 
@@ -305,7 +451,7 @@ class Variable(object):
 		from raising Variable to the power of other.
 
 		Args:
-			other (Variable, int, or float): item the Variable is to be raised to
+			other (Variable, real number, or numpy.ndarray): item the Variable is to be raised to
 
 		Returns:
 			Variable: resulting Variable object
@@ -315,16 +461,20 @@ class Variable(object):
 		>>> Variable(3) ** Variable(4., 5.)
 		Variable(val = 81.0, der = 552.9379769105844)
 		"""
-		if isinstance(other, int) or isinstance(other, float):
-			return Variable(self.val**other, other*self.val**(other - 1)*self.der)
-		elif isinstance(other, Variable):
-			if self.val > 0:
-				return Variable(self.val**other.val,
-								self.val**other.val * (
-										np.log(self.val) * other.der
-										+ self.der / self.val * other.val))
-			else:
+		if isinstance(other, Variable):
+			if _any(self._val <= 0):
 				raise ValueError('math domain error: the base of exponentiation cannot be non-positive')
+			val = _power(self._val, other._val)
+			if type(val) is float:
+				return Variable(val, val * (_log(self._val) * other._der + self._der / self._val * other._val))
+			return Variable(val, _chain(other._der, other._val, val*_log(self._val)) + _chain(self._der, self._val, val/self._val*other._val))
+		elif isinstance(other, _NUMBER_TYPES):
+			factor = other*_power(self._val, other - 1)
+			if type(factor) is float:
+				return Variable(_power(self._val, other), factor*self._der)
+			return Variable(_power(self._val, other), _chain(self._der, self._val, factor))
+		elif isinstance(other, numbers.Real):
+			return self ** float(other)
 		else:
 			raise TypeError(f"unsupported operand type(s) for ** or pow(): '{type(self)}' and '{type(other)}'")
 
@@ -333,7 +483,7 @@ class Variable(object):
 		from raising other to the power of the Variable.
 
 		Args:
-			other (Variable, int, or float): item to raise to the power of the Variable
+			other (Variable, real number, or numpy.ndarray): item to raise to the power of the Variable
 
 		Returns:
 			Variable: resulting Variable object
@@ -343,11 +493,15 @@ class Variable(object):
 		>>> 6 ** Variable(3)
 		Variable(val = 216, der = 387.0200453532599)
 		"""
-		if isinstance(other, int) or isinstance(other, float):
-			if other > 0:
-				return Variable(other**self.val, other**self.val*np.log(other)*self.der)
-			else:
+		if isinstance(other, _NUMBER_TYPES):
+			if _any(other <= 0):
 				raise ValueError('math domain error: the base of exponentiation cannot be non-positive')
+			val = _power(other, self._val)
+			if type(val) is float:
+				return Variable(val, val*_log_base(other)*self._der)
+			return Variable(val, _chain(self._der, self._val, val*_log_base(other)))
+		elif isinstance(other, numbers.Real):
+			return float(other) ** self
 		else:
 			raise TypeError(f"unsupported operand type(s) for ** or pow(): '{type(other)}' and '{type(self)}'")
 
@@ -374,7 +528,7 @@ class Variable(object):
 		False
 		"""
 		if isinstance(other, Variable):
-			return self.val == other.val and self.der == other.der
+			return bool(np.array_equal(self.val, other.val) and np.array_equal(self.der, other.der))
 		return False
 
 	def __str__(self) -> str:
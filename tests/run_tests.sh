@@ -5,6 +5,16 @@ tests=(
     tests/test_elementary_functions.py
     tests/test_forward.py
     tests/test_reverse.py
+    tests/test_tape.py
+    tests/test_tracing.py
+    tests/test_codegen.py
+    tests/test_sparsity.py
+    tests/test_streaming.py
+    tests/test_serving.py
+    tests/test_checkpointing.py
+    tests/test_profiling.py
+    tests/test_taylor.py
+    tests/test_tensor.py
 )
 
 if [[ $# -gt 0 && ${1} == 'coverage' ]]; then
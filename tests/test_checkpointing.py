@@ -0,0 +1,90 @@
+import math
+import unittest
+import numpy as np
+from src.pyadbcxy.checkpointing import Checkpointed, _binomial
+from src.pyadbcxy.elementary_functions import sin, tanh
+from src.pyadbcxy.reverse import Reverse
+from src.pyadbcxy.tape import Tape
+
+
+def pendulum(x, v):
+    """One explicit Euler step of a pendulum."""
+    return x + 0.01 * v, v - 0.01 * sin(x)
+
+
+class TestCheckpointed(unittest.TestCase):
+    def reference(self, step, state, steps, adjoint):
+        """Final state and vector-Jacobian product computed by recording every step on a Tape."""
+        inputs = [Reverse(val) for val in state]
+        with Tape() as tape:
+            outputs = inputs
+            for _ in range(steps):
+                outputs = step(*outputs)
+            total = sum(weight * output for weight, output in zip(adjoint, outputs))
+        return [output.val for output in outputs], tape.gradient(total, inputs)
+
+    def test_matches_tape(self):
+        """Test both schedules against a full Tape for numbers of steps and snapshots."""
+        for schedule in ["binomial", "uniform"]:
+            for steps in [0, 1, 2, 5, 37, 200]:
+                for snapshots in [None, 1, 3]:
+                    loop = Checkpointed(pendulum, steps, snapshots, schedule)
+                    final, gradient = loop.vjp((1.0, 0.5), (1.0, -2.0))
+                    expected_final, expected_gradient = self.reference(pendulum, (1.0, 0.5), steps, (1.0, -2.0))
+                    np.testing.assert_allclose(final, expected_final)
+                    np.testing.assert_allclose(gradient, expected_gradient)
+                    if schedule == "binomial":
+                        self.assertLessEqual(loop.peak_snapshots, loop.snapshots)
+                    else:
+                        self.assertLessEqual(loop.peak_snapshots, loop.snapshots + math.ceil(steps / loop.snapshots))
+
+    def test_memory(self):
+        """Test that the stored states grow as log(n) and sqrt(n) with the default snapshots."""
+        loop = Checkpointed(pendulum, 1000)
+        loop.vjp((1.0, 0.0), (1.0, 0.0))
+        self.assertEqual(loop.snapshots, 10)
+        self.assertLessEqual(loop.peak_snapshots, 10)
+        # 10 snapshots reverse 1000 steps with at most 4 evaluations of each step
+        self.assertGreaterEqual(_binomial(10, 4), 1000)
+        self.assertLessEqual(loop.evaluations, 1000 + 5 * 1000)
+
+        loop = Checkpointed(pendulum, 1000, schedule="uniform")
+        loop.vjp((1.0, 0.0), (1.0, 0.0))
+        self.assertEqual(loop.snapshots, 32)
+        self.assertLessEqual(loop.peak_snapshots, 2 * 32)
+        self.assertLessEqual(loop.evaluations, 3 * 1000)
+
+    def test_single_component(self):
+        """Test a state of a single component given as a number."""
+        loop = Checkpointed(lambda x: tanh(x) + 0.1, 50)
+        final, gradient = loop.vjp(0.3, 1.0)
+        x = 0.3
+        expected = 1.0
+        for _ in range(50):
+            expected *= 1 - math.tanh(x) ** 2
+            x = math.tanh(x) + 0.1
+        self.assertAlmostEqual(final, x)
+        self.assertAlmostEqual(loop(0.3), x)
+        np.testing.assert_allclose(gradient, [expected])
+
+    def test_constant_component(self):
+        """Test a step whose outputs do not all depend on the state."""
+        loop = Checkpointed(lambda x, c: (x * 2, 1.0), 3)
+        final, gradient = loop.vjp((1.0, 5.0), (1.0, 1.0))
+        self.assertEqual(final, (8.0, 1.0))
+        np.testing.assert_allclose(gradient, [8.0, 0.0])
+
+    def test_errors(self):
+        """Test that invalid arguments are rejected."""
+        with self.assertRaises(ValueError):
+            Checkpointed(pendulum, 10, schedule="revolve")
+        with self.assertRaises(ValueError):
+            Checkpointed(pendulum, -1)
+        with self.assertRaises(ValueError):
+            Checkpointed(pendulum, 10, snapshots=0)
+        with self.assertRaises(ValueError):
+            Checkpointed(pendulum, 10).vjp((1.0, 0.0), (1.0,))
+
+
+if __name__ == "__main__":
+    unittest.main()
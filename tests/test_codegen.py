@@ -0,0 +1,67 @@
+import unittest
+import numpy as np
+from src.pyadbcxy.elementary_functions import exp, log, sin, cos, tan, sinh, cosh, tanh, arcsin, arccos, arctan
+from src.pyadbcxy.reverse import Reverse
+from src.pyadbcxy.codegen import generate, GeneratedFunction
+from src.pyadbcxy.tracing import trace
+
+
+class TestGenerate(unittest.TestCase):
+    def setUp(self):
+        """Prepare the test fixture. Executed before each test method."""
+        self.func = lambda x, y: (exp(cos(x)) / sin(y) ** 2 + log(x * y, 3) - x ** y + 3 / x - (y + 1) ** 2
+                                  + tan(x) * sinh(y) - cosh(x) / 4 + tanh(x - y) + arcsin(x / 3) * arccos(y / 3)
+                                  + arctan(x) - 2 ** y)
+        self.generated = generate(self.func, 1.0, 2.0)
+
+    def test_generate(self):
+        """Test that generating a function returns a GeneratedFunction with its source code."""
+        self.assertIsInstance(self.generated, GeneratedFunction)
+        self.assertTrue(self.generated.source.startswith("def value(x0, x1):"))
+        self.assertIn("def value_and_derivative(x0, x1):", self.generated.source)
+        self.assertEqual(self.generated.inputs, 2)
+
+    def test_matches_compiled(self):
+        """Test that the generated function agrees with the compiled plan for every operation."""
+        compiled = trace(self.func, 1.0, 2.0)
+        for xv, yv in [(1.0, 2.0), (0.5, 1.5), (2.5, 0.7)]:
+            val, der = self.generated.value_and_derivative(xv, yv)
+            self.assertAlmostEqual(val, compiled(xv, yv))
+            self.assertAlmostEqual(self.generated(xv, yv), compiled(xv, yv))
+            np.testing.assert_allclose(der, compiled.derivative(xv, yv))
+            np.testing.assert_allclose(self.generated.derivative(xv, yv), compiled.derivative(xv, yv))
+
+    def test_arrays(self):
+        """Test evaluating the generated function at several points at once."""
+        xs, ys = np.linspace(0.5, 2.5, 5), np.linspace(0.7, 2.0, 5)
+        compiled = trace(self.func, 1.0, 2.0)
+        np.testing.assert_allclose(self.generated(xs, ys), compiled(xs, ys))
+        np.testing.assert_allclose(self.generated.derivative(xs, ys), compiled.derivative(xs, ys))
+
+    def test_cache(self):
+        """Test that the generated function is cached by function identity."""
+        self.assertIs(generate(self.func, 3.0, 4.0), self.generated)
+        self.assertIsNot(generate(lambda x, y: x * y, 1.0, 2.0), self.generated)
+
+    def test_vector_output(self):
+        """Test the Jacobian of a function with several outputs, including a constant one."""
+        f = generate(lambda x, y: [x * x, x + y, 5], 3, 4)
+        np.testing.assert_array_equal(f(1, 2), [1, 3, 5])
+        np.testing.assert_array_equal(f.derivative(1, 2), [[2, 0], [1, 1], [0, 0]])
+
+    def test_constants(self):
+        """Test that constant operands are not differentiated and that unused steps are not emitted."""
+        f = generate(lambda x, y: [x / 4 + Reverse(5) * x, (y * 2).sin()][0], 1, 2)
+        self.assertAlmostEqual(f(3, 2), 0.75 + 15)
+        np.testing.assert_allclose(f.derivative(3, 2), [5.25, 0])
+        self.assertNotIn("np.sin", f.source)
+
+    def test_identity(self):
+        """Test a function returning one of its inputs."""
+        f = generate(lambda x, y: y, 3, 4)
+        self.assertEqual(f(1, 2), 2)
+        np.testing.assert_array_equal(f.derivative(1, 2), [0, 1])
+
+
+if __name__ == "__main__":
+    unittest.main()
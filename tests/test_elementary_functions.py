@@ -1,6 +1,8 @@
 import unittest
 import math
+import numpy as np
 from src.pyadbcxy.variable import Variable
+from src.pyadbcxy.reverse import Reverse
 from src.pyadbcxy.elementary_functions import *
 
 
@@ -96,7 +98,7 @@ class TestElementaryFunctions(unittest.TestCase):
         # normal sqaure root
         root_result = root(self.var2)
         self.assertEqual(root_result.val, self.var2.val ** 0.5)
-        self.assertEqual(root_result.der, 0.5 * self.var2.val ** (-0.5))
+        self.assertEqual(root_result.der, 0.5 * self.var2.val ** (-0.5) * self.var2.der)
 
         var = 20
         self.assertEqual(root(20, 3), 20 ** (1.0/3))
@@ -180,6 +182,11 @@ class TestElementaryFunctions(unittest.TestCase):
         self.assertEqual(arcsin_result.val, math.asin(var2.val))
         self.assertEqual(arcsin_result.der, var2.der/math.sqrt(1-var2.val**2))
 
+        # the derivative is infinite at the ends of the domain
+        self.assertEqual(arcsin(Variable(1.0)).der, math.inf)
+        self.assertEqual(arcsin(Variable(-1.0, 2.0)).der, math.inf)
+        self.assertEqual(arcsin(Variable(1)).val, math.pi/2)
+
         var = 0.8
         self.assertEqual(arcsin(var), math.asin(var))
 
@@ -269,6 +276,11 @@ class TestElementaryFunctions(unittest.TestCase):
         self.assertEqual(arccos_result.val, math.acos(var2.val))
         self.assertEqual(arccos_result.der, -var2.der/math.sqrt(1-var2.val**2))
 
+        # the derivative is infinite at the ends of the domain
+        self.assertEqual(arccos(Variable(-1.0)).der, -math.inf)
+        self.assertEqual(arccos(Variable(1.0, 2.0)).der, -math.inf)
+        self.assertEqual(arccos(Variable(-1)).val, math.pi)
+
         var = 0.8
         self.assertEqual(arccos(var), math.acos(var))
 
@@ -383,6 +395,81 @@ class TestElementaryFunctions(unittest.TestCase):
         self.assertEqual(log_res.val, 1/(1 + math.exp(-1*self.var1.val)))
         self.assertEqual(log_res.der, math.exp(-1*self.var1.val)/((1 + math.exp(-1*self.var1.val))**2))
 
+    def test_array_inputs(self):
+        """
+        Test that every elementary function accepts NumPy arrays and array-valued
+        Variables, agreeing elementwise with the scalar results.
+        """
+        points = np.array([0.1, 0.4, 0.7])
+        for func in (log, exp, root, sin, sinh, arcsin, cos, cosh, arccos, tan, tanh, arctan, logistic):
+            batch = func(Variable(points, 2.))
+            for i, point in enumerate(points):
+                single = func(Variable(point, 2.))
+                self.assertAlmostEqual(batch.val[i], single.val)
+                self.assertAlmostEqual(batch.der[i], single.der)
+            if func is not logistic:
+                np.testing.assert_allclose(func(points), [func(float(p)) for p in points])
+
+        with self.assertRaises(ValueError):
+            log(np.array([1., -1.]))
+        with self.assertRaises(ValueError):
+            arcsin(Variable(np.array([0.5, 2.])))
+        with self.assertRaises(ValueError):
+            arccos(np.array([-2., 0.5]))
+
+    def test_real_numbers(self):
+        """Test that NumPy scalars and other real numbers are accepted."""
+        from fractions import Fraction
+        for c in [np.float32(0.5), np.float64(0.5), Fraction(1, 2)]:
+            self.assertAlmostEqual(sin(c), math.sin(0.5), places=6)
+            self.assertAlmostEqual(log(c, 2), -1, places=6)
+            self.assertAlmostEqual(arcsin(c), math.asin(0.5), places=6)
+        self.assertAlmostEqual(exp(np.int64(1)), math.e)
+        with self.assertRaises(ValueError):
+            log(Fraction(-1, 2))
+
+    def test_scalar_kernels(self):
+        """Test that Python scalars are computed with the math module and everything else with NumPy."""
+        for function in [log, exp, sin, sinh, arcsin, cos, cosh, arccos, tan, tanh, arctan]:
+            self.assertIs(type(function(0.5)), float)
+            self.assertIs(type(function(Variable(0.5)).val), float)
+            self.assertIs(type(function(np.float32(0.5))), np.float32)
+            self.assertIsInstance(function(np.array([0.5])), np.ndarray)
+        self.assertEqual(exp(1), math.e)
+        # overflowing results are inf, as in NumPy, instead of raising OverflowError
+        with np.errstate(over="ignore"):
+            self.assertEqual(exp(1000.), np.inf)
+            self.assertEqual(cosh(Variable(1000.)).val, np.inf)
+            self.assertEqual(exp(2**70), np.inf)
+
+    def test_non_finite(self):
+        """Test that infinite and nan inputs give nan, as in NumPy, instead of raising ValueError."""
+        with np.errstate(invalid="ignore"):
+            for function in [sin, cos, tan]:
+                for val in [math.inf, -math.inf, math.nan]:
+                    self.assertTrue(math.isnan(function(val)))
+                    result = function(Variable(val))
+                    self.assertTrue(math.isnan(result.val))
+                    self.assertTrue(math.isnan(result.der))
+
+    def test_log_bases(self):
+        """Test that the cached logarithms of the bases do not mix up bases of different types."""
+        self.assertEqual(log(Variable(8.), 2), Variable(3.0, 1 / (8 * math.log(2))))
+        self.assertEqual(log(8., 2.), 3.0)
+        self.assertEqual(log(np.float32(8.), np.float32(2.)).dtype, np.float32)
+        self.assertEqual(log(8., 2.), 3.0)
+        self.assertEqual(log(Variable(8.), 2).val, 3.0)
+
+    def test_reverse_inputs(self):
+        """Test that the elementary functions dispatch Reverse objects to their methods."""
+        x = Reverse(0.5)
+        z = sin(x) + log(x, 2) + root(x)
+        self.assertIsInstance(z, Reverse)
+        self.assertAlmostEqual(z.val, math.sin(0.5) + math.log2(0.5) + math.sqrt(0.5))
+        self.assertAlmostEqual(x.grad, math.cos(0.5) + 1 / (0.5 * math.log(2)) + 0.5 / math.sqrt(0.5))
+        with self.assertRaises(TypeError):
+            sin("0.5")
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -1,8 +1,9 @@
 import unittest
 import copy
+import numpy as np
 from src.pyadbcxy.elementary_functions import *
 from src.pyadbcxy.variable import Variable
-from src.pyadbcxy.forward import Forward
+from src.pyadbcxy.forward import Forward, jvp
 
 
 class TestForward(unittest.TestCase):
@@ -127,7 +128,274 @@ class TestForward(unittest.TestCase):
         self.assertAlmostEqual(fmode.value, -4.801440971209678, 7)
         self.assertEqual(fmode.derivative, [-0.5644800322394689, -4.949962483002227, -1.0806046117362795])
 
+    def test_single_evaluation(self):
+        """
+        Test that the whole gradient comes from the single function evaluation
+        performed in 'calculate', regardless of the number of Variables.
+        """
+        calls = []
+        def f(*xs):
+            calls.append(1)
+            total = 0
+            for i, x in enumerate(xs):
+                total = total + (i + 1)*x**2
+            return total
+        xs = [Variable(float(i)) for i in range(50)]
+        fmode = Forward(f, xs)
+        fmode.calculate()
+        self.assertEqual(fmode.derivative, [2.0*(i + 1)*i for i in range(50)])
+        self.assertEqual(len(calls), 1)
+
+    def test_seed_leaves_variables_untouched(self):
+        """
+        Test that seeding does not modify the Variables given by the user.
+        """
+        self.fmode2.calculate()
+        self.assertEqual(self.fmode2.derivative, [1, 5.0])
+        self.assertEqual(self.x.der, 1)
+        self.assertEqual(self.y.der, 5.)
+
+    def test_batched_variables(self):
+        """
+        Test forward mode on array-valued Variables, evaluating a batch of points
+        with a single function evaluation.
+        """
+        xs = np.array([1., 2., 3.])
+        ys = np.array([0.1, 0.2, 0.3])
+        f = lambda x, y: x*sin(y) + x**2
+        fmode = Forward(f, (Variable(xs), Variable(ys)))
+        fmode.calculate()
+        np.testing.assert_allclose(fmode.value, xs*np.sin(ys) + xs**2)
+        self.assertEqual(fmode.derivative.shape, (3, 2))
+        np.testing.assert_allclose(fmode.derivative[:, 0], np.sin(ys) + 2*xs)
+        np.testing.assert_allclose(fmode.derivative[:, 1], xs*np.cos(ys))
+
+        # scalar Variables are broadcast against the batch
+        fmode = Forward(f, (Variable(2.), Variable(ys)))
+        fmode.calculate()
+        np.testing.assert_allclose(fmode.derivative[:, 0], np.sin(ys) + 4.)
+
+        fmode = Forward(lambda x: x**2, Variable(xs))
+        fmode.calculate()
+        np.testing.assert_allclose(fmode.derivative, 2*xs)
+
+    def test_constant_arrays(self):
+        """
+        Test forward mode on functions creating NumPy arrays, which broadcast against the values
+        of the Variables rather than against the partial derivatives.
+        """
+        c = np.array([1., 2., 3.])
+        fmode = Forward(lambda x, y, z: x*c + y + z, [Variable(1.), Variable(2.), Variable(3.)])
+        fmode.calculate()
+        np.testing.assert_allclose(fmode.value, [6., 7., 8.])
+        np.testing.assert_allclose(fmode.derivative, [[1., 1., 1.], [2., 1., 1.], [3., 1., 1.]])
+
+        fmode = Forward(lambda x, y: sin(c/x) - c + y**c, [Variable(2.), Variable(0.5)])
+        fmode.calculate()
+        np.testing.assert_allclose(fmode.derivative[:, 0], -np.cos(c/2.)*c/4.)
+        np.testing.assert_allclose(fmode.derivative[:, 1], c*0.5**(c - 1))
+
+        # with batched Variables, the arrays broadcast against the values of the batch
+        xs = np.array([[1.], [2.]])
+        fmode = Forward(lambda x, y: c - x*y*c, [Variable(xs), Variable(3.)])
+        fmode.calculate()
+        self.assertEqual(fmode.derivative.shape, (2, 3, 2))
+        np.testing.assert_allclose(fmode.derivative[..., 0], -3.*c*np.ones((2, 1)))
+        np.testing.assert_allclose(fmode.derivative[..., 1], -xs*c)
+
+        fmode = Forward(lambda x: x*c, Variable(2.))
+        fmode.calculate()
+        np.testing.assert_allclose(fmode.derivative, c)
+
+        value, der = jvp(lambda x, y: x*c + y, (1., 2.), (1., 1.))
+        np.testing.assert_allclose(der, c + 1.)
+
+    def test_constant_function(self):
+        """
+        Test forward mode on a function that does not depend on its Variables.
+        """
+        fmode = Forward(lambda x, y: 5, (self.x, self.y))
+        fmode.calculate()
+        self.assertEqual(fmode.value, 5)
+        self.assertEqual(fmode.derivative, [0.0, 0.0])
+
+    def test_many_variables(self):
+        """
+        Test forward mode on a function of more Variables than np.broadcast accepts.
+        """
+        xs = [Variable(float(i)) for i in range(100)]
+        fmode = Forward(lambda *xs: sum(xs[1:], xs[0] * xs[0]), xs)
+        fmode.calculate()
+        self.assertEqual(fmode.value, 4950.0)
+        self.assertEqual(fmode.derivative, [0.0] + [1.0] * 99)
+
+    def test_map(self):
+        """
+        Test the evaluation of many points in worker processes, in order and in completion order.
+        """
+        fmode = Forward(_sweep_function, (self.x, self.y))
+        points = np.linspace(0.1, 2, 40).reshape(20, 2)
+        expected_values = [_sweep_function(*point) for point in points]
+        expected_derivatives = [[np.cos(a) * b, np.sin(a) + 2 * b] for a, b in points]
+        for processes in [1, 2]:
+            values, derivatives = fmode.map(points, processes=processes, chunksize=3)
+            np.testing.assert_allclose(values, expected_values)
+            # the second Variable is seeded with a derivative of 5
+            np.testing.assert_allclose(derivatives, np.array(expected_derivatives) * [1, 5])
+        values, derivatives = fmode.map(points, processes=2, chunksize=3, ordered=False)
+        np.testing.assert_allclose(sorted(values), sorted(expected_values))
+        np.testing.assert_allclose(derivatives.sum(axis=0), np.sum(expected_derivatives, axis=0) * [1, 5])
+
+        values, derivatives = Forward(lambda x: x ** 2, self.x).map(range(4), processes=1)
+        np.testing.assert_array_equal(values, [0, 1, 4, 9])
+        np.testing.assert_array_equal(derivatives, [0, 2, 4, 6])
+        with self.assertRaises(ValueError):
+            fmode.map([(1, 2, 3)])
+
+    def test_vector_function(self):
+        """
+        Test the Jacobian of functions returning several outputs, computed from a single evaluation.
+        """
+        calls = []
+        def f(x, y):
+            calls.append(1)
+            return [x*y, x + y, sin(x), 7]
+        fmode = Forward(f, (self.x, self.y))
+        fmode.calculate()
+        self.assertEqual(len(calls), 1)
+        np.testing.assert_allclose(fmode.value, [12., 7., np.sin(3), 7])
+        self.assertEqual(fmode.derivative.shape, (4, 2))
+        # the second Variable is seeded with a derivative of 5
+        np.testing.assert_allclose(fmode.derivative, [[4., 15.], [1., 5.], [np.cos(3), 0.], [0., 0.]])
+
+        # tuples and arrays of Variables, with a single Variable
+        for g in [lambda x: (x**2, 2*x), lambda x: np.array([x**2, 2*x])]:
+            fmode = Forward(g, self.x)
+            fmode.calculate()
+            np.testing.assert_array_equal(fmode.value, [9, 6])
+            np.testing.assert_array_equal(fmode.derivative, [[6.], [2.]])
+
+        # one Jacobian per point for batched Variables
+        xs = np.array([1., 2., 3.])
+        fmode = Forward(lambda x, y: (x*y, x - y), (Variable(xs), Variable(2.)))
+        fmode.calculate()
+        self.assertEqual(fmode.value.shape, (3, 2))
+        self.assertEqual(fmode.derivative.shape, (3, 2, 2))
+        for i, x in enumerate(xs):
+            np.testing.assert_allclose(fmode.value[i], [2*x, x - 2])
+            np.testing.assert_allclose(fmode.derivative[i], [[2., x], [1., -1.]])
+
+        values, derivatives = Forward(lambda x, y: [x*y, x + y], (Variable(0), Variable(0))).map([(1, 2), (3, 4)], processes=1)
+        np.testing.assert_array_equal(values, [[2, 3], [12, 7]])
+        np.testing.assert_array_equal(derivatives, [[[2, 1], [1, 1]], [[4, 3], [1, 1]]])
+
+    def test_jvp(self):
+        """
+        Test that Jacobian-vector products agree with the Jacobian, from a single evaluation.
+        """
+        calls = []
+        def f(x, y, z):
+            calls.append(1)
+            return [x*y*z, sin(x) + z, 4]
+        fmode = Forward(f, (Variable(1.), Variable(2.), Variable(3.)))
+        fmode.calculate()
+        jacobian = fmode.derivative
+        for tangent in [(1., 0., 0.), (0.5, -1., 2.), np.array([0., 0., 1.])]:
+            del calls[:]
+            value, product = jvp(f, (1., 2., 3.), tangent)
+            self.assertEqual(len(calls), 1)
+            np.testing.assert_allclose(value, fmode.value)
+            np.testing.assert_allclose(product, np.dot(jacobian, tangent))
+        with self.assertRaises(ValueError):
+            jvp(f, (1., 2., 3.), (1., 0.))
+
+        # a single input, a single output and batched inputs
+        self.assertEqual(jvp(lambda x: x**2, 3, 2), (9, 12))
+        self.assertEqual(jvp(lambda x, y: x*y + 1, (3., 4.), (1., 1.)), (13., 7.))
+        self.assertEqual(jvp(lambda x, y: 5, (3., 4.), (1., 1.)), (5, 0.0))
+        xs = np.array([1., 2., 3.])
+        value, product = jvp(lambda x, y: x*y, (xs, 2.), (np.ones(3), 0.))
+        np.testing.assert_allclose(value, 2*xs)
+        np.testing.assert_allclose(product, [2., 2., 2.])
+
+    def test_cache(self):
+        """
+        Test that results are memoized by the values of the Variables, with LRU eviction, statistics
+        and invalidation by the setters.
+        """
+        calls = []
+        def f(x, y):
+            calls.append(1)
+            return x*y + sin(x)
+        fmode = Forward(f, [Variable(1.), Variable(2.)], cache_size=2)
+        fmode.calculate()
+        fmode.calculate()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(fmode.cache_info(), (1, 1, 2, 1))
+        np.testing.assert_allclose(fmode.derivative, [2 + np.cos(1), 1])
+
+        # the Variables are modified in place, their values and seed derivatives are the key
+        fmode.vars[0].val = 3.
+        fmode.calculate()
+        self.assertEqual(fmode.value, 6 + np.sin(3))
+        fmode.vars[0].val = 1.
+        fmode.calculate()
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(fmode.value, 2 + np.sin(1))
+        fmode.vars[1].der = 0.
+        fmode.calculate()
+        self.assertEqual(fmode.derivative[1], 0.)
+        self.assertEqual(len(calls), 3)
+
+        # the least recently used result (3., 2.) was evicted
+        fmode.vars[0].val = 3.
+        fmode.vars[1].der = 1.
+        fmode.calculate()
+        self.assertEqual(len(calls), 4)
+        self.assertEqual(fmode.cache_info().currsize, 2)
+
+        # new Variables invalidate every result
+        fmode.vars = [Variable(1.), Variable(2.)]
+        self.assertEqual(fmode.cache_info(), (0, 0, 2, 0))
+        with self.assertRaises(AttributeError):
+            fmode.value
+        fmode.calculate()
+        self.assertEqual(len(calls), 5)
+        self.assertEqual(fmode.value, 2 + np.sin(1))
+
+        # a new function invalidates every result
+        fmode.func = lambda x, y: x - y
+        self.assertEqual(fmode.cache_info(), (0, 0, 2, 0))
+        fmode.calculate()
+        self.assertEqual(fmode.value, -1.)
+
+        # batched Variables, without limit on the size of the cache
+        fmode = Forward(f, [Variable(np.array([1., 2.])), Variable(2.)], cache_size=None)
+        fmode.calculate()
+        fmode.calculate()
+        self.assertEqual(fmode.cache_info(), (1, 1, None, 1))
+        fmode.cache_clear()
+        self.assertEqual(fmode.cache_info(), (0, 0, None, 0))
+        # derivatives given as lists
+        fmode.vars = [Variable(np.array([1., 2.]), [1., 1.]), Variable(2.)]
+        fmode.calculate()
+        fmode.calculate()
+        self.assertEqual(fmode.cache_info(), (1, 1, None, 1))
+
+        # the cache is disabled by default
+        del calls[:]
+        fmode = Forward(f, [Variable(1.), Variable(2.)])
+        fmode.calculate()
+        fmode.calculate()
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(fmode.cache_info(), (0, 0, 0, 0))
+        with self.assertRaises(ValueError):
+            Forward(f, Variable(1.), cache_size=-1)
+
 
+def _sweep_function(a, b):
+    """Function of Forward.map tests, at the top level so that it can be pickled."""
+    return sin(a) * b + b ** 2
 
 
 if __name__ == "__main__":
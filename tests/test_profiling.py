@@ -0,0 +1,83 @@
+import json
+import os
+import tempfile
+import unittest
+from src.pyadbcxy import elementary_functions, reverse
+from src.pyadbcxy.elementary_functions import exp, log, sin
+from src.pyadbcxy.profiling import Profile
+from src.pyadbcxy.reverse import Reverse
+from src.pyadbcxy.variable import Variable
+
+
+class TestProfile(unittest.TestCase):
+    def test_variable(self):
+        """Test the statistics of the operations on Variables."""
+        with Profile() as profile:
+            x = Variable(0.5)
+            y = sin(x) * x + exp(x) + log(x, base=2)
+            z = -y
+        report = profile.report()
+        operations = report["operations"]
+        self.assertEqual(operations["sin"]["calls"], 1)
+        self.assertEqual(operations["Variable.__add__"]["calls"], 2)
+        self.assertEqual(operations["Variable.__add__"]["nodes"], 2)
+        self.assertEqual(operations["Variable.__neg__"]["calls"], 1)
+        self.assertEqual(report["nodes"], 7)
+        # sin, *, +, +, -
+        self.assertEqual(report["depth"], 5)
+        # sin, exp and log of the input
+        self.assertEqual(report["width"], 3)
+        for stats in operations.values():
+            self.assertGreaterEqual(stats["time"], stats["self_time"])
+            self.assertGreaterEqual(stats["self_time"], 0)
+
+    def test_reverse(self):
+        """Test that the operations on Reverse objects are recorded with their nested operations."""
+        with Profile() as profile:
+            x = Reverse(0.5)
+            z = sin(x) * x
+        operations = profile.report()["operations"]
+        self.assertEqual(operations["Reverse.sin"]["calls"], 1)
+        self.assertEqual(operations["Reverse.mul"]["calls"], 1)
+        # the elementary function dispatches to the Reverse method, which is part of its time
+        self.assertGreaterEqual(operations["sin"]["time"], operations["Reverse.sin"]["time"])
+        self.assertEqual(profile.report()["nodes"], 2)
+
+    def test_restored(self):
+        """Test that every operation is restored when the Profile exits, even after an exception."""
+        originals = [Variable.__add__, Variable.__pow__, reverse._apply, elementary_functions.sin, sin]
+        with self.assertRaises(ValueError):
+            with Profile():
+                self.assertIsNot(Variable.__add__, originals[0])
+                self.assertIsNot(sin, originals[4])
+                log(Variable(-1.0))
+        self.assertEqual([Variable.__add__, Variable.__pow__, reverse._apply, elementary_functions.sin, sin], originals)
+        # a failed call is still counted
+        with Profile() as profile:
+            with self.assertRaises(ValueError):
+                log(-1.0)
+        self.assertEqual(profile.report()["operations"]["log"]["calls"], 1)
+        self.assertEqual(profile.report()["nodes"], 0)
+
+    def test_nested(self):
+        """Test that profiles cannot be nested."""
+        with Profile():
+            with self.assertRaises(RuntimeError):
+                with Profile():
+                    pass
+        with Profile():
+            pass
+
+    def test_json(self):
+        """Test the export of the report as JSON."""
+        with Profile() as profile:
+            Variable(2.0) ** 2
+        path = os.path.join(tempfile.mkdtemp(), "profile.json")
+        document = profile.to_json(path)
+        with open(path) as f:
+            self.assertEqual(json.load(f), json.loads(document))
+        self.assertEqual(json.loads(document)["operations"]["Variable.__pow__"]["calls"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,9 @@
+import gc
 import math
 import unittest
-from src.pyadbcxy.reverse import Reverse
+import weakref
+import numpy as np
+from src.pyadbcxy.reverse import Reverse, ReverseMode, vjp
 
 
 class TestReverseMode(unittest.TestCase):
@@ -113,6 +116,7 @@ class TestReverseMode(unittest.TestCase):
         z = 5 - self.x
         self.assertEqual(z.val, 2)
         self.assertEqual(z.grad, 1)
+        self.assertEqual(self.x.grad, -1)
 
         with self.assertRaises(TypeError):
             [] - self.x
@@ -242,6 +246,7 @@ class TestReverseMode(unittest.TestCase):
         z = x ** y
         self.assertEqual(z.val, 81)
         self.assertEqual(x.grad, 108)
+        self.assertEqual(y.grad, math.log(3) * 81)
 
         x = Reverse(3)
         y = Reverse(4)
@@ -249,8 +254,202 @@ class TestReverseMode(unittest.TestCase):
         self.assertEqual(z.val, 81)
         self.assertEqual(y.grad, math.log(3) * (3 ** 4))
 
+    def test_deep_graph(self):
+        """
+        Test that the gradient of a graph deeper than the recursion limit
+        can be computed from the children lists.
+        """
+        x = Reverse(0.5)
+        z = x
+        for _ in range(20000):
+            z = z * 1.0001 + 0.001
+        self.assertAlmostEqual(x.grad, 1.0001 ** 20000)
+
+    def test_zero_grad(self):
+        """
+        Test that zero_grad discards gradients cached before the graph was extended.
+        """
+        u = self.x * 2
+        z = u * 3
+        self.assertEqual(self.x.grad, 6)
+        w = u * 5
+        self.x.zero_grad()
+        self.assertEqual(self.x.grad, 16)
+
+    def test_release(self):
+        """
+        Test that a released leaf can be reused without the old subgraphs.
+        """
+        for i in range(1, 4):
+            z = self.x * i
+            self.assertEqual(self.x.grad, i)
+            self.x.release()
+            self.assertEqual(len(self.x._children), 0)
+
+    def test_slots(self):
+        """
+        Test that Reverse objects have no per-instance __dict__ and no children list until they are used.
+        """
+        self.assertFalse(hasattr(self.x, "__dict__"))
+        with self.assertRaises(AttributeError):
+            self.x.other = 1
+        self.assertEqual(self.x._children, ())
+        z = self.x * 2
+        self.assertEqual(len(self.x._children), 1)
+
+    def test_domain_errors(self):
+        """
+        Test that the inverse trigonometric functions and logarithm reject invalid input.
+        """
+        with self.assertRaises(ValueError):
+            Reverse(2).arcsin()
+        with self.assertRaises(ValueError):
+            Reverse(-2).arccos()
+        with self.assertRaises(ZeroDivisionError):
+            Reverse(2).log(1)
+
+    def test_numpy_scalars(self):
+        """Test that NumPy scalars are accepted as operands, like ints and floats."""
+        x = Reverse(2.)
+        z = (x * np.int64(3) + np.float32(1) - np.int32(1) / x + np.int64(5) / x - np.int64(4) - x
+             + x ** np.int64(2) + np.int64(2) ** x)
+        self.assertAlmostEqual(z.val, 6 + 1 - 0.5 + 2.5 - 4 - 2 + 4 + 4)
+        self.assertAlmostEqual(x.grad, 3 + 1 / 4 - 5 / 4 - 1 + 4 + 4 * math.log(2))
+        with self.assertRaises(ZeroDivisionError):
+            x / np.int64(0)
+
     # TODO: test __eq__
     # TODO: test __ne__
 
+class TestReverseModeDriver(unittest.TestCase):
+    def setUp(self):
+        """Prepare the test fixture. Executed before each test method."""
+        self.x = Reverse(3)
+        self.y = Reverse(4)
+        self.rmode1 = ReverseMode(lambda x: x ** 2, self.x)
+        self.rmode2 = ReverseMode(lambda x, y: x * y + x.sin(), (self.x, self.y))
+
+    def test_constructor_setters(self):
+        """Test the constructor, getters and setters."""
+        self.assertEqual(self.rmode1.vars, [self.x])
+        self.assertEqual(self.rmode2.vars, (self.x, self.y))
+        f = lambda x: x.exp()
+        self.rmode1.func = f
+        self.rmode1.vars = self.y
+        self.assertIs(self.rmode1.func, f)
+        self.assertEqual(self.rmode1.vars, [self.y])
+
+    def test_attribute_error(self):
+        """Test that an AttributeError is raised before 'calculate' is called."""
+        with self.assertRaises(AttributeError):
+            self.rmode1.value
+        with self.assertRaises(AttributeError):
+            self.rmode1.derivative
+
+    def test_gradient(self):
+        """Test the value and gradient of scalar functions."""
+        self.rmode1.calculate()
+        self.assertEqual(self.rmode1.value, 9)
+        np.testing.assert_allclose(self.rmode1.derivative, [6.])
+
+        self.rmode2.calculate()
+        self.assertEqual(self.rmode2.value, 12 + math.sin(3))
+        np.testing.assert_allclose(self.rmode2.derivative, [4 + math.cos(3), 3])
+
+        # the user's Reverse objects are not modified
+        self.assertEqual(len(self.x._children), 0)
+        self.assertEqual(self.x.grad, 1)
+
+    def test_many_inputs(self):
+        """Test that the gradient of a function of many inputs matches the analytic gradient."""
+        xs = [Reverse(0.1 * i) for i in range(200)]
+        def f(*xs):
+            total = 0
+            for i, x in enumerate(xs):
+                total = total + (i + 1) * x.sin()
+            return total
+        rmode = ReverseMode(f, xs)
+        rmode.calculate()
+        np.testing.assert_allclose(rmode.derivative, [(i + 1) * math.cos(0.1 * i) for i in range(200)])
+
+    def test_jacobian(self):
+        """Test the value and Jacobian of a function with several outputs."""
+        rmode = ReverseMode(lambda x, y: (x * y, x / y, 5), (self.x, self.y))
+        rmode.calculate()
+        np.testing.assert_allclose(rmode.value, [12, 0.75, 5])
+        np.testing.assert_allclose(rmode.derivative, [[4, 3], [0.25, -3 / 16], [0, 0]])
+        # an array of Reverse objects is flattened into its outputs
+        rmode = ReverseMode(lambda x, y: np.array([[x * y, x + y], [x, 2.]]), (self.x, self.y))
+        rmode.calculate()
+        np.testing.assert_allclose(rmode.value, [12, 7, 3, 2])
+        np.testing.assert_allclose(rmode.derivative, [[4, 3], [1, 1], [1, 0], [0, 0]])
+
+    def test_cache(self):
+        """Test that values and derivatives are memoized by the values of the Reverse objects."""
+        calls = []
+        def f(x, y):
+            calls.append(1)
+            return [x * y, x + y]
+        rmode = ReverseMode(f, (self.x, self.y), cache_size=1)
+        rmode.calculate()
+        rmode.calculate()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(rmode.cache_info(), (1, 1, 1, 1))
+        np.testing.assert_allclose(rmode.derivative, [[4, 3], [1, 1]])
+        # new Reverse objects invalidate every result
+        rmode.vars = (Reverse(1), Reverse(2))
+        self.assertEqual(rmode.cache_info(), (0, 0, 1, 0))
+        with self.assertRaises(AttributeError):
+            rmode.derivative
+        rmode.calculate()
+        np.testing.assert_allclose(rmode.value, [2, 3])
+        np.testing.assert_allclose(rmode.derivative, [[2, 1], [1, 1]])
+        # the Reverse objects are modified in place, the first result was evicted
+        rmode.vars[0].val = 3
+        rmode.vars[1].val = 4
+        rmode.calculate()
+        self.assertEqual(len(calls), 3)
+        np.testing.assert_allclose(rmode.value, [12, 7])
+        rmode.func = lambda x, y: x - y
+        self.assertEqual(rmode.cache_info().currsize, 0)
+        rmode.calculate()
+        self.assertEqual(rmode.value, -1)
+
+        # the cached results do not keep the recorded graph alive
+        tapes = []
+        def g(x):
+            y = x * x
+            tapes.append(weakref.ref(y._tape))
+            return y
+        rmode = ReverseMode(g, Reverse(2.), cache_size=4)
+        rmode.calculate()
+        gc.collect()
+        self.assertIsNone(tapes[0]())
+        self.assertEqual(rmode.value, 4.)
+        self.assertEqual(rmode.derivative, 4.)
+
+    def test_vjp(self):
+        """Test that the pullback gives the vector-Jacobian products without evaluating the function again."""
+        calls = []
+        def f(x, y):
+            calls.append(1)
+            return (x * y, x / y, 5, y)
+        value, pullback = vjp(f, (3., 4.))
+        np.testing.assert_allclose(value, [12, 0.75, 5, 4])
+        jacobian = np.array([[4, 3], [0.25, -3 / 16], [0, 0], [0, 1]])
+        for cotangent in [[1, 0, 0, 0], [0, 1, 0, 0], [1., -2., 7., 0.5], np.array([0., 0., 1., 1.])]:
+            np.testing.assert_allclose(pullback(cotangent), np.dot(cotangent, jacobian))
+        self.assertEqual(len(calls), 1)
+        with self.assertRaises(ValueError):
+            pullback([1, 0])
+
+        # functions with a single output take a number as the cotangent
+        value, pullback = vjp(lambda x, y: x * y + x.sin(), (3, 4))
+        self.assertEqual(value, 12 + math.sin(3))
+        np.testing.assert_allclose(pullback(2.), [2 * (4 + math.cos(3)), 6])
+        value, pullback = vjp(lambda x: x ** 2, 3)
+        np.testing.assert_allclose(pullback(1), [6.])
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,89 @@
+import asyncio
+import math
+import unittest
+import numpy as np
+from src.pyadbcxy.elementary_functions import log, sin
+from src.pyadbcxy.serving import AsyncEvaluator
+from src.pyadbcxy.tracing import trace
+
+
+class CountingFunction(object):
+    """Compiled function recording the number of requests of each call."""
+
+    def __init__(self, compiled):
+        self.compiled = compiled
+        self.calls = []
+
+    def value_and_derivative(self, *args):
+        self.calls.append(np.size(args[0]))
+        return self.compiled.value_and_derivative(*args)
+
+
+class TestAsyncEvaluator(unittest.TestCase):
+    def setUp(self):
+        """Prepare the test fixture. Executed before each test method."""
+        self.compiled = CountingFunction(trace(lambda x, y: x * sin(y) + log(x), 1., 1.))
+
+    def gather(self, evaluator, requests):
+        """Evaluate concurrent requests and return their results or exceptions."""
+        async def main():
+            return await asyncio.gather(*[evaluator.evaluate(*args) for args in requests], return_exceptions=True)
+        return asyncio.run(main())
+
+    def test_batching(self):
+        """Test that concurrent requests are coalesced into batches of at most max_batch_size."""
+        evaluator = AsyncEvaluator(self.compiled, max_batch_size=4, max_wait=0.01)
+        requests = [(1 + 0.1 * i, 0.5 * i) for i in range(10)]
+        results = self.gather(evaluator, requests)
+        self.assertEqual(self.compiled.calls, [4, 4, 2])
+        for (value, derivative), (x, y) in zip(results, requests):
+            self.assertAlmostEqual(value, x * math.sin(y) + math.log(x))
+            np.testing.assert_allclose(derivative, [math.sin(y) + 1 / x, x * math.cos(y)])
+
+    def test_max_wait(self):
+        """Test that a request does not wait for a full batch longer than max_wait."""
+        evaluator = AsyncEvaluator(self.compiled, max_batch_size=100, max_wait=0)
+        async def main():
+            first = await evaluator.evaluate(1., 0.)
+            second = await evaluator.evaluate(2., 0.)
+            return first, second
+        first, second = asyncio.run(main())
+        self.assertEqual(self.compiled.calls, [1, 1])
+        self.assertAlmostEqual(second[0], math.log(2))
+
+    def test_errors(self):
+        """Test that an exception is only raised for the requests that cause it."""
+        evaluator = AsyncEvaluator(self.compiled, max_batch_size=3)
+        results = self.gather(evaluator, [(1., 0.), (-1., 0.), (1., 2.), (1.,)])
+        self.assertAlmostEqual(results[0][0], 0.)
+        self.assertIsInstance(results[1], ValueError)
+        self.assertAlmostEqual(results[2][0], math.sin(2))
+        self.assertIsInstance(results[3], TypeError)
+        with self.assertRaises(ValueError):
+            AsyncEvaluator(self.compiled, max_batch_size=0)
+        with self.assertRaises(ValueError):
+            AsyncEvaluator(self.compiled, max_wait=-1)
+
+    def test_cancelled(self):
+        """Test that requests cancelled while waiting for their batch are dropped."""
+        evaluator = AsyncEvaluator(self.compiled, max_batch_size=10, max_wait=0.01)
+        async def main():
+            cancelled = asyncio.ensure_future(evaluator.evaluate(1., 1.))
+            kept = asyncio.ensure_future(evaluator.evaluate(2., 1.))
+            await asyncio.sleep(0)
+            cancelled.cancel()
+            return await kept
+        value, derivative = asyncio.run(main())
+        self.assertEqual(self.compiled.calls, [1])
+        self.assertAlmostEqual(value, 2 * math.sin(1) + math.log(2))
+
+    def test_vector_outputs(self):
+        """Test the results of a function with several outputs."""
+        evaluator = AsyncEvaluator(trace(lambda x, y: [x * y, x + y], 1., 1.))
+        results = self.gather(evaluator, [(1., 2.), (3., 4.)])
+        np.testing.assert_allclose(results[1][0], [12., 7.])
+        np.testing.assert_allclose(results[1][1], [[4., 3.], [1., 1.]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+import numpy as np
+from src.pyadbcxy.elementary_functions import exp, sin
+from src.pyadbcxy.sparsity import SparseJacobian, _greedy_coloring, _scipy_sparse
+from src.pyadbcxy.tracing import trace
+
+
+def banded(*u):
+    """Residual of a periodic discretization, with a tridiagonal Jacobian."""
+    n = len(u)
+    return [sin(u[i]) * u[i - 1] - 2 * u[i] + exp(u[(i + 1) % n]) for i in range(n)]
+
+
+class TestSparseJacobian(unittest.TestCase):
+    def setUp(self):
+        """Prepare the test fixture. Executed before each test method."""
+        self.x = list(np.linspace(0.1, 1.0, 30))
+        self.dense = trace(banded, *self.x).derivative(*self.x)
+
+    def to_dense(self, jac):
+        """Assemble the dense Jacobian from the entries."""
+        dense = np.zeros(jac.shape)
+        rows, cols = jac.pattern
+        dense[rows, cols] = jac.entries(*self.x)
+        return dense
+
+    def test_pattern(self):
+        """Test that the detected pattern covers exactly the non-zero entries."""
+        jac = SparseJacobian(banded, *self.x)
+        self.assertEqual(jac.shape, (30, 30))
+        rows, cols = jac.pattern
+        self.assertEqual(len(rows), 90)
+        mask = np.zeros((30, 30), dtype=bool)
+        mask[rows, cols] = True
+        np.testing.assert_array_equal(mask, self.dense != 0)
+
+    def test_forward(self):
+        """Test compressed forward seeding with a column coloring."""
+        jac = SparseJacobian(banded, *self.x, mode="forward")
+        self.assertEqual(jac.mode, "forward")
+        self.assertEqual(jac.colors, 3)
+        self.assertIs(type(jac.colors), int)
+        np.testing.assert_allclose(self.to_dense(jac), self.dense)
+
+    def test_reverse(self):
+        """Test compressed reverse seeding with a row coloring."""
+        jac = SparseJacobian(banded, *self.x, mode="reverse")
+        self.assertEqual(jac.mode, "reverse")
+        self.assertEqual(jac.colors, 3)
+        np.testing.assert_allclose(self.to_dense(jac), self.dense)
+
+    def test_default_mode(self):
+        """Test that the mode with fewer colors is chosen by default."""
+        # one dense row and many independent ones: the rows need fewer colors than the columns
+        jac = SparseJacobian(lambda x, y, z: [x * y * z, x, y, z], 1, 2, 3)
+        self.assertEqual(jac.mode, "reverse")
+        self.assertEqual(jac.colors, 2)
+        np.testing.assert_allclose(jac.entries(1, 2, 3), [6, 3, 2, 1, 1, 1])
+
+    def test_invalid_mode(self):
+        """Test that the mode must be forward or reverse."""
+        with self.assertRaises(ValueError):
+            SparseJacobian(banded, *self.x, mode="sideways")
+
+    def test_constant_output(self):
+        """Test that outputs which do not depend on the inputs have empty rows."""
+        jac = SparseJacobian(lambda x, y: [x * y, 3], 1, 2)
+        self.assertEqual(len(jac.pattern[0]), 2)
+        np.testing.assert_allclose(jac.entries(2, 5), [5, 2])
+
+    @unittest.skipIf(_scipy_sparse is None, "scipy is not installed")
+    def test_sparse_matrix(self):
+        """Test that calling the SparseJacobian returns a scipy sparse matrix."""
+        jac = SparseJacobian(banded, *self.x)
+        matrix = jac(*self.x)
+        self.assertEqual(matrix.nnz, 90)
+        np.testing.assert_allclose(matrix.toarray(), self.dense)
+
+    def test_greedy_coloring(self):
+        """Test that items sharing a line receive different colors."""
+        colors = _greedy_coloring([[0], [0, 1], [1], [2]], [[0, 1], [1, 2], [3]])
+        np.testing.assert_array_equal(colors, [0, 1, 0, 0])
+
+
+if __name__ == "__main__":
+    unittest.main()
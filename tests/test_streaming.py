@@ -0,0 +1,105 @@
+import itertools
+import math
+import unittest
+import numpy as np
+from src.pyadbcxy.elementary_functions import exp, sin
+from src.pyadbcxy.streaming import stream
+
+
+def smooth(x, y):
+    """Function that can be evaluated on batched Variables."""
+    return sin(x) * y + exp(y)
+
+
+def branching(x, y):
+    """Function that branches on the value of its inputs, so that it cannot be batched."""
+    if x.val > 0:
+        return x * y
+    return (0 - x) * y
+
+
+class TestStream(unittest.TestCase):
+    def setUp(self):
+        """Prepare the test fixture. Executed before each test method."""
+        self.points = [(0.1 * i - 1, 0.2 * i) for i in range(25)]
+
+    def check(self, results, func_value, func_gradient):
+        """Compare the results of a stream with the expected value and gradient at each point."""
+        results = list(results)
+        self.assertEqual(len(results), len(self.points))
+        for (value, gradient), (x, y) in zip(results, self.points):
+            self.assertAlmostEqual(value, func_value(x, y))
+            np.testing.assert_allclose(gradient, func_gradient(x, y))
+
+    def test_forward(self):
+        """Test the vectorized path of the forward mode, with a last batch smaller than the others."""
+        self.check(stream(smooth, self.points, batch_size=8),
+                   lambda x, y: math.sin(x) * y + math.exp(y),
+                   lambda x, y: [math.cos(x) * y, math.sin(x) + math.exp(y)])
+
+    def test_fallback(self):
+        """Test that functions that cannot be batched are evaluated point by point."""
+        for mode in ["forward", "reverse"]:
+            self.check(stream(branching, self.points, mode=mode, batch_size=8),
+                       lambda x, y: abs(x) * y,
+                       lambda x, y: [y if x > 0 else -y, abs(x)])
+
+    def test_failing_batch(self):
+        """Test that a batch failing with a ValueError or ZeroDivisionError is evaluated point by point
+        while the following batches are still vectorized, whereas a TypeError disables the vectorized path."""
+        for error in [ValueError, ZeroDivisionError, TypeError]:
+            sizes = []
+            def func(x, y):
+                sizes.append(np.size(x.val))
+                if len(sizes) == 2:
+                    raise error
+                return smooth(x, y)
+            self.check(stream(func, self.points, batch_size=8),
+                       lambda x, y: math.sin(x) * y + math.exp(y),
+                       lambda x, y: [math.cos(x) * y, math.sin(x) + math.exp(y)])
+            # the first point, then the rest of the first batch
+            self.assertEqual(sizes[:9], [1, 7] + [1] * 7)
+            self.assertEqual(sizes[9:], [1] * 17 if error is TypeError else [8, 8, 1])
+
+    def test_array_values(self):
+        """Test that functions with an array value at each point give the Jacobian at each point,
+        including when the batch size matches the length of the array."""
+        c = np.array([1., 2., 3.])
+        results = list(stream(lambda x, y: x * c + y, self.points[:7], batch_size=3))
+        self.assertEqual(len(results), 7)
+        for (value, jacobian), (x, y) in zip(results, self.points):
+            np.testing.assert_allclose(value, x * c + y)
+            np.testing.assert_allclose(jacobian, np.stack([c, np.ones(3)], axis=-1))
+
+    def test_reverse(self):
+        """Test the reverse mode, for a function of a single input given as numbers."""
+        results = list(stream(lambda x: x * sin(x), [0.5, 1.0, 1.5], mode="reverse", batch_size=2))
+        for (value, gradient), x in zip(results, [0.5, 1.0, 1.5]):
+            self.assertAlmostEqual(value, x * math.sin(x))
+            np.testing.assert_allclose(gradient, [math.sin(x) + x * math.cos(x)])
+
+    def test_lazy(self):
+        """Test that an unbounded stream is only read one batch at a time."""
+        read = []
+        def points():
+            for t in itertools.count():
+                read.append(t)
+                yield (t, 1.0)
+        results = stream(smooth, points(), batch_size=4)
+        self.assertEqual(read, [])
+        for _ in range(5):
+            next(results)
+        self.assertEqual(len(read), 8)
+
+    def test_errors(self):
+        """Test that invalid arguments and points are rejected."""
+        with self.assertRaises(ValueError):
+            stream(smooth, self.points, mode="backward")
+        with self.assertRaises(ValueError):
+            stream(smooth, self.points, batch_size=0)
+        with self.assertRaises(ValueError):
+            list(stream(smooth, [(1, 2), (1, 2, 3)]))
+
+
+if __name__ == "__main__":
+    unittest.main()
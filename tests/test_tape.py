@@ -0,0 +1,171 @@
+import math
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from src.pyadbcxy.reverse import Reverse
+from src.pyadbcxy.tape import Tape
+
+
+class TestTape(unittest.TestCase):
+    def setUp(self):
+        """Prepare the test fixture. Executed before each test method."""
+        self.x = Reverse(3)
+        self.y = Reverse(4)
+
+    def test_record(self):
+        """Test that operations inside the 'with' block are appended to the Tape
+        and not stored as children of the operands."""
+        with Tape() as tape:
+            z = self.x * self.y + 2
+        self.assertEqual(len(tape), 4)
+        self.assertEqual(tape._ops, [None, None, "mul", "add"])
+        self.assertEqual(len(self.x._children), 0)
+        self.assertEqual(z.val, 14)
+
+        # nothing is recorded once the block is left
+        w = self.x * 2
+        self.assertEqual(len(tape), 4)
+        self.assertEqual(len(self.x._children), 1)
+
+    def test_gradient(self):
+        """Test the gradient of a function of several inputs."""
+        with Tape() as tape:
+            z = self.x * self.y + self.x.sin() - self.y / self.x
+        grad = tape.gradient(z, [self.x, self.y])
+        np.testing.assert_allclose(grad, [4 + math.cos(3) + 4 / 9, 3 - 1 / 3])
+        self.assertAlmostEqual(self.x.grad, grad[0])
+        self.assertAlmostEqual(self.y.grad, grad[1])
+        self.assertEqual(z.grad, 1)
+
+    def test_matches_children(self):
+        """Test that the Tape agrees with the gradients computed from the children lists."""
+        def f(x, y):
+            return (x * y).exp().log() + (x ** y) - 5 / x + (3 - y).tanh() + 2 ** x
+        x, y = Reverse(1.5), Reverse(0.5)
+        f(x, y)
+        expected = [x.grad, y.grad]
+        x, y = Reverse(1.5), Reverse(0.5)
+        with Tape() as tape:
+            z = f(x, y)
+        np.testing.assert_allclose(tape.gradient(z, [x, y]), expected)
+
+    def test_grad_before_sweep(self):
+        """Test that the gradients of recorded objects are only available after a reverse sweep."""
+        with Tape() as tape:
+            z = self.x * self.y
+        for node in [self.x, z]:
+            with self.assertRaises(AttributeError):
+                node.grad
+        self.assertEqual(str(z), "Reverse(val = 12, grad = None)")
+        tape.backward(z)
+        self.assertEqual(self.x.grad, 4)
+        # replaying the Tape discards the adjoints of the previous values
+        tape.replay()
+        with self.assertRaises(AttributeError):
+            self.x.grad
+
+    def test_unused_input(self):
+        """Test that inputs which the output does not depend on have a zero gradient."""
+        w = Reverse(5)
+        with Tape() as tape:
+            z = self.x * 2
+        np.testing.assert_allclose(tape.gradient(z, [self.x, w]), [2., 0.])
+
+    def test_intermediate_output(self):
+        """Test differentiating a node that is not the last one recorded."""
+        with Tape() as tape:
+            u = self.x * self.x
+            z = u * self.y
+        np.testing.assert_allclose(tape.gradient(u, [self.x, self.y]), [6., 0.])
+        np.testing.assert_allclose(tape.gradient(z, [self.x, self.y]), [24., 9.])
+
+    def test_deep_graph(self):
+        """Test that a graph far deeper than the recursion limit can be differentiated."""
+        x = Reverse(0.5)
+        with Tape() as tape:
+            z = x
+            for _ in range(20000):
+                z = z * 1.0001 + 0.001
+        self.assertAlmostEqual(tape.gradient(z, [x])[0], 1.0001 ** 20000)
+
+    def test_other_tape(self):
+        """Test that Reverse objects cannot be shared between Tapes."""
+        with Tape():
+            z = self.x * 2
+        with self.assertRaises(ValueError):
+            with Tape():
+                z * 2
+
+    def test_nested(self):
+        """Test that the innermost Tape records."""
+        with Tape() as outer:
+            a = self.x * 2
+            with Tape() as inner:
+                b = self.y * 3
+        self.assertEqual(len(outer), 2)
+        self.assertEqual(len(inner), 2)
+
+    def test_threads(self):
+        """Test that each thread records on its own Tape, even while another thread's Tape is active."""
+        barrier = threading.Barrier(2)
+
+        def record(val):
+            x = Reverse(val)
+            with Tape() as tape:
+                # both Tapes are active at this point
+                barrier.wait()
+                z = x * x + x.sin()
+                barrier.wait()
+            return len(tape), tape.gradient(z, [x])[0]
+
+        with ThreadPoolExecutor(2) as executor:
+            results = list(executor.map(record, [1., 2.]))
+        for (length, gradient), val in zip(results, [1., 2.]):
+            self.assertEqual(length, 4)
+            self.assertAlmostEqual(gradient, 2 * val + math.cos(val))
+
+    def test_replay(self):
+        """Test that replaying the Tape with new leaf values agrees with recording
+        the function again, for every kind of operation and constant operand."""
+        def f(x, y):
+            return ((x * y).exp().log(2) + x ** 3 + 2 ** y - 5 / x + (3 - y).tanh()
+                    + (x / 4).arcsin() + (y / 8).arccos() + x.arctan() * y.cosh() - y.sinh()
+                    + x.tan() * x.cos() - y ** x)
+        x, y = Reverse(1.5), Reverse(0.5)
+        with Tape() as tape:
+            z = f(x, y)
+        for xv, yv in [(0.7, 1.2), (2.0, 0.3)]:
+            x.val, y.val = xv, yv
+            tape.replay()
+            fresh_x, fresh_y = Reverse(xv), Reverse(yv)
+            with Tape() as fresh:
+                expected = f(fresh_x, fresh_y)
+            self.assertAlmostEqual(z.val, expected.val)
+            np.testing.assert_allclose(tape.gradient(z, [x, y]),
+                                       fresh.gradient(expected, [fresh_x, fresh_y]))
+        self.assertEqual(len(tape), len(fresh))
+
+    def test_zero_grad(self):
+        """Test that zero_grad sets every adjoint to zero."""
+        with Tape() as tape:
+            z = self.x * self.y
+        tape.gradient(z, [self.x])
+        tape.zero_grad()
+        self.assertEqual(self.x.grad, 0)
+        self.assertEqual(z.grad, 0)
+
+    def test_clear(self):
+        """Test that clear releases the recorded nodes so the leaves can be recorded again."""
+        with Tape() as tape:
+            z = self.x * self.y
+        tape.clear()
+        self.assertEqual(len(tape), 0)
+        self.assertIsNone(z._tape)
+        with Tape() as other:
+            z = self.x * 2
+        np.testing.assert_allclose(other.gradient(z, [self.x, self.y]), [2., 0.])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+import math
+import unittest
+import numpy as np
+from src.pyadbcxy.elementary_functions import *
+from src.pyadbcxy.taylor import Taylor
+from src.pyadbcxy.variable import Variable
+
+
+class TestTaylor(unittest.TestCase):
+    def setUp(self):
+        """Prepare the test fixture. Executed before each test method."""
+        self.zero = Taylor(0., order=6)
+        self.x = Taylor(0.7, order=6)
+
+    def assertCoefficients(self, taylor, expected):
+        np.testing.assert_allclose(taylor.coefficients, expected, rtol=1e-12, atol=1e-14)
+
+    def test_constructor(self):
+        """Test the constructor, coefficients and derivatives."""
+        x = Taylor(2, 3, order=3)
+        self.assertEqual(x.val, 2)
+        self.assertEqual(x.order, 3)
+        np.testing.assert_array_equal(x.coefficients, [2, 3, 0, 0])
+        self.assertEqual(Taylor(2, order=0).order, 0)
+        y = x ** 3
+        np.testing.assert_array_equal(y.coefficients, [8, 36, 54, 27])
+        np.testing.assert_array_equal(y.derivatives, [8, 36, 108, 162])
+        self.assertEqual(y.derivative(2), 108)
+        with self.assertRaises(ValueError):
+            y.derivative(4)
+        with self.assertRaises(ValueError):
+            Taylor(1, order=-1)
+
+    def test_series_at_zero(self):
+        """Test the propagation rules against the known series expansions at 0."""
+        t = self.zero
+        self.assertCoefficients(exp(t), [1 / math.factorial(j) for j in range(7)])
+        self.assertCoefficients(sin(t), [0, 1, 0, -1 / 6, 0, 1 / 120, 0])
+        self.assertCoefficients(cos(t), [1, 0, -1 / 2, 0, 1 / 24, 0, -1 / 720])
+        self.assertCoefficients(sinh(t), [0, 1, 0, 1 / 6, 0, 1 / 120, 0])
+        self.assertCoefficients(cosh(t), [1, 0, 1 / 2, 0, 1 / 24, 0, 1 / 720])
+        self.assertCoefficients(tan(t), [0, 1, 0, 1 / 3, 0, 2 / 15, 0])
+        self.assertCoefficients(tanh(t), [0, 1, 0, -1 / 3, 0, 2 / 15, 0])
+        self.assertCoefficients(arctan(t), [0, 1, 0, -1 / 3, 0, 1 / 5, 0])
+        self.assertCoefficients(arcsin(t), [0, 1, 0, 1 / 6, 0, 3 / 40, 0])
+        self.assertCoefficients(arccos(t), [math.pi / 2, -1, 0, -1 / 6, 0, -3 / 40, 0])
+        self.assertCoefficients(log(1 + t), [0, 1, -1 / 2, 1 / 3, -1 / 4, 1 / 5, -1 / 6])
+        self.assertCoefficients(log(1 + t, 2), [0] + [(-1) ** (j + 1) / (j * math.log(2)) for j in range(1, 7)])
+        self.assertCoefficients(1 / (1 - t), [1] * 7)
+        self.assertCoefficients(root(1 + t), [math.comb(2 * j, j) * (-1) ** (j + 1) / (4 ** j * (2 * j - 1)) for j in range(7)])
+        self.assertCoefficients(logistic(t), [1 / 2, 1 / 4, 0, -1 / 48, 0, 1 / 480, 0])
+
+    def test_identities(self):
+        """Test every rule away from 0 with identities between the elementary functions."""
+        x = self.x
+        self.assertCoefficients(sin(x) ** 2 + cos(x) ** 2, [1, 0, 0, 0, 0, 0, 0])
+        self.assertCoefficients(cosh(x) ** 2 - sinh(x) ** 2, [1, 0, 0, 0, 0, 0, 0])
+        self.assertCoefficients(tan(x), (sin(x) / cos(x)).coefficients)
+        self.assertCoefficients(tanh(x), ((exp(2 * x) - 1) / (exp(2 * x) + 1)).coefficients)
+        self.assertCoefficients(exp(log(x)), x.coefficients)
+        self.assertCoefficients(arcsin(sin(x)), x.coefficients)
+        self.assertCoefficients(arccos(cos(x)), x.coefficients)
+        self.assertCoefficients(arctan(tan(x)), x.coefficients)
+        self.assertCoefficients(x ** 2.5, exp(2.5 * log(x)).coefficients)
+        self.assertCoefficients(x ** -3, (1 / (x * x * x)).coefficients)
+        self.assertCoefficients(x ** x, exp(x * log(x)).coefficients)
+        self.assertCoefficients(3 ** x, exp(x * math.log(3)).coefficients)
+        self.assertCoefficients(2 - x / 4, (-(x - 8) / 4).coefficients)
+
+    def test_matches_forward_mode(self):
+        """Test that the first derivative agrees with the forward mode."""
+        f = lambda x: exp(cos(x)) / sin(x) ** 2 + log(x, 3) - x ** x + tanh(x) * arctan(x)
+        der = f(Variable(0.7)).der
+        self.assertAlmostEqual(f(Taylor(0.7, order=5)).derivative(1), der)
+
+    def test_directional(self):
+        """Test directional derivatives of a function of several inputs."""
+        f = lambda x, y: x ** 2 * y + sin(x * y)
+        # second derivative of t -> f(1 + t, 2 + 3t)
+        x, y = Taylor(1., 1., order=2), Taylor(2., 3., order=2)
+        hessian = np.array([[2 * 2 - 4 * math.sin(2), 2 * 1 + math.cos(2) - 2 * math.sin(2)],
+                            [2 * 1 + math.cos(2) - 2 * math.sin(2), -math.sin(2)]])
+        self.assertAlmostEqual(f(x, y).derivative(2), np.dot([1, 3], np.dot(hessian, [1, 3])))
+
+    def test_arrays(self):
+        """Test expanding a function at several points at once."""
+        xs = np.array([0.1, 0.5, 0.9])
+        y = sin(Taylor(xs, order=3)) * 2
+        self.assertEqual(y.derivatives.shape, (4, 3))
+        np.testing.assert_allclose(y.derivatives, 2 * np.array([np.sin(xs), np.cos(xs), -np.sin(xs), -np.cos(xs)]))
+
+    def test_orders(self):
+        """Test that operations between Taylor objects keep the lower of their orders."""
+        y = Taylor(1., order=5) * Taylor(2., order=2)
+        self.assertEqual(y.order, 2)
+        self.assertCoefficients(arcsin(Taylor(0.5, order=0)), [math.asin(0.5)])
+
+    def test_errors(self):
+        """Test that the domains of the operations and elementary functions are checked."""
+        with self.assertRaises(ValueError):
+            log(Taylor(-1., order=3))
+        with self.assertRaises(ZeroDivisionError):
+            log(Taylor(1., order=3), 1)
+        with self.assertRaises(ValueError):
+            arcsin(Taylor(2., order=3))
+        with self.assertRaises(ValueError):
+            Taylor(-1., order=3) ** 0.5
+        with self.assertRaises(ValueError):
+            (-2) ** Taylor(1., order=3)
+        with self.assertRaises(ZeroDivisionError):
+            1 / Taylor(0., order=3)
+        with self.assertRaises(ZeroDivisionError):
+            Taylor(1., order=3) / 0
+        with self.assertRaises(TypeError):
+            Taylor(1.) + "1"
+        with self.assertRaises(TypeError):
+            Taylor(1.) * Variable(1.)
+        # integer powers are defined at 0
+        self.assertCoefficients(Taylor(0., order=3) ** 2, [0, 0, 1, 0])
+
+    def test_equality(self):
+        """Test the equality operators."""
+        self.assertEqual(Taylor(1., order=2) * 2, Taylor(2., 2., order=2))
+        self.assertNotEqual(Taylor(1., order=2), Taylor(1., order=3))
+        self.assertNotEqual(Taylor(1., order=2), 1.)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+import unittest
+import numpy as np
+from src.pyadbcxy.elementary_functions import *
+from src.pyadbcxy.reverse import Reverse
+from src.pyadbcxy.tensor import Tensor
+
+
+def numerical_gradient(func, val, step=1e-6):
+    """Central finite differences of a scalar function of an array."""
+    grad = np.zeros_like(val)
+    for index in np.ndindex(val.shape):
+        shift = np.zeros_like(val)
+        shift[index] = step
+        grad[index] = (func(val + shift) - func(val - shift)) / (2 * step)
+    return grad
+
+
+class TestTensor(unittest.TestCase):
+    def setUp(self):
+        """Prepare the test fixture. Executed before each test method."""
+        rng = np.random.default_rng(0)
+        self.A = rng.uniform(-1, 1, (3, 4))
+        self.B = rng.uniform(-1, 1, (4, 2))
+        self.x = rng.uniform(0.2, 0.8, 4)
+
+    def assertGradient(self, func, *vals):
+        """Check the adjoints of the inputs of a scalar function against finite differences."""
+        tensors = [Tensor(val) for val in vals]
+        out = func(*tensors)
+        out.backward()
+        for i, (tensor, val) in enumerate(zip(tensors, vals)):
+            partial = lambda v: func(*[Tensor(v) if j == i else Tensor(w) for j, w in enumerate(vals)]).val
+            np.testing.assert_allclose(tensor.grad, numerical_gradient(partial, val), rtol=1e-6, atol=1e-8)
+
+    def test_constructor(self):
+        """Test the constructor and properties."""
+        t = Tensor([[1, 2], [3, 4]])
+        self.assertEqual(t.shape, (2, 2))
+        self.assertEqual(t.ndim, 2)
+        self.assertEqual(t.val.dtype, float)
+        np.testing.assert_array_equal(t.grad, np.zeros((2, 2)))
+        self.assertEqual(str(Tensor(2.)), "Tensor(val = 2.0)")
+
+    def test_elementwise(self):
+        """Test the arithmetic operators and elementary functions, with broadcasting."""
+        self.assertGradient(lambda x, y: (x * y + x / y - y ** 2 - 3 / x + 2 ** x - x ** y).sum(),
+                            self.x, self.x[::-1].copy())
+        self.assertGradient(lambda a, x: (a * x - x / 2 + (1 - a)).mean(), self.A, self.x)
+        self.assertGradient(lambda a, c: (a + c).sum(), self.A, np.ones((3, 1)))
+        f = lambda x: (exp(x) + log(x) + log(x, 2) + sin(x) * cos(x) + tan(x) + sinh(x) + cosh(x) + tanh(x) +
+                       arcsin(x) + arccos(x) + arctan(x) + logistic(x) + root(x) - x).sum()
+        self.assertGradient(f, self.x)
+
+    def test_matmul(self):
+        """Test the matrix product with matrices, vectors and stacks of matrices."""
+        self.assertGradient(lambda a, b: (a @ b).sum(), self.A, self.B)
+        self.assertGradient(lambda a, x: tanh(a @ x).sum(), self.A, self.x)
+        self.assertGradient(lambda x, b: (x @ b).sum(), self.x, self.B)
+        self.assertGradient(lambda x, y: x @ y, self.x, self.x + 1)
+        self.assertGradient(lambda x, y: x.dot(y), self.x, self.x + 1)
+        self.assertGradient(lambda s, b: sin(s @ b).sum(), np.stack([self.A, 2 * self.A]), self.B)
+        # constant operands on either side
+        self.assertGradient(lambda x: (self.A @ x).sum(), self.x)
+        self.assertGradient(lambda b: (self.A @ b).sum() + (b.T @ self.A.T).mean(), self.B)
+        with self.assertRaises(ValueError):
+            Tensor(np.ones((2, 2, 2))).dot(np.ones((2, 2)))
+
+    def test_reductions_and_shapes(self):
+        """Test sum, mean, reshape, transpose and indexing."""
+        self.assertGradient(lambda a: (a.sum(axis=0) ** 2).sum(), self.A)
+        self.assertGradient(lambda a: (a.mean(axis=1, keepdims=True) * a).sum(), self.A)
+        self.assertGradient(lambda a: (a.sum(axis=(0, 1)) * a).mean(), self.A)
+        self.assertGradient(lambda a: (a.reshape(2, 6)[1] ** 3).sum(), self.A)
+        self.assertGradient(lambda a: (a.T @ a).sum() + (a.transpose(1, 0)[0] * 2).sum(), self.A)
+        # repeated entries of an integer index get every contribution
+        self.assertGradient(lambda x: (x[[0, 2, 2]] ** 2).sum() + x[1:].sum() + x[-1], self.x)
+
+    def test_matches_reverse(self):
+        """Test against the scalar reverse mode on a small model."""
+        xs = [Reverse(v) for v in self.x]
+        hidden = [tanh(sum(a * x for a, x in zip(row, xs))) for row in self.A]
+        sum(h * h for h in hidden)
+        x = Tensor(self.x)
+        hidden = tanh(self.A @ x)
+        (hidden * hidden).sum().backward()
+        np.testing.assert_allclose(x.grad, [v.grad for v in xs])
+
+    def test_backward(self):
+        """Test the seed, shared subexpressions and repeated sweeps."""
+        x = Tensor(self.x)
+        y = sin(x)
+        z = y * y + y
+        z.backward(np.ones(4))
+        np.testing.assert_allclose(x.grad, (2 * np.sin(self.x) + 1) * np.cos(self.x))
+        np.testing.assert_allclose(y.grad, 2 * np.sin(self.x) + 1)
+        # adjoints do not accumulate across calls
+        z.backward(2.)
+        np.testing.assert_allclose(x.grad, 2 * (2 * np.sin(self.x) + 1) * np.cos(self.x))
+        with self.assertRaises(ValueError):
+            z.backward()
+        # a deep chain does not hit the recursion limit
+        w = Tensor(1.)
+        for _ in range(5000):
+            w = w * 1.
+        w.backward()
+
+    def test_errors(self):
+        """Test that the domains of the operations and elementary functions are checked."""
+        x = Tensor([0.5, -1.])
+        with self.assertRaises(ValueError):
+            log(x)
+        with self.assertRaises(ValueError):
+            log(Tensor(2.), -1)
+        with self.assertRaises(ZeroDivisionError):
+            log(Tensor(2.), 1)
+        with self.assertRaises(ValueError):
+            arcsin(x * 2)
+        with self.assertRaises(ValueError):
+            2 ** x + x ** x
+        with self.assertRaises(ValueError):
+            (-2) ** x
+        with self.assertRaises(ZeroDivisionError):
+            x / Tensor([1., 0.])
+        with self.assertRaises(ZeroDivisionError):
+            1 / Tensor([0., 1.])
+        with self.assertRaises(TypeError):
+            x + "1"
+        with self.assertRaises(TypeError):
+            x * Reverse(1.)
+
+
+if __name__ == "__main__":
+    unittest.main()
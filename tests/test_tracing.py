@@ -0,0 +1,194 @@
+import math
+import unittest
+import numpy as np
+from src.pyadbcxy.elementary_functions import exp, log, sin, cos, tan, tanh, arctan, root, logistic
+from src.pyadbcxy.forward import Forward
+from src.pyadbcxy.reverse import Reverse
+from src.pyadbcxy.tracing import trace, CompiledFunction
+from src.pyadbcxy.variable import Variable
+
+
+class TestTrace(unittest.TestCase):
+    def test_trace(self):
+        """Test that tracing a function returns a CompiledFunction with one step per operation."""
+        f = trace(lambda x, y: x * y + 2, 3, 4)
+        self.assertIsInstance(f, CompiledFunction)
+        self.assertEqual(len(f), 2)
+        self.assertEqual(f(3, 4), 14)
+
+    def test_invalid_example(self):
+        """Test that example values must be real numbers."""
+        with self.assertRaises(TypeError):
+            trace(lambda x: x * 2, "3")
+        with self.assertRaises(TypeError):
+            trace(lambda x: x * 2, Variable(3))
+
+    def test_elementary_functions(self):
+        """Test that functions written with the elementary functions can be traced."""
+        f = trace(lambda x: sin(x) * exp(x) + log(x, 2) + root(x) + logistic(x), 0.5)
+        x = Reverse(0.5)
+        z = sin(x) * exp(x) + log(x, 2) + root(x) + logistic(x)
+        self.assertAlmostEqual(f(0.5), z.val)
+        self.assertAlmostEqual(f.derivative(0.5)[0], x.grad)
+
+
+class TestCompiledFunction(unittest.TestCase):
+    def setUp(self):
+        """Prepare the test fixture. Executed before each test method."""
+        self.func = lambda x, y: exp(cos(x)) / sin(y) ** 2 + log(x * y) - x ** y + 3 / x - (y + 1) ** 2
+        self.compiled = trace(self.func, 1.0, 2.0)
+
+    def test_matches_forward(self):
+        """Test that the compiled function agrees with the forward mode at new inputs."""
+        for xv, yv in [(1.0, 2.0), (0.5, 1.5), (2.5, 0.7)]:
+            fmode = Forward(self.func, [Variable(xv), Variable(yv)])
+            fmode.calculate()
+            self.assertAlmostEqual(self.compiled(xv, yv), fmode.value)
+            np.testing.assert_allclose(self.compiled.derivative(xv, yv), fmode.derivative)
+
+    def test_value_and_derivative(self):
+        """Test that value_and_derivative agrees with value and derivative."""
+        val, der = self.compiled.value_and_derivative(0.5, 1.5)
+        self.assertEqual(val, self.compiled.value(0.5, 1.5))
+        np.testing.assert_array_equal(der, self.compiled.derivative(0.5, 1.5))
+
+    def test_arrays(self):
+        """Test evaluating the compiled function at several points at once."""
+        xs, ys = np.array([1.0, 0.5, 2.5]), np.array([2.0, 1.5, 0.7])
+        val, der = self.compiled.value_and_derivative(xs, ys)
+        self.assertEqual(der.shape, (3, 2))
+        for i in range(3):
+            self.assertAlmostEqual(val[i], self.compiled(xs[i], ys[i]))
+            np.testing.assert_allclose(der[i], self.compiled.derivative(xs[i], ys[i]))
+
+    def test_vector_output(self):
+        """Test the Jacobian of a function with several outputs, including a constant one."""
+        f = trace(lambda x, y: [x * y, x + y, 5], 3, 4)
+        np.testing.assert_array_equal(f(1, 2), [2, 3, 5])
+        np.testing.assert_array_equal(f.derivative(1, 2), [[2, 1], [1, 1], [0, 0]])
+        self.assertEqual(f.derivative(np.array([1., 2.]), 2).shape, (2, 3, 2))
+
+    def test_unused_input(self):
+        """Test that inputs which the function does not depend on have a zero derivative."""
+        f = trace(lambda x, y: x * 2, 3, 4)
+        np.testing.assert_array_equal(f.derivative(1, 5), [2, 0])
+        g = trace(lambda x: 7, 3)
+        self.assertEqual(g(1), 7)
+        np.testing.assert_array_equal(g.derivative(1), [0])
+
+    def test_identity(self):
+        """Test a function returning one of its inputs."""
+        f = trace(lambda x, y: y, 3, 4)
+        self.assertEqual(f(1, 2), 2)
+        np.testing.assert_array_equal(f.derivative(1, 2), [0, 1])
+
+    def test_constants(self):
+        """Test that constant operands keep the values they had when the function was traced."""
+        f = trace(lambda x: 2 ** x - x / 4 + Reverse(5) * x, 1)
+        self.assertAlmostEqual(f(3), 8 - 0.75 + 15)
+        self.assertAlmostEqual(f.derivative(3)[0], 8 * math.log(2) - 0.25 + 5)
+
+    def test_wrong_number_of_inputs(self):
+        """Test that the number of inputs must match the traced function."""
+        with self.assertRaises(TypeError):
+            self.compiled(1.0)
+
+    def test_domain_error(self):
+        """Test that the domain of the elementary functions is still checked."""
+        with self.assertRaises(ValueError):
+            self.compiled(-1.0, 2.0)
+
+
+class TestOptimize(unittest.TestCase):
+    def check(self, func, *args):
+        """Check that the optimized and unoptimized plans agree, and return both."""
+        optimized = trace(func, *args)
+        plain = trace(func, *args, optimize=False)
+        for point in [args, tuple(0.5 * arg + 1 for arg in args)]:
+            np.testing.assert_allclose(optimized(*point), plain(*point))
+            np.testing.assert_allclose(optimized.derivative(*point), plain.derivative(*point))
+        return optimized, plain
+
+    def test_common_subexpressions(self):
+        """Test that repeated operations, in either order of commutative operands, are merged."""
+        optimized, plain = self.check(lambda x, y: sin(x) * cos(x) + sin(x) ** 2 + x * y + y * x - (x * y) / 2, 1.0, 2.0)
+        # sin, cos, *, **, +, *, +, +, /, -
+        self.assertEqual(len(plain), 13)
+        self.assertEqual(len(optimized), 10)
+        self.assertLess(len(optimized._values), len(plain._values))
+        np.testing.assert_allclose(optimized.hessian(1.0, 2.0), plain.hessian(1.0, 2.0))
+
+    def test_constant_folding(self):
+        """Test that operations on constants only are folded, and equal constants are merged."""
+        optimized, plain = self.check(lambda x: x * (Reverse(2.) * Reverse(3.)) + x * 6. + x ** 2 + x ** 2.0, 1.5)
+        self.assertEqual(len(plain), 8)
+        # *, +, **, +, **, +: x * 6. is merged with x times the folded 6.0, but x ** 2 is not
+        # merged with x ** 2.0
+        self.assertEqual(len(optimized), 6)
+        f = trace(lambda x: exp(Reverse(0.)) + 0 * x, 1.0)
+        self.assertEqual(f(5.0), 1.0)
+        np.testing.assert_array_equal(f.derivative(5.0), [0.0])
+
+    def test_dead_code(self):
+        """Test that the operations the outputs do not depend on are dropped."""
+        def func(x, y):
+            unused = exp(x) * log(y - 1)
+            return [log(x) + 0 * sin(y), y]
+        optimized, plain = self.check(func, 3.0, 2.0)
+        self.assertEqual(len(plain), 8)
+        self.assertEqual(len(optimized), 4)
+        # the logarithm of y - 1 is not evaluated any more
+        np.testing.assert_allclose(optimized(1.0, 0.5), [0.0, 0.5])
+        with self.assertRaises(ValueError):
+            plain(1.0, 0.5)
+
+
+class TestSecondOrder(unittest.TestCase):
+    def setUp(self):
+        """Prepare the test fixture. Executed before each test method."""
+        self.func = lambda x, y: exp(cos(x)) / sin(y) ** 2 + log(x * y, 3) - x ** y + tan(x) * tanh(y) + arctan(x / y) + root(x * y)
+        self.compiled = trace(self.func, 1.0, 2.0)
+
+    def finite_difference(self, xv, yv, h=1e-5):
+        """Hessian from central differences of the exact gradient."""
+        return np.array([(self.compiled.derivative(xv + h, yv) - self.compiled.derivative(xv - h, yv)) / (2 * h),
+                         (self.compiled.derivative(xv, yv + h) - self.compiled.derivative(xv, yv - h)) / (2 * h)])
+
+    def test_hessian(self):
+        """Test the Hessian against finite differences of the gradient."""
+        for xv, yv in [(1.0, 2.0), (0.7, 1.3)]:
+            hessian = self.compiled.hessian(xv, yv)
+            np.testing.assert_allclose(hessian, self.finite_difference(xv, yv), rtol=1e-6)
+            np.testing.assert_allclose(hessian, hessian.T)
+
+    def test_polynomial(self):
+        """Test the exact Hessian of a polynomial, including a zero row."""
+        f = trace(lambda x, y, z: x ** 3 * y + 2 * y + z, 1, 1, 1)
+        np.testing.assert_array_equal(f.hessian(2, 3, 4), [[36, 12, 0], [12, 0, 0], [0, 0, 0]])
+        np.testing.assert_array_equal(trace(lambda x, y: 2 * x + y, 1, 1).hessian(1, 2), np.zeros((2, 2)))
+
+    def test_hvp(self):
+        """Test that the Hessian-vector product agrees with the Hessian."""
+        vector = np.array([0.3, -2.0])
+        np.testing.assert_allclose(self.compiled.hvp((0.7, 1.3), vector), self.compiled.hessian(0.7, 1.3) @ vector)
+
+    def test_arrays(self):
+        """Test second derivatives at several points at once."""
+        xs, ys = np.array([0.7, 1.0]), np.array([1.3, 2.0])
+        hessian = self.compiled.hessian(xs, ys)
+        self.assertEqual(hessian.shape, (2, 2, 2))
+        products = self.compiled.hvp((xs, ys), (1.0, 0.5))
+        for i in range(2):
+            np.testing.assert_allclose(hessian[i], self.compiled.hessian(xs[i], ys[i]))
+            np.testing.assert_allclose(products[i], self.compiled.hvp((xs[i], ys[i]), (1.0, 0.5)))
+
+    def test_errors(self):
+        """Test that second derivatives require a single output and a vector of matching size."""
+        with self.assertRaises(ValueError):
+            self.compiled.hvp((1.0, 2.0), (1.0,))
+        with self.assertRaises(ValueError):
+            trace(lambda x: [x, x * x], 1).hessian(1)
+
+
+if __name__ == "__main__":
+    unittest.main()
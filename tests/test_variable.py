@@ -1,5 +1,8 @@
 import math
 import unittest
+from decimal import Decimal
+from fractions import Fraction
+import numpy as np
 from src.pyadbcxy.variable import Variable
 
 
@@ -244,6 +247,69 @@ class TestVariable(unittest.TestCase):
         self.assertNotEqual(self.x, 3)
         self.assertNotEqual(self.x, list())
 
+    def test_seed_vector(self):
+        """Test Variables whose derivatives are seed vectors."""
+        x = Variable(3, np.array([1., 0.]))
+        y = Variable(4., np.array([0., 5.]))
+        z = x*y + x**2 - y/x
+        np.testing.assert_allclose(z.der, [4. + 6. + 4./9, 15. - 5./3])
+        self.assertEqual(x, Variable(3, np.array([1., 0.])))
+        self.assertNotEqual(x, Variable(3, np.array([0., 1.])))
+
+    def test_array_values(self):
+        """Test Variables holding arrays of values, combined with
+            other array Variables,
+            NumPy arrays on either side of the operator,
+            constant numbers."""
+        x = Variable(np.array([1., 2., 3.]))
+        y = Variable(np.array([4., 5., 6.]), 2.)
+        z = x*y + 3*x - y/x
+        np.testing.assert_allclose(z.val, [4. + 3. - 4., 10. + 6. - 2.5, 18. + 9. - 2.])
+        np.testing.assert_allclose(z.der, x.val*2. + y.val + 3 - (2./x.val - y.val/x.val**2))
+
+        z = np.array([1., 2., 3.]) + x
+        self.assertIsInstance(z, Variable)
+        np.testing.assert_allclose(z.val, [2., 4., 6.])
+
+        z = np.array([2., 2., 2.])**x
+        np.testing.assert_allclose(z.der, 2.**x.val*math.log(2.))
+
+        # integer arrays can still be raised to negative powers
+        z = 1/Variable(np.array([1, 2, 4]))
+        np.testing.assert_allclose(z.val, [1., 0.5, 0.25])
+        np.testing.assert_allclose(z.der, [-1., -0.25, -0.0625])
+
+    def test_array_errors(self):
+        """Test that domain errors are raised when any array element is invalid."""
+        x = Variable(np.array([1., 0.]))
+        with self.assertRaises(ZeroDivisionError):
+            self.x / x
+        with self.assertRaises(ZeroDivisionError):
+            self.x / np.array([1., 0.])
+        with self.assertRaises(ValueError):
+            x ** self.x
+        with self.assertRaises(ValueError):
+            np.array([1., -1.]) ** self.x
+
+    def test_real_numbers(self):
+        """Test that NumPy scalars and other real numbers are accepted as constants."""
+        for c in [np.float32(2.0), np.int64(2), np.float64(2.0), Fraction(2, 1)]:
+            self.assertEqual(self.y + c, Variable(6.0, 5.0))
+            self.assertEqual(c + self.y, Variable(6.0, 5.0))
+            self.assertEqual(self.y - c, Variable(2.0, 5.0))
+            self.assertEqual(c - self.y, Variable(-2.0, -5.0))
+            self.assertEqual(self.y * c, Variable(8.0, 10.0))
+            self.assertEqual(c * self.y, Variable(8.0, 10.0))
+            self.assertEqual(self.y / c, Variable(2.0, 2.5))
+            self.assertEqual(c / self.y, Variable(0.5, -0.625))
+            self.assertEqual(self.y ** c, Variable(16.0, 40.0))
+            self.assertAlmostEqual((c ** self.y).der, 16 * math.log(2) * 5)
+        self.assertIsInstance((self.y * Fraction(1, 3)).val, float)
+        with self.assertRaises(TypeError):
+            self.y + Decimal(1)
+        with self.assertRaises(TypeError):
+            self.y * 1j
+
     def test_str_repr(self):
         """Test str and repr."""
         self.assertEqual(str(self.x), "Variable(val = 3, der = 1)")
@@ -251,6 +317,12 @@ class TestVariable(unittest.TestCase):
         self.assertEqual(str(self.y), "Variable(val = 4.0, der = 5.0)")
         self.assertEqual(repr(self.y), "Variable(val = 4.0, der = 5.0)")
 
+    def test_slots(self):
+        """Test that Variables have no per-instance __dict__."""
+        self.assertFalse(hasattr(self.x, "__dict__"))
+        with self.assertRaises(AttributeError):
+            self.x.other = 1
+
 
 if __name__ == "__main__":
     unittest.main()